@@ -9,6 +9,7 @@ param(
     [switch]$Force,
     [switch]$TestBuild,
     [switch]$SkipValidation,
+    [switch]$Clean,
     [string]$MSYS2Path = "C:\msys64\usr\bin\bash.exe"
 )
 
@@ -114,6 +115,9 @@ function Start-Build {
 
     $ScriptDir = $PSScriptRoot.Replace('\','/').Replace('C:','/c')
     $BuildCommand = "cd '$ScriptDir' && bash scripts/build_vlc.sh"
+    if ($Clean) {
+        $BuildCommand += " --clean"
+    }
 
     Write-Host "Executando build via MSYS2..." -ForegroundColor Yellow
     & $MSYS2Path -lc $BuildCommand
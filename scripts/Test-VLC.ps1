@@ -144,6 +144,13 @@ function Test-VlcPlugins {
             $found = $pluginFiles | Where-Object { $_.Name -eq $plugin }
             Write-TestResult -TestName "Plugin crítico: $plugin" -Passed ($found -ne $null) -Category "Plugins"
         }
+        
+        # plugins.dat desatualizado faz o VLC abrir cada plugin na partida
+        # (regenere com: python tools\plugin_cache.py --prefix <instalação>)
+        $pluginCache = Join-Path $pluginPath "plugins.dat"
+        $newestPlugin = $pluginFiles | Sort-Object LastWriteTime -Descending | Select-Object -First 1
+        $cacheFresh = (Test-Path $pluginCache) -and (($newestPlugin -eq $null) -or ((Get-Item $pluginCache).LastWriteTime -ge $newestPlugin.LastWriteTime))
+        Write-TestResult -TestName "Cache de plugins (plugins.dat) atualizado" -Passed $cacheFresh -Details $pluginCache -Category "Plugins"
     }
 }
 
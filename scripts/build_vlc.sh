@@ -36,6 +36,62 @@ else
     INSTALL_PREFIX="$PROJECT_ROOT/vlc-test"
 fi
 
+# Origem do código-fonte (um repositório bare local também serve, ex.: file:///srv/vlc.git)
+VLC_REPO_URL="${VLC_REPO_URL:-https://code.videolan.org/videolan/vlc.git}"
+VLC_BRANCH="${VLC_BRANCH:-master}"
+# Clone: blobless (--filter=blob:none), shallow (--depth 1) ou full
+CLONE_MODE="${VLC_CLONE_MODE:-blobless}"
+# Espelho bare compartilhado entre workspaces (git clone --reference); vazio = sem espelho
+VLC_MIRROR="${VLC_MIRROR:-}"
+
+# Opções de features do meson (também registradas no histórico de builds)
+MESON_OPTIONS=(
+    -Dqt=enabled
+    -Dlibplacebo=disabled
+    -Dskins2=disabled
+    -Davcodec=disabled
+    -Ddbus=disabled
+    -Dncurses=disabled
+)
+
+# Perfil de features (profiles/<nome>.json): substitui MESON_OPTIONS pelo conjunto
+# mínimo gerado por tools/build_profile.py a partir do meson_options.txt do VLC
+BUILD_PROFILE="${VLC_BUILD_PROFILE:-}"
+BUILD_PROFILE_TOOL="$PROJECT_ROOT/tools/build_profile.py"
+
+# Cache de artefatos: restaura o prefixo instalado quando commit, patches, opções e
+# toolchain são idênticos a um build anterior (local ou VLC_ARTIFACT_SHARED)
+ARTIFACT_CACHE_TOOL="$PROJECT_ROOT/tools/artifact_cache.py"
+USE_ARTIFACT_CACHE=1
+
+# Cache de plugins (plugins.dat): regenerado após a instalação para o VLC não
+# abrir cada plugin na partida
+PLUGIN_CACHE_TOOL="$PROJECT_ROOT/tools/plugin_cache.py"
+
+# Histórico de builds: prevê a duração antes de compilar e registra depois
+BUILD_HISTORY="$PROJECT_ROOT/tools/build_history.py"
+# Compilação com jobs ajustados à RAM livre e ao pico aprendido de cada target
+BUILD_DRIVER="$PROJECT_ROOT/tools/build_driver.py"
+# Perfil do build a partir do .ninja_log (lentidão, módulos, caminho crítico)
+NINJA_PROFILE="$PROJECT_ROOT/tools/ninja_profile.py"
+NINJA_LOG_OFFSET=""
+
+# Build incremental: o diretório de build é reaproveitado; só --clean ou uma
+# troca de toolchain apagam o build anterior
+CLEAN_BUILD=0
+BUILD_KIND="incremental"
+BUILD_STATE_FILE=".vlc-build-state"
+SKIPPED_COMMANDS=0
+TOTAL_COMMANDS=0
+
+# Cache de compilação: auto usa ccache ou sccache se instalado; none desativa
+COMPILER_CACHE="${VLC_COMPILER_CACHE:-auto}"
+COMPILER_CACHE_DIR="${VLC_COMPILER_CACHE_DIR:-}"
+COMPILER_CACHE_SIZE="${VLC_COMPILER_CACHE_SIZE:-20G}"
+CACHE_STATS_FILE=".vlc-compiler-cache"
+CACHE_HITS=0
+CACHE_MISSES=0
+
 # === FUNÇÕES UTILITÁRIAS ===
 print_header() {
     echo ""
@@ -89,27 +145,13 @@ apply_patches() {
         print_warning "D3D12MemAlloc.h não encontrado, a compilação pode falhar"
     fi
     
-    # 2. Correções Qt 6.10+
+    # 2. Correções Qt 6.10+ (regex + patches/ em uma série com manifesto)
     if [ -f "$PROJECT_ROOT/scripts/fix_qt_compatibility.py" ]; then
         echo "  🛠️ Aplicando patches Qt 6.10+..."
-        python3 "$PROJECT_ROOT/scripts/fix_qt_compatibility.py"
-    fi
-    
-    # 3. Aplicar patch de compatibilidade Qt RHI
-    local patch_file="$PROJECT_ROOT/patches/fix_qt_rhi_compatibility.patch"
-    if [ -f "$patch_file" ]; then
-        echo "  🔧 Aplicando patch fix_qt_rhi_compatibility.patch..."
-        cd "$VLC_SOURCE_DIR" || exit 1
-        if patch -p1 --dry-run -N -s < "$patch_file" > /dev/null 2>&1; then
-            patch -p1 -N < "$patch_file"
-            echo "  ✓ Patch aplicado com sucesso"
-        else
-            echo "  ℹ️ Patch já aplicado ou não necessário"
-        fi
-        cd "$PROJECT_ROOT" || exit 1
+        python3 "$PROJECT_ROOT/scripts/fix_qt_compatibility.py" --source "$VLC_SOURCE_DIR"
     fi
     
-    # 4. Instalar perl se necessário
+    # 3. Instalar perl se necessário
     if ! command -v perl &> /dev/null; then
         echo "  📦 Instalando Perl..."
         pacman -S --noconfirm --needed perl
@@ -118,8 +160,433 @@ apply_patches() {
     print_success "Todas as correções aplicadas"
 }
 
+# Cache por usuário compartilhado com as ferramentas Python (vlc_build_doctor)
+user_cache_dir() {
+    echo "${LOCALAPPDATA:-${XDG_CACHE_HOME:-$HOME/.cache}}/vlc-build-doctor"
+}
+
+# === BUILD INCREMENTAL ===
+usage() {
+    echo "Uso: $(basename "$0") [--clean] [--compiler-cache=auto|ccache|sccache|none]"
+    echo "       [--cache-dir=DIR] [--cache-size=TAMANHO]"
+    echo "       [--clone-mode=blobless|shallow|full] [--mirror[=DIR]] [--profile=NOME]"
+    echo ""
+    echo "  --clean             Apaga $BUILD_DIR e recompila tudo (padrão: build incremental)"
+    echo "  --compiler-cache    Cache de compilação (padrão: $COMPILER_CACHE; VLC_COMPILER_CACHE)"
+    echo "  --cache-dir         Diretório do cache (VLC_COMPILER_CACHE_DIR)"
+    echo "  --cache-size        Tamanho máximo do cache, ex.: 20G (padrão: $COMPILER_CACHE_SIZE)"
+    echo "  --clone-mode        Tipo do primeiro clone (padrão: $CLONE_MODE; VLC_CLONE_MODE)"
+    echo "  --mirror            Clona com --reference a um espelho bare local (VLC_MIRROR)"
+    echo "  --profile           Perfil de features em profiles/NOME.json ou caminho (VLC_BUILD_PROFILE)"
+    echo "  --no-artifact-cache Sempre compilar, sem restaurar nem guardar o prefixo em cache"
+}
+
+parse_args() {
+    while [ $# -gt 0 ]; do
+        case "$1" in
+            --clean) CLEAN_BUILD=1 ;;
+            --compiler-cache=*) COMPILER_CACHE="${1#*=}" ;;
+            --no-compiler-cache) COMPILER_CACHE="none" ;;
+            --cache-dir=*) COMPILER_CACHE_DIR="${1#*=}" ;;
+            --cache-size=*) COMPILER_CACHE_SIZE="${1#*=}" ;;
+            --clone-mode=*) CLONE_MODE="${1#*=}" ;;
+            --mirror) VLC_MIRROR="$(user_cache_dir)/vlc-mirror.git" ;;
+            --mirror=*) VLC_MIRROR="${1#*=}" ;;
+            --profile=*) BUILD_PROFILE="${1#*=}" ;;
+            --no-artifact-cache) USE_ARTIFACT_CACHE=0 ;;
+            -h|--help) usage; exit 0 ;;
+            *) print_error "Opção desconhecida: $1"; usage; exit 1 ;;
+        esac
+        shift
+    done
+}
+
+# Troca MESON_OPTIONS pelo conjunto mínimo do perfil (chamado dentro do fonte do VLC)
+apply_build_profile() {
+    if [ -z "$BUILD_PROFILE" ]; then
+        return 0
+    fi
+    local manifest="$BUILD_PROFILE"
+    if [ ! -f "$manifest" ]; then
+        manifest="$PROJECT_ROOT/profiles/$BUILD_PROFILE.json"
+    fi
+    if [ ! -f "$manifest" ]; then
+        print_error "Perfil não encontrado: $BUILD_PROFILE (procure em $PROJECT_ROOT/profiles)"
+        exit 1
+    fi
+    local args_file
+    args_file=$(mktemp)
+    if ! python3 "$BUILD_PROFILE_TOOL" "$manifest" \
+            --source "$VLC_SOURCE_DIR" \
+            --build-dir "$VLC_SOURCE_DIR/$BUILD_DIR" \
+            --args-out "$args_file"; then
+        rm -f "$args_file"
+        print_error "Falha ao gerar as opções do perfil $manifest"
+        exit 1
+    fi
+    mapfile -t MESON_OPTIONS < "$args_file"
+    rm -f "$args_file"
+}
+
+# Identifica o toolchain: trocar de compilador, de cache ou de meson/ninja exige
+# build limpo (o meson fixa o compilador no setup e --reconfigure não o troca)
+toolchain_fingerprint() {
+    {
+        command -v gcc || true
+        gcc --version 2>/dev/null | head -n 1
+        meson --version 2>/dev/null || true
+        ninja --version 2>/dev/null || true
+        echo "cache=${COMPILER_CACHE:-none}"
+    } | tr '\n' ' '
+}
+
+options_fingerprint() {
+    echo "--prefix=$INSTALL_PREFIX --buildtype=release ${MESON_OPTIONS[*]} --wrap-mode=nodownload"
+}
+
+read_build_state() {
+    grep "^$1=" "$BUILD_DIR/$BUILD_STATE_FILE" 2>/dev/null | cut -d= -f2-
+}
+
+write_build_state() {
+    {
+        echo "toolchain=$(toolchain_fingerprint)"
+        echo "options=$(options_fingerprint)"
+    } > "$BUILD_DIR/$BUILD_STATE_FILE"
+}
+
+# Decide entre reaproveitar, reconfigurar no lugar ou recriar o diretório de build
+configure_build() {
+    local setup_args=(
+        --prefix="$INSTALL_PREFIX"
+        --buildtype=release
+        "${MESON_OPTIONS[@]}"
+        --wrap-mode=nodownload
+    )
+    local clean_reason=""
+    if [ "$CLEAN_BUILD" = "1" ]; then
+        clean_reason="--clean solicitado"
+    elif [ ! -f "$BUILD_DIR/build.ninja" ] || [ ! -d "$BUILD_DIR/meson-private" ]; then
+        clean_reason="nenhum build anterior utilizável"
+    elif [ -f "$BUILD_DIR/$BUILD_STATE_FILE" ] && \
+         [ "$(read_build_state toolchain)" != "$(toolchain_fingerprint)" ]; then
+        clean_reason="toolchain mudou"
+    fi
+
+    if [ -n "$clean_reason" ]; then
+        BUILD_KIND="clean"
+        echo "  🧹 Build limpo: $clean_reason"
+        if [ -d "$BUILD_DIR" ]; then
+            echo "  🗑️ Removendo build anterior..."
+            rm -rf "$BUILD_DIR"
+        fi
+        echo "  ⚙️ Configuração otimizada para Windows..."
+        # CC/CXX explícitos: com cache o compilador é embrulhado pelo launcher; sem
+        # cache, impedem o meson de detectar um ccache/sccache por conta própria
+        local launcher=""
+        if [ "$COMPILER_CACHE" != "none" ]; then
+            launcher="$COMPILER_CACHE "
+        fi
+        # Chamar meson a partir do diretório fonte usando '.' como source dir
+        CC="$launcher${CC:-gcc}" CXX="$launcher${CXX:-g++}" \
+            meson setup "$BUILD_DIR" . "${setup_args[@]}"
+    elif [ "$(read_build_state options)" != "$(options_fingerprint)" ]; then
+        BUILD_KIND="incremental"
+        echo "  🔁 Opções mudaram: reconfigurando $BUILD_DIR no lugar (sem apagar)"
+        meson setup --reconfigure "$BUILD_DIR" . "${setup_args[@]}"
+    else
+        BUILD_KIND="incremental"
+        echo "  ♻️ Reutilizando $BUILD_DIR (opções e toolchain inalterados)"
+    fi
+    write_build_state
+}
+
+# Conta os comandos do ninja que ainda precisam rodar e os que o build incremental pula
+report_pending_work() {
+    if ! command -v ninja &> /dev/null; then
+        return 0
+    fi
+    local pending
+    TOTAL_COMMANDS=$(ninja -C "$BUILD_DIR" -t commands 2>/dev/null | wc -l)
+    pending=$(ninja -C "$BUILD_DIR" -n 2>/dev/null | grep -c '^\[' || true)
+    SKIPPED_COMMANDS=$((TOTAL_COMMANDS - pending))
+    if [ "$SKIPPED_COMMANDS" -lt 0 ]; then
+        SKIPPED_COMMANDS=0
+    fi
+    if [ "$TOTAL_COMMANDS" -gt 0 ]; then
+        echo "  📊 $pending de $TOTAL_COMMANDS comandos para executar;" \
+             "$SKIPPED_COMMANDS já atualizados ($((SKIPPED_COMMANDS * 100 / TOTAL_COMMANDS))% do trabalho pulado)"
+    fi
+}
+
+# === CÓDIGO-FONTE ===
+# Commit do branch no remoto (vazio se o remoto não responder)
+remote_branch_head() {
+    git ls-remote "$1" "refs/heads/$VLC_BRANCH" 2>/dev/null | cut -f1
+}
+
+# Cria ou atualiza o espelho bare; só busca quando o branch mudou no remoto
+update_mirror() {
+    local remote_head
+    remote_head=$(remote_branch_head "$VLC_REPO_URL")
+    if [ ! -d "$VLC_MIRROR" ]; then
+        echo "  🪞 Criando espelho local em $VLC_MIRROR..."
+        mkdir -p "$(dirname "$VLC_MIRROR")"
+        git clone --mirror "$VLC_REPO_URL" "$VLC_MIRROR"
+        # Workspaces emprestam objetos do espelho: ele nunca pode descartá-los
+        git -C "$VLC_MIRROR" config gc.pruneExpire never
+        git -C "$VLC_MIRROR" config gc.reflogExpireUnreachable never
+    elif [ -n "$remote_head" ] && \
+         [ "$remote_head" = "$(git -C "$VLC_MIRROR" rev-parse -q --verify "refs/heads/$VLC_BRANCH")" ]; then
+        echo "  ✓ Espelho local já atualizado"
+    else
+        echo "  🪞 Atualizando espelho local..."
+        git -C "$VLC_MIRROR" fetch --prune origin || print_warning "Não foi possível atualizar o espelho $VLC_MIRROR"
+    fi
+}
+
+clone_vlc_source() {
+    local target="$1"
+    local clone_args=(--branch "$VLC_BRANCH")
+    if [ -n "$VLC_MIRROR" ]; then
+        # Com espelho os objetos já estão no disco: clone completo sem cópia
+        update_mirror
+        clone_args+=(--reference "$VLC_MIRROR")
+        echo "  📦 Clonando VLC 4.x com objetos do espelho $VLC_MIRROR..."
+    else
+        case "$CLONE_MODE" in
+            blobless) clone_args+=(--filter=blob:none) ;;
+            shallow) clone_args+=(--depth 1) ;;
+            full) ;;
+            *)
+                print_error "Modo de clone desconhecido: $CLONE_MODE (use blobless, shallow ou full)"
+                exit 1
+                ;;
+        esac
+        echo "  📦 Clonando VLC 4.x ($CLONE_MODE; o clone completo tem ~1GB)..."
+    fi
+    git clone "${clone_args[@]}" "$VLC_REPO_URL" "$target"
+}
+
+# Atualiza o fonte só quando o branch mudou no remoto (git ls-remote, sem fetch)
+update_vlc_source() {
+    local remote_head tracked
+    remote_head=$(remote_branch_head origin)
+    if [ -z "$remote_head" ]; then
+        print_warning "Não foi possível consultar o remoto; mantendo o código atual"
+        return 0
+    fi
+    tracked=$(git rev-parse -q --verify "refs/remotes/origin/$VLC_BRANCH" || true)
+    if [ "$remote_head" = "$tracked" ] && [ "$remote_head" = "$(git rev-parse -q --verify HEAD)" ]; then
+        echo "  ✓ $VLC_BRANCH inalterado no remoto (${remote_head:0:10}); atualização pulada"
+        return 0
+    fi
+
+    echo "  🔄 Atualizando código (${tracked:0:10} -> ${remote_head:0:10})..."
+    if [ -n "$VLC_MIRROR" ] && [ -d "$VLC_MIRROR" ]; then
+        update_mirror
+    fi
+    if [ "$(git rev-parse --is-shallow-repository)" = "true" ]; then
+        # Clone raso: traz só o novo topo e move o branch sem histórico comum
+        git fetch --depth 1 origin "$VLC_BRANCH" && git reset --keep "origin/$VLC_BRANCH" \
+            || print_warning "Não foi possível atualizar (alterações locais em conflito?)"
+    else
+        git fetch origin "$VLC_BRANCH" && git merge --ff-only "origin/$VLC_BRANCH" \
+            || print_warning "Não foi possível atualizar (alterações locais em conflito?)"
+    fi
+}
+
+# === CACHE DE COMPILAÇÃO ===
+# Resolve COMPILER_CACHE para a ferramenta instalada (ou none)
+resolve_compiler_cache() {
+    case "$COMPILER_CACHE" in
+        auto)
+            COMPILER_CACHE="none"
+            for tool in ccache sccache; do
+                if command -v "$tool" &> /dev/null; then
+                    COMPILER_CACHE="$tool"
+                    break
+                fi
+            done
+            ;;
+        ccache|sccache)
+            if ! command -v "$COMPILER_CACHE" &> /dev/null; then
+                print_warning "$COMPILER_CACHE não encontrado; compilando sem cache (pacman -S mingw-w64-x86_64-$COMPILER_CACHE)"
+                COMPILER_CACHE="none"
+            fi
+            ;;
+        none) ;;
+        *)
+            print_error "Cache de compilação desconhecido: $COMPILER_CACHE (use auto, ccache, sccache ou none)"
+            exit 1
+            ;;
+    esac
+}
+
+# Exporta diretório e limite do cache e zera as estatísticas para medir só este build
+prepare_compiler_cache() {
+    if [ "$COMPILER_CACHE" = "none" ]; then
+        echo "  🗄️ Cache de compilação: desativado"
+        return 0
+    fi
+    if [ -z "$COMPILER_CACHE_DIR" ]; then
+        COMPILER_CACHE_DIR="$(user_cache_dir)/$COMPILER_CACHE"
+    fi
+    mkdir -p "$COMPILER_CACHE_DIR"
+    if [ "$COMPILER_CACHE" = "ccache" ]; then
+        export CCACHE_DIR="$COMPILER_CACHE_DIR"
+        ccache -M "$COMPILER_CACHE_SIZE" > /dev/null || true
+        ccache -z > /dev/null || true
+    else
+        export SCCACHE_DIR="$COMPILER_CACHE_DIR"
+        export SCCACHE_CACHE_SIZE="$COMPILER_CACHE_SIZE"
+        # O servidor do sccache só lê diretório e limite ao iniciar
+        sccache --stop-server &> /dev/null || true
+        sccache --zero-stats > /dev/null || true
+    fi
+    echo "  🗄️ Cache de compilação: $COMPILER_CACHE em $COMPILER_CACHE_DIR (máx. $COMPILER_CACHE_SIZE)"
+}
+
+# Lê acertos/falhas do último build e os grava em $BUILD_DIR para o doctor
+collect_cache_stats() {
+    if [ "$COMPILER_CACHE" = "none" ]; then
+        return 0
+    fi
+    local counters size=""
+    if [ "$COMPILER_CACHE" = "ccache" ]; then
+        counters=$(ccache --print-stats 2>/dev/null | awk -F'\t' '
+            $1 == "direct_cache_hit" || $1 == "preprocessed_cache_hit" { hits += $2 }
+            $1 == "cache_miss" { misses += $2 }
+            $1 == "cache_size_kibibyte" { size = sprintf("%.1f GiB", $2 / 1048576) }
+            END { print hits + 0, misses + 0, size }')
+    else
+        counters=$(sccache --show-stats 2>/dev/null | awk '
+            /^Cache hits[[:space:]]+[0-9]+$/ { hits = $3 }
+            /^Cache misses[[:space:]]+[0-9]+$/ { misses = $3 }
+            /^Cache size/ { size = $3 " " $4 }
+            END { print hits + 0, misses + 0, size }')
+    fi
+    read -r CACHE_HITS CACHE_MISSES size <<< "$counters"
+    {
+        echo "tool=$COMPILER_CACHE"
+        echo "dir=$COMPILER_CACHE_DIR"
+        echo "max_size=$COMPILER_CACHE_SIZE"
+        echo "hits=${CACHE_HITS:-0}"
+        echo "misses=${CACHE_MISSES:-0}"
+        echo "size=$size"
+        echo "finished_at=$(date +%s)"
+    } > "$BUILD_DIR/$CACHE_STATS_FILE"
+}
+
+report_cache_stats() {
+    if [ "$COMPILER_CACHE" = "none" ]; then
+        return 0
+    fi
+    local total=$((CACHE_HITS + CACHE_MISSES))
+    if [ "$total" -gt 0 ]; then
+        echo "🗄️ Cache de compilação ($COMPILER_CACHE): $CACHE_HITS acertos, $CACHE_MISSES falhas" \
+             "($((CACHE_HITS * 100 / total))% de acerto)"
+    else
+        echo "🗄️ Cache de compilação ($COMPILER_CACHE): nenhuma compilação passou pelo cache"
+    fi
+    echo ""
+}
+
+# Compila pelo driver com jobs por memória; sem ele (ou sem ninja), meson compile
+compile_vlc() {
+    if [ -f "$BUILD_DRIVER" ] && command -v ninja &> /dev/null; then
+        python3 "$BUILD_DRIVER" --build-dir "$BUILD_DIR"
+    else
+        meson compile -C "$BUILD_DIR"
+    fi
+}
+
+# Perfila só as execuções do ninja deste build (o driver roda o ninja várias vezes)
+profile_build() {
+    if [ ! -f "$NINJA_PROFILE" ] || [ -z "$NINJA_LOG_OFFSET" ]; then
+        return 0
+    fi
+    echo ""
+    python3 "$NINJA_PROFILE" \
+        --build-dir "$BUILD_DIR" \
+        --since-offset "$NINJA_LOG_OFFSET" \
+        --top 10 \
+        --trace "$BUILD_DIR/build-trace.json" \
+        | sed 's/^/  /' || true
+}
+
+# === CACHE DE ARTEFATOS ===
+artifact_cache_enabled() {
+    [ "$USE_ARTIFACT_CACHE" = "1" ] && [ -f "$ARTIFACT_CACHE_TOOL" ]
+}
+
+# Restaura o prefixo se as entradas do build já estão em cache (--clean sempre compila)
+restore_artifacts() {
+    if ! artifact_cache_enabled || [ "$CLEAN_BUILD" = "1" ]; then
+        return 1
+    fi
+    python3 "$ARTIFACT_CACHE_TOOL" restore \
+        --source "$VLC_SOURCE_DIR" \
+        --options="${MESON_OPTIONS[*]}" \
+        --prefix "$INSTALL_PREFIX" \
+        | sed 's/^/  /'
+    return "${PIPESTATUS[0]}"
+}
+
+store_artifacts() {
+    if ! artifact_cache_enabled; then
+        return 0
+    fi
+    python3 "$ARTIFACT_CACHE_TOOL" store \
+        --source "$VLC_SOURCE_DIR" \
+        --options="${MESON_OPTIONS[*]}" \
+        --prefix "$INSTALL_PREFIX" \
+        | sed 's/^/  /' || true
+}
+
+# Confere o plugins.dat do prefixo e o regenera com o vlc-cache-gen se preciso
+refresh_plugin_cache() {
+    if [ ! -f "$PLUGIN_CACHE_TOOL" ]; then
+        return 0
+    fi
+    python3 "$PLUGIN_CACHE_TOOL" \
+        --prefix "$INSTALL_PREFIX" \
+        --build-dir "$VLC_SOURCE_DIR/$BUILD_DIR" \
+        | sed 's/^/  /' || true
+}
+
+print_install_summary() {
+    echo "📍 VLC instalado em:"
+    echo "   $INSTALL_PREFIX/bin/vlc.exe"
+    echo ""
+    echo "🧪 Para testar a instalação:"
+    echo "   scripts\\test_vlc_build.ps1"
+    echo ""
+    echo "🚀 Para executar o VLC:"
+    echo "   & \"C:\\vlc-test\\bin\\vlc.exe\""
+    echo ""
+}
+
+# Registra a duração do build no histórico (falhas aqui não interrompem o build)
+record_build() {
+    local start="$1"
+    local status="$2"
+    if [ -f "$BUILD_HISTORY" ]; then
+        python3 "$BUILD_HISTORY" record \
+            --start "$start" \
+            --end "$(date +%s)" \
+            --status "$status" \
+            --kind "$BUILD_KIND" \
+            --source-dir "$VLC_SOURCE_DIR" \
+            --options="${MESON_OPTIONS[*]}" \
+            | sed 's/^/  /' || true
+    fi
+}
+
 # === FUNÇÃO PRINCIPAL ===
 main() {
+    parse_args "$@"
+
     print_header "VLC 4.x Build System - Versão Profissional"
     echo "Sistema de compilação automática para Windows 10/11"
     echo "Compatível com Qt 6.10+ e MSYS2 MinGW 64-bit"
@@ -132,63 +599,77 @@ main() {
     
     print_step "1" "5" "Verificando repositório VLC"
     if [ ! -d "$VLC_SOURCE_DIR" ] || [ -z "$(ls -A "$VLC_SOURCE_DIR" 2>/dev/null)" ]; then
-        echo "  📦 Clonando VLC 4.x (~1GB, pode demorar)..."
         # Clonar preferencialmente dentro do repositório para layout consistente
         clone_dir="$PROJECT_ROOT"
         if [ -n "$USERNAME" ] && [ -d "/c/Users/$USERNAME" ]; then
             clone_dir="/c/Users/$USERNAME"
         fi
         cd "$clone_dir"
-        git clone https://code.videolan.org/videolan/vlc.git "$(basename "$VLC_SOURCE_DIR")"
+        clone_vlc_source "$(basename "$VLC_SOURCE_DIR")"
         cd "$(basename "$VLC_SOURCE_DIR")" || exit 1
-        git switch master || true
         VLC_SOURCE_DIR=$(pwd)
     else
         echo "  ✓ Repositório encontrado em $VLC_SOURCE_DIR"
         cd "$VLC_SOURCE_DIR"
-        echo "  🔄 Atualizando código..."
-        git pull || print_warning "Não foi possível atualizar (pode já estar atualizado)"
+        update_vlc_source
     fi
     
     # Aplicar patches (após garantir que o repositório existe)
     apply_patches
+    apply_build_profile
     
     print_step "2" "5" "Preparando diretório de instalação"
     mkdir -p "$INSTALL_PREFIX"
     echo "  📁 Diretório: $INSTALL_PREFIX"
+    if restore_artifacts; then
+        print_header "VLC RESTAURADO DO CACHE DE ARTEFATOS! ⚡"
+        echo ""
+        echo "Entradas idênticas a um build anterior: nada a compilar (use --clean para forçar)."
+        echo ""
+        refresh_plugin_cache
+        echo ""
+        print_install_summary
+        return 0
+    fi
     
     print_step "3" "5" "Configurando build com Meson"
-        # Garantir que estamos no diretório fonte do VLC antes de configurar o build
-        cd "$VLC_SOURCE_DIR" || exit 1
-
-        if [ -d "$BUILD_DIR" ]; then
-                echo "  🗑️ Removendo build anterior..."
-                rm -rf "$BUILD_DIR"
-        fi
-
-        echo "  ⚙️ Configuração otimizada para Windows..."
-        # Chamar meson a partir do diretório fonte usando '.' como source dir
-        meson setup "$BUILD_DIR" . \
-            --prefix="$INSTALL_PREFIX" \
-            --buildtype=release \
-            -Dqt=enabled \
-            -Dlibplacebo=disabled \
-            -Dskins2=disabled \
-            -Davcodec=disabled \
-            -Ddbus=disabled \
-            -Dncurses=disabled \
-            --wrap-mode=nodownload
+    # Garantir que estamos no diretório fonte do VLC antes de configurar o build
+    cd "$VLC_SOURCE_DIR" || exit 1
+    resolve_compiler_cache
+    prepare_compiler_cache
+    configure_build
     
     print_success "Configuração concluída!"
     
-    print_step "4" "5" "Compilando VLC (30-60 minutos)"
+    if [ "$BUILD_KIND" = "clean" ]; then
+        print_step "4" "5" "Compilando VLC (30-60 minutos)"
+    else
+        print_step "4" "5" "Compilando VLC (incremental)"
+    fi
+    report_pending_work
+    if [ -f "$BUILD_HISTORY" ]; then
+        python3 "$BUILD_HISTORY" predict --kind "$BUILD_KIND" --options="${MESON_OPTIONS[*]}" \
+            | sed 's/^/  /' || true
+    fi
     echo "  🚀 Iniciando compilação..."
     echo "  ⏰ Início: $(date)"
     
-    if meson compile -C "$BUILD_DIR"; then
+    local build_start
+    build_start=$(date +%s)
+    # Tamanho do .ninja_log antes de compilar: o perfil lê só o que este build acrescentar
+    NINJA_LOG_OFFSET=0
+    if [ -f "$BUILD_DIR/.ninja_log" ]; then
+        NINJA_LOG_OFFSET=$(wc -c < "$BUILD_DIR/.ninja_log" | tr -d ' ')
+    fi
+    if compile_vlc; then
         echo "  ⏰ Fim: $(date)"
+        collect_cache_stats
+        record_build "$build_start" ok
+        profile_build
         print_success "Compilação concluída!"
     else
+        collect_cache_stats
+        record_build "$build_start" fail
         print_error "Falha na compilação! Verifique as mensagens acima."
         exit 1
     fi
@@ -196,6 +677,8 @@ main() {
     print_step "5" "5" "Instalando arquivos"
     if meson install -C "$BUILD_DIR"; then
         print_success "Instalação concluída!"
+        refresh_plugin_cache
+        store_artifacts
     else
         print_error "Falha na instalação!"
         exit 1
@@ -204,15 +687,13 @@ main() {
     # Resumo final
     print_header "COMPILAÇÃO CONCLUÍDA COM SUCESSO! 🎉"
     echo ""
-    echo "📍 VLC instalado em:"
-    echo "   $INSTALL_PREFIX/bin/vlc.exe"
-    echo ""
-    echo "🧪 Para testar a instalação:"
-    echo "   scripts\\test_vlc_build.ps1"
-    echo ""
-    echo "🚀 Para executar o VLC:"
-    echo "   & \"C:\\vlc-test\\bin\\vlc.exe\""
-    echo ""
+    if [ "$BUILD_KIND" = "incremental" ] && [ "$TOTAL_COMMANDS" -gt 0 ]; then
+        echo "♻️ Build incremental: $SKIPPED_COMMANDS de $TOTAL_COMMANDS comandos reaproveitados"
+        echo "   (use --clean para recompilar tudo)"
+        echo ""
+    fi
+    report_cache_stats
+    print_install_summary
 }
 
 # Executar se chamado diretamente
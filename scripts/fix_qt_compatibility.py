@@ -4,11 +4,293 @@ VLC Qt 6.10+ Compatibility Patch
 ================================
 Corrige problemas de compatibilidade com Qt 6.10+ no compositor DirectComposition.
 Este script aplica patches automáticos necessários para compilar o VLC 4.x.
+
+Todas as correções (substituições por regex e patches unificados de `patches/`)
+formam uma série aplicada em ordem. Patches que tocam arquivos diferentes rodam
+em paralelo em um pool de processos; cada resultado é gravado em um arquivo
+temporário e só é renomeado sobre o original quando a série inteira encaixou,
+então uma falha em qualquer hunk (ou uma interrupção) não deixa o fonte pela
+metade.
+
+O resultado fica registrado em um manifesto dentro do fonte do VLC: IDs dos
+patches aplicados e tamanho, mtime e hash de cada arquivo tocado. Se nada mudou
+desde a última execução, o script confere só o manifesto (stat e, se preciso,
+hash) e termina em milissegundos.
+
+O conteúdo original de cada arquivo alterado vai para um store compartilhado
+de backups (objetos comprimidos endereçados pelo hash, com contagem de
+referências por árvore do VLC), no lugar das cópias `.backup` ao lado do
+fonte. `restore` devolve os fontes originais de um manifesto sem reclonar o
+VLC e `gc` apaga os objetos que nenhuma árvore referencia mais.
 """
 
+import argparse
+import hashlib
+import json
+import mmap
 import os
-import sys
 import re
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+MANIFEST_NAME = ".vlc-compiler-patches.json"
+MANIFEST_FORMAT = 2
+
+STORE_ENV_VAR = "VLC_PATCH_BACKUPS"
+STORE_FORMAT = 2
+LEGACY_REFS_NAME = "refs.json"
+# Objetos sem referência mais novos que isto não são apagados pelo gc (s)
+GC_GRACE_S = 3600
+LEGACY_BACKUP_SUFFIX = ".backup"
+
+COMPOSITOR_FILE = "modules/gui/qt/maininterface/compositor_dcomp.cpp"
+
+# Correções por regex no compositor DirectComposition
+COMPOSITOR_FIXES = [
+    # Linha 108: Início da função init() - adicionar check de versão
+    (
+        r'(bool CompositorDirectComposition::init\(\)\s*\{)',
+        r'\1\n#if QT_VERSION >= QT_VERSION_CHECK(6, 10, 0)\n    // DirectComposition not supported with Qt 6.10+ due to QRhi API changes\n    msg_Warn(m_intf, "DirectComposition disabled for Qt 6.10+, using Win7 compositor fallback");\n    return false;\n#else'
+    ),
+
+    # Linha 177: Remover chamada para implementation()
+    (
+        r'QRhiImplementation\* const rhiImplementation = rhi->implementation\(\);',
+        r'// Removed for Qt 6.10+ compatibility - see init() method'
+    ),
+
+    # Últimas linhas da função init - fechar #else
+    (
+        r'(m_videoVisual->SetOffsetY\(m_videoPosition\.y\(\)\);\s*return true;)',
+        r'\1\n#endif'
+    )
+]
+
+# Patches unificados de patches/, aplicados depois das correções por regex.
+# Um arquivo patches/series (um patch por linha, "opcional" após o nome para
+# patches que podem não se aplicar) substitui esta lista.
+DIFF_SERIES = [
+    ("fix_qt_rhi_compatibility.patch", True),
+]
+SERIES_FILE = "series"
+
+# Arquivos a partir deste tamanho são lidos por memory map
+MMAP_THRESHOLD = 256 * 1024
+STAGED_SUFFIX = ".patch-tmp"
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+DEV_NULL = '/dev/null'
+
+
+class PatchError(Exception):
+    """Falha ao ler, interpretar ou aplicar um patch da série"""
+
+
+def short_digest(data):
+    """Hash curto usado para versionar os IDs dos patches"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def read_bytes(path):
+    """Lê um arquivo; os grandes passam por memory map em vez de read()"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return f.read()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return view[:]
+
+
+def file_sha256(path):
+    """Hash SHA-256 do conteúdo de um arquivo"""
+    return hashlib.sha256(read_bytes(path)).hexdigest()
+
+
+def default_store_dir():
+    """Store de backups compartilhado, no mesmo diretório de cache do doctor"""
+    override = os.environ.get(STORE_ENV_VAR)
+    if override:
+        return override
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'vlc-build-doctor', 'patch-backups')
+
+
+def write_atomic(path, data):
+    """
+    Grava bytes em um temporário exclusivo ao lado do destino e renomeia por
+    cima; vários processos podem gravar o mesmo destino ao mesmo tempo
+    """
+    directory, name = os.path.split(path)
+    handle, tmp_path = tempfile.mkstemp(prefix=name + '.', suffix=STAGED_SUFFIX, dir=directory or '.')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class BackupStore:
+    """
+    Objetos comprimidos (zlib) endereçados pelo SHA-256 do conteúdo original.
+    Cada árvore do VLC tem seu arquivo em refs/ com os objetos que o manifesto
+    dela usa, então árvores diferentes atualizam as referências sem disputar
+    um arquivo; a contagem de referências de um objeto é o número de árvores
+    que o citam
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:])
+
+    def put(self, data, digest=None):
+        """Guarda `data` uma única vez por conteúdo; retorna o hash"""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        try:
+            # Objeto reaproveitado fica "novo" e o gc concorrente não o apaga
+            os.utime(path)
+        except OSError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                write_atomic(path, zlib.compress(data, 6))
+            except OSError:
+                # Outro processo gravou o mesmo objeto primeiro
+                if not os.path.exists(path):
+                    raise
+        return digest
+
+    def get(self, digest):
+        """Conteúdo original de um objeto, conferindo a integridade"""
+        try:
+            with open(self.object_path(digest), 'rb') as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error) as exc:
+            raise PatchError(f"backup {digest[:12]} ausente ou corrompido no store: {exc}")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise PatchError(f"backup {digest[:12]} corrompido no store (hash não confere)")
+        return data
+
+    def refs_dir(self):
+        return os.path.join(self.root, 'refs')
+
+    def tree_refs_path(self, tree):
+        tree = os.path.abspath(tree)
+        return os.path.join(self.refs_dir(), short_digest(tree) + '.json')
+
+    def legacy_refs_path(self):
+        return os.path.join(self.root, LEGACY_REFS_NAME)
+
+    def load_legacy_refs(self):
+        """Referências do refs.json único de versões anteriores do store"""
+        try:
+            with open(self.legacy_refs_path(), 'r', encoding='utf-8') as f:
+                refs = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(refs, dict) or refs.get('format') != 1:
+            return {}
+        return refs.get('trees') or {}
+
+    def load_refs(self):
+        """Árvore do VLC -> hashes dos objetos que ela referencia"""
+        trees = self.load_legacy_refs()
+        directory = self.refs_dir()
+        names = os.listdir(directory) if os.path.isdir(directory) else []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                    refs = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(refs, dict) and refs.get('format') == STORE_FORMAT and refs.get('tree'):
+                trees[refs['tree']] = refs.get('objects') or []
+        return trees
+
+    def set_refs(self, tree, digests):
+        """Substitui as referências de uma árvore do VLC (só o arquivo dela)"""
+        tree = os.path.abspath(tree)
+        path = self.tree_refs_path(tree)
+        digests = sorted(set(digests))
+        if digests:
+            os.makedirs(self.refs_dir(), exist_ok=True)
+            data = json.dumps({'format': STORE_FORMAT, 'tree': tree, 'objects': digests}, indent=2)
+            write_atomic(path, data.encode('utf-8'))
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def refcounts(self):
+        counts = {}
+        for digests in self.load_refs().values():
+            for digest in digests:
+                counts[digest] = counts.get(digest, 0) + 1
+        return counts
+
+    def gc(self, grace_s=GC_GRACE_S):
+        """
+        Esquece árvores cujo manifesto sumiu e apaga os objetos que nenhum
+        manifesto vivo usa. Objetos e referências mais novos que `grace_s` e
+        temporários são mantidos: podem ser de uma série ainda em andamento.
+        Retorna (objetos removidos, bytes liberados)
+        """
+        now = time.time()
+        referenced = set()
+        for tree, digests in self.load_refs().items():
+            manifest = load_manifest(tree)
+            if manifest is not None:
+                referenced |= set(manifest.get('pristine', {}).values()) & set(digests)
+                continue
+            path = self.tree_refs_path(tree)
+            try:
+                if now - os.stat(path).st_mtime >= grace_s:
+                    os.remove(path)
+            except OSError:
+                pass
+
+        # O refs.json antigo é migrado para um arquivo por árvore
+        legacy = self.load_legacy_refs()
+        for tree, digests in legacy.items():
+            if load_manifest(tree) is not None and not os.path.exists(self.tree_refs_path(tree)):
+                self.set_refs(tree, digests)
+        if os.path.exists(self.legacy_refs_path()):
+            os.remove(self.legacy_refs_path())
+
+        removed, freed = 0, 0
+        objects_dir = os.path.join(self.root, 'objects')
+        if not os.path.isdir(objects_dir):
+            return removed, freed
+        for prefix in os.listdir(objects_dir):
+            prefix_dir = os.path.join(objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                if prefix + name in referenced or name.endswith(STAGED_SUFFIX):
+                    continue
+                path = os.path.join(prefix_dir, name)
+                try:
+                    st = os.stat(path)
+                    if now - st.st_mtime < grace_s:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                freed += st.st_size
+                removed += 1
+        return removed, freed
+
 
 def find_vlc_source():
     """Encontra o diretório do código fonte do VLC"""
@@ -38,73 +320,587 @@ def find_vlc_source():
     print("   Coloque o fonte em 'vlc/' na raiz deste repositório ou execute: .\\Build-VLC.ps1")
     return None
 
-def apply_compositor_patch():
-    """Aplica patch de compatibilidade no compositor DirectComposition"""
-    vlc_source = find_vlc_source()
+
+def patches_dir():
+    """Diretório patches/ do repositório"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(script_dir, '..', 'patches'))
+
+
+# === Patches da série ===
+
+class RegexPatch:
+    """Lista de substituições por regex aplicadas a um arquivo"""
+
+    def __init__(self, name, target, fixes, applied_marker):
+        self.name = name
+        self.target = target
+        self.fixes = fixes
+        self.applied_marker = applied_marker
+        self.id = f"{name}@{short_digest(repr(fixes))}"
+        self.targets = [target]
+
+    def apply(self, files):
+        """Aplica as correções em `files` (caminho -> conteúdo); retorna o status"""
+        content = files[self.target]
+        if self.applied_marker in content:
+            return 'already'
+
+        for pattern, replacement in self.fixes:
+            content = re.sub(pattern, replacement, content, flags=re.MULTILINE | re.DOTALL)
+        files[self.target] = content
+        return 'applied'
+
+
+class Hunk:
+    """Trecho de um patch unificado: linhas antigas e novas com contexto"""
+
+    def __init__(self, old_start, old_lines, new_lines):
+        self.old_start = old_start
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+
+
+def strip_diff_prefix(path):
+    """Remove o prefixo a/ ou b/ (equivalente ao patch -p1)"""
+    path = path.split('\t')[0].strip()
+    if path.startswith(('a/', 'b/')):
+        return path[2:]
+    return path
+
+
+def parse_unified_diff(text):
+    """Interpreta um patch unificado em [(arquivo, [Hunk, ...]), ...]"""
+    file_patches = []
+    current = None
+    old_path = None
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith('--- '):
+            old_path = strip_diff_prefix(line[4:])
+        elif line.startswith('+++ '):
+            new_path = strip_diff_prefix(line[4:])
+            # A série só altera arquivos existentes: criar ou apagar um
+            # arquivo não cabe no staging nem no store de backups
+            if DEV_NULL in (old_path, new_path):
+                kind = 'criação' if old_path == DEV_NULL else 'remoção'
+                path = new_path if old_path == DEV_NULL else old_path
+                raise PatchError(f"{kind} de arquivo não é suportada ({DEV_NULL}): {path}")
+            current = (new_path, [])
+            file_patches.append(current)
+            old_path = None
+        elif line.startswith('@@'):
+            match = HUNK_HEADER.match(line)
+            if not match or current is None:
+                raise PatchError(f"cabeçalho de hunk inválido: {line}")
+            old_count = int(match.group(2) or 1)
+            new_count = int(match.group(4) or 1)
+            old_lines, new_lines = [], []
+            i += 1
+            while i < len(lines) and (len(old_lines) < old_count or len(new_lines) < new_count):
+                body = lines[i]
+                i += 1
+                if body.startswith('\\'):
+                    continue
+                tag, content = body[:1], body[1:]
+                if tag in (' ', ''):
+                    old_lines.append(content)
+                    new_lines.append(content)
+                elif tag == '-':
+                    old_lines.append(content)
+                elif tag == '+':
+                    new_lines.append(content)
+                else:
+                    raise PatchError(f"linha inesperada no hunk: {body}")
+            current[1].append(Hunk(int(match.group(1)), old_lines, new_lines))
+            continue
+        i += 1
+
+    if not file_patches:
+        raise PatchError("nenhum arquivo encontrado no patch")
+    return file_patches
+
+
+def locate_block(lines, block, expected):
+    """Posição de `block` em `lines` mais próxima de `expected`, ou None"""
+    size = len(block)
+    if size == 0:
+        return min(max(expected, 0), len(lines))
+    positions = [
+        pos for pos in range(len(lines) - size + 1)
+        if lines[pos] == block[0] and lines[pos:pos + size] == block
+    ]
+    if not positions:
+        return None
+    return min(positions, key=lambda pos: abs(pos - expected))
+
+
+def apply_hunks(lines, hunks, reverse=False):
+    """Aplica os hunks em uma cópia de `lines`; None se algum não encaixar"""
+    result = list(lines)
+    offset = 0
+    for hunk in hunks:
+        old, new = (hunk.new_lines, hunk.old_lines) if reverse else (hunk.old_lines, hunk.new_lines)
+        pos = locate_block(result, old, hunk.old_start - 1 + offset)
+        if pos is None:
+            return None
+        result[pos:pos + len(old)] = new
+        offset = pos - (hunk.old_start - 1) + len(new) - len(old)
+    return result
+
+
+def split_lines(content):
+    """Divide o conteúdo em linhas, lembrando a quebra de linha usada"""
+    newline = '\r\n' if '\r\n' in content else '\n'
+    return content.splitlines(), newline, content.endswith(('\n', '\r'))
+
+
+def join_lines(lines, newline, trailing):
+    text = newline.join(lines)
+    return text + newline if trailing and lines else text
+
+
+class DiffPatch:
+    """
+    Patch unificado de patches/, aplicado em Python (sem spawn de `patch`).
+    Um patch opcional que não encaixa é pulado; os demais derrubam a série
+    """
+
+    def __init__(self, patch_file, optional=False):
+        self.optional = optional
+        try:
+            with open(patch_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError as exc:
+            raise PatchError(f"não foi possível ler {patch_file}: {exc}")
+        self.name = os.path.basename(patch_file)
+        self.id = f"{self.name}@{short_digest(text)}"
+        try:
+            self.file_patches = parse_unified_diff(text)
+        except PatchError as exc:
+            raise PatchError(f"{self.name}: {exc}")
+        self.targets = [path for path, _ in self.file_patches]
+
+    def apply(self, files):
+        """
+        Aplica o patch em `files`. Retorna 'already' se todos os hunks já
+        estão presentes e 'skipped' se um patch opcional não encaixa
+        """
+        updates = {}
+        for path, hunks in self.file_patches:
+            lines, newline, trailing = split_lines(files[path])
+            if apply_hunks(lines, hunks, reverse=True) is not None:
+                continue
+            patched = apply_hunks(lines, hunks)
+            if patched is None:
+                if self.optional:
+                    return 'skipped'
+                raise PatchError(f"{self.name}: hunks não encaixam em {path}")
+            updates[path] = join_lines(patched, newline, trailing)
+
+        if not updates:
+            return 'already'
+        files.update(updates)
+        return 'applied'
+
+
+def load_diff_series():
+    """Patches unificados da série: patches/series ou DIFF_SERIES"""
+    series_file = os.path.join(patches_dir(), SERIES_FILE)
+    if not os.path.exists(series_file):
+        return DIFF_SERIES
+
+    entries = []
+    with open(series_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if fields:
+                entries.append((fields[0], 'opcional' in fields[1:]))
+    return entries
+
+
+def build_series():
+    """Série completa, na ordem de aplicação"""
+    series = [
+        RegexPatch(
+            'qt610-compositor',
+            COMPOSITOR_FILE,
+            COMPOSITOR_FIXES,
+            'QT_VERSION >= QT_VERSION_CHECK(6, 10, 0)',
+        )
+    ]
+    for name, optional in load_diff_series():
+        patch_file = os.path.join(patches_dir(), name)
+        if optional and not os.path.exists(patch_file):
+            continue
+        series.append(DiffPatch(patch_file, optional=optional))
+    return series
+
+
+def group_series(series):
+    """
+    Agrupa os patches que compartilham arquivos. Grupos diferentes são
+    independentes e podem rodar em paralelo; dentro de um grupo a ordem da
+    série é mantida
+    """
+    groups = []
+    for position, patch in enumerate(series):
+        targets = set(patch.targets)
+        members = [(position, patch)]
+        for group in [g for g in groups if g[0] & targets]:
+            groups.remove(group)
+            targets |= group[0]
+            members.extend(group[1])
+        groups.append((targets, sorted(members, key=lambda member: member[0])))
+    return [[patch for _, patch in members] for _, members in groups]
+
+
+# === Manifesto ===
+
+def manifest_path(vlc_source):
+    return os.path.join(vlc_source, MANIFEST_NAME)
+
+
+def load_manifest(vlc_source):
+    try:
+        with open(manifest_path(vlc_source), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get('format') != MANIFEST_FORMAT:
+        return None
+    return manifest
+
+
+def save_manifest(vlc_source, manifest):
+    """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+    path = manifest_path(vlc_source)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def manifest_is_current(vlc_source, manifest, series):
+    """
+    Confere se a série e os arquivos tocados continuam como registrados.
+    O stat basta quando tamanho e mtime batem; senão o hash decide (e o mtime
+    novo é gravado, para a próxima execução voltar ao caminho rápido)
+    """
+    if manifest is None or manifest.get('series') != [patch.id for patch in series]:
+        return False
+
+    files = manifest.get('files') or {}
+    if not files:
+        return False
+
+    touched = False
+    for relative, recorded in files.items():
+        path = os.path.join(vlc_source, relative)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size == recorded.get('size') and st.st_mtime_ns == recorded.get('mtime_ns'):
+            continue
+        if st.st_size != recorded.get('size') or file_sha256(path) != recorded.get('sha256'):
+            return False
+        recorded['mtime_ns'] = st.st_mtime_ns
+        touched = True
+
+    if touched:
+        save_manifest(vlc_source, manifest)
+    return True
+
+
+# === Motor de patches ===
+
+STATUS_MESSAGES = {
+    'applied': "🔧 {name}: aplicado",
+    'already': "✓ {name}: já aplicado",
+    'skipped': "ℹ️ {name}: não se aplica a este fonte (não necessário)",
+}
+
+
+def group_targets(group):
+    targets = []
+    for patch in group:
+        for target in patch.targets:
+            if target not in targets:
+                targets.append(target)
+    return targets
+
+
+def apply_group(vlc_source, group, store_root):
+    """
+    Aplica um grupo de patches (roda em um processo do pool). Os arquivos
+    alterados são gravados ao lado do original com STAGED_SUFFIX e o conteúdo
+    original vai para o store de backups; nada no fonte muda até commit_staged
+    """
+    original = {}
+    original_digests = {}
+    for target in group_targets(group):
+        path = os.path.join(vlc_source, target)
+        if not os.path.exists(path):
+            raise PatchError(f"Arquivo não encontrado: {path}")
+        data = read_bytes(path)
+        try:
+            original[target] = data.decode('utf-8')
+        except UnicodeDecodeError as exc:
+            raise PatchError(f"{path} não está em UTF-8 (byte {exc.start}): {exc.reason}")
+        original_digests[target] = hashlib.sha256(data).hexdigest()
+
+    files = dict(original)
+    statuses = {patch.id: patch.apply(files) for patch in group}
+
+    results = {}
+    try:
+        for target, content in files.items():
+            data = content.encode('utf-8')
+            staged = None
+            if content != original[target]:
+                BackupStore(store_root).put(
+                    original[target].encode('utf-8'), original_digests[target]
+                )
+                staged = os.path.join(vlc_source, target) + STAGED_SUFFIX
+                with open(staged, 'wb') as f:
+                    f.write(data)
+            results[target] = {
+                'staged': staged,
+                'size': len(data),
+                'sha256': hashlib.sha256(data).hexdigest(),
+                'original_sha256': original_digests[target],
+            }
+    except BaseException:
+        discard_staged(results)
+        raise
+    return statuses, results
+
+
+def discard_staged(results):
+    """Remove os arquivos temporários de uma série que não vai ser aplicada"""
+    for result in results.values():
+        if result['staged'] and os.path.exists(result['staged']):
+            os.remove(result['staged'])
+
+
+def commit_staged(vlc_source, results, store):
+    """
+    Troca cada original pela versão temporária (rename atômico). Se algo
+    falhar no meio, os arquivos já trocados voltam a partir do store
+    """
+    committed = []
+    try:
+        for target, result in results.items():
+            if not result['staged']:
+                continue
+            path = os.path.join(vlc_source, target)
+            os.replace(result['staged'], path)
+            committed.append((path, result['original_sha256']))
+            print(f"🗄️ Backup de {target} no store: {result['original_sha256'][:12]}")
+    except BaseException:
+        for path, digest in committed:
+            write_atomic(path, store.get(digest))
+        discard_staged(results)
+        raise
+
+
+def run_groups(vlc_source, groups, jobs, store):
+    """Aplica os grupos, em paralelo quando há mais de um; falha = nada gravado"""
+    outcomes = []
+    error = None
+    if jobs > 1 and len(groups) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(groups))) as pool:
+            futures = [pool.submit(apply_group, vlc_source, group, store.root) for group in groups]
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except (PatchError, OSError) as exc:
+                    error = error or exc
+    else:
+        for group in groups:
+            try:
+                outcomes.append(apply_group(vlc_source, group, store.root))
+            except (PatchError, OSError) as exc:
+                error = exc
+                break
+
+    if error is not None:
+        for _, results in outcomes:
+            discard_staged(results)
+        raise error
+    return outcomes
+
+
+def pristine_digests(vlc_source, results, previous, store):
+    """
+    Hash do conteúdo original de cada arquivo que a série alterou: o do
+    manifesto anterior se o arquivo ainda era a versão patchada por nós, o do
+    conteúdo de agora se foi alterado nesta execução, ou o de uma cópia
+    `.backup` antiga (que é migrada para o store e removida)
+    """
+    previous = previous or {}
+    previous_files = previous.get('files', {})
+    previous_pristine = previous.get('pristine', {})
+    pristine = {}
+    for target, result in results.items():
+        recorded = previous_files.get(target, {})
+        if target in previous_pristine and result['original_sha256'] == recorded.get('sha256'):
+            pristine[target] = previous_pristine[target]
+        elif result['staged']:
+            pristine[target] = result['original_sha256']
+
+        legacy = os.path.join(vlc_source, target) + LEGACY_BACKUP_SUFFIX
+        if os.path.exists(legacy):
+            digest = store.put(read_bytes(legacy))
+            pristine.setdefault(target, digest)
+            if pristine[target] == digest:
+                os.remove(legacy)
+                print(f"🧹 {target}{LEGACY_BACKUP_SUFFIX} migrado para o store")
+    return pristine
+
+
+def apply_series(vlc_source, series, jobs=None, store=None, previous=None):
+    """Aplica a série inteira (ou nada), grava os arquivos alterados e o manifesto"""
+    jobs = jobs or os.cpu_count() or 1
+    store = store or BackupStore(default_store_dir())
+    outcomes = run_groups(vlc_source, group_series(series), jobs, store)
+
+    statuses = {}
+    results = {}
+    for group_statuses, group_results in outcomes:
+        statuses.update(group_statuses)
+        results.update(group_results)
+
+    for patch in series:
+        print("   " + STATUS_MESSAGES[statuses[patch.id]].format(name=patch.name))
+
+    commit_staged(vlc_source, results, store)
+    pristine = pristine_digests(vlc_source, results, previous, store)
+
+    files = {}
+    for target, result in results.items():
+        st = os.stat(os.path.join(vlc_source, target))
+        files[target] = {'size': result['size'], 'mtime_ns': st.st_mtime_ns, 'sha256': result['sha256']}
+    save_manifest(vlc_source, {
+        'format': MANIFEST_FORMAT,
+        'series': [patch.id for patch in series],
+        'patches': statuses,
+        'files': files,
+        'pristine': pristine,
+        'store': os.path.abspath(store.root),
+    })
+    store.set_refs(vlc_source, pristine.values())
+    return statuses
+
+
+def apply_compatibility_patches(vlc_source=None, force=False, jobs=None, store=None):
+    """Aplica a série de patches de compatibilidade, se algo mudou"""
+    started = time.perf_counter()
+    vlc_source = vlc_source or find_vlc_source()
     if not vlc_source:
         return False
-    
-    compositor_file = os.path.join(vlc_source, "modules/gui/qt/maininterface/compositor_dcomp.cpp")
-    
-    if not os.path.exists(compositor_file):
-        print(f"❌ ERRO: Arquivo não encontrado: {compositor_file}")
+
+    try:
+        series = build_series()
+        manifest = load_manifest(vlc_source)
+        if not force and manifest_is_current(vlc_source, manifest, series):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"✅ Patches já aplicados (manifesto confere, {elapsed_ms:.0f} ms)")
+            return True
+
+        print("🔧 Aplicando patches de compatibilidade Qt 6.10+...")
+        apply_series(vlc_source, series, jobs, store, previous=manifest)
+    except (PatchError, OSError) as exc:
+        print(f"❌ ERRO: {exc}")
+        print("↩️ Nenhum arquivo do fonte foi alterado (série desfeita)")
         return False
-    
-    # Ler arquivo
-    with open(compositor_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Verificar se patch já foi aplicado
-    if 'QT_VERSION >= QT_VERSION_CHECK(6, 10, 0)' in content:
-        print("✅ Patch Qt 6.10+ já aplicado!")
+
+    print("✅ Patches aplicados com sucesso!")
+    print(f"📋 Manifesto: {manifest_path(vlc_source)}")
+    return True
+
+
+def restore_pristine(vlc_source=None, manifest_file=None, store=None):
+    """
+    Devolve os arquivos de um manifesto ao conteúdo original guardado no
+    store (sem reclonar o VLC) e remove o manifesto da árvore
+    """
+    if manifest_file:
+        vlc_source = os.path.dirname(os.path.abspath(manifest_file))
+    vlc_source = vlc_source or find_vlc_source()
+    if not vlc_source:
+        return False
+
+    manifest = load_manifest(vlc_source)
+    if manifest is None:
+        print(f"ℹ️ Nenhum manifesto de patches em {vlc_source}; nada a restaurar")
         return True
-    
-    print("🔧 Aplicando patch de compatibilidade Qt 6.10+...")
-    
-    # Backup
-    backup_file = compositor_file + ".backup"
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    # Aplicar patches nas linhas problemáticas
-    fixes = [
-        # Linha 108: Início da função init() - adicionar check de versão
-        (
-            r'(bool CompositorDirectComposition::init\(\)\s*\{)',
-            r'\1\n#if QT_VERSION >= QT_VERSION_CHECK(6, 10, 0)\n    // DirectComposition not supported with Qt 6.10+ due to QRhi API changes\n    msg_Warn(m_intf, "DirectComposition disabled for Qt 6.10+, using Win7 compositor fallback");\n    return false;\n#else'
-        ),
-        
-        # Linha 177: Remover chamada para implementation()
-        (
-            r'QRhiImplementation\* const rhiImplementation = rhi->implementation\(\);',
-            r'// Removed for Qt 6.10+ compatibility - see init() method'
-        ),
-        
-        # Últimas linhas da função init - fechar #else
-        (
-            r'(m_videoVisual->SetOffsetY\(m_videoPosition\.y\(\)\);\s*return true;)',
-            r'\1\n#endif'
-        )
-    ]
-    
-    # Aplicar todas as correções
-    for pattern, replacement in fixes:
-        content = re.sub(pattern, replacement, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # Escrever arquivo corrigido
-    with open(compositor_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    print(f"✅ Patch aplicado com sucesso!")
-    print(f"📄 Backup salvo em: {backup_file}")
+    store = store or BackupStore(manifest.get('store') or default_store_dir())
+
+    pristine = manifest.get('pristine', {})
+    try:
+        # Confere todos os objetos antes de tocar no fonte
+        contents = {target: store.get(digest) for target, digest in pristine.items()}
+        for target, data in contents.items():
+            write_atomic(os.path.join(vlc_source, target), data)
+            print(f"↩️ {target} restaurado ({pristine[target][:12]})")
+        os.remove(manifest_path(vlc_source))
+        store.set_refs(vlc_source, [])
+    except (PatchError, OSError) as exc:
+        print(f"❌ ERRO: {exc}")
+        return False
+
+    print(f"✅ {len(contents)} arquivo(s) restaurado(s) em {vlc_source}")
     return True
 
-def main():
+
+def collect_garbage(store=None):
+    """Remove do store os backups que nenhuma árvore referencia"""
+    store = store or BackupStore(default_store_dir())
+    try:
+        removed, freed = store.gc()
+    except OSError as exc:
+        print(f"❌ ERRO: {exc}")
+        return False
+    referenced = store.refcounts()
+    print(f"🧹 {removed} objeto(s) removido(s), {freed / 1024:.1f} KiB liberados")
+    print(f"🗄️ {len(referenced)} objeto(s) em uso por {len(store.load_refs())} árvore(s) do VLC")
+    return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica os patches de compatibilidade Qt no fonte do VLC.")
+    parser.add_argument(
+        'command',
+        nargs='?',
+        default='apply',
+        choices=('apply', 'restore', 'gc'),
+        help="apply (padrão): aplicar a série; restore: voltar aos fontes originais; gc: limpar o store",
+    )
+    parser.add_argument('--source', help="Diretório do fonte do VLC (padrão: detectar automaticamente)")
+    parser.add_argument('--manifest', help="Manifesto a restaurar (restore; padrão: o do fonte)")
+    parser.add_argument('--store', help=f"Store de backups (padrão: cache do usuário ou ${STORE_ENV_VAR})")
+    parser.add_argument('--force', action='store_true', help="Ignorar o manifesto e reaplicar a série")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="Processos para aplicar a série (padrão: núcleos)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = BackupStore(args.store) if args.store else None
+    if args.command == 'restore':
+        return 0 if restore_pristine(args.source, args.manifest, store) else 1
+    if args.command == 'gc':
+        return 0 if collect_garbage(store) else 1
+
     print("=" * 60)
     print("🛠️  VLC Qt 6.10+ Compatibility Patcher")
     print("=" * 60)
-    
-    if apply_compositor_patch():
+
+    if apply_compatibility_patches(args.source, force=args.force, jobs=args.jobs, store=store):
         print("\n✅ SUCESSO: Todos os patches aplicados!")
         print("   Agora você pode executar a compilação normalmente.")
         return 0
@@ -113,4 +909,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Torna tools/ e scripts/ importáveis pelos testes."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for directory in ("tools", "scripts"):
+    sys.path.insert(0, str(ROOT / directory))
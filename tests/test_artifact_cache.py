@@ -0,0 +1,128 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import artifact_cache as cache
+
+
+def make_prefix(root: Path, files: dict) -> Path:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return root
+
+
+def test_store_and_restore_roundtrip(tmp_path):
+    store = cache.ArtifactStore(tmp_path / "store")
+    prefix = make_prefix(tmp_path / "prefix", {"bin/vlc.exe": b"vlc", "lib/a.dll": b"a"})
+    entry = cache.store_prefix(store, "k1", {}, prefix, jobs=2)
+
+    target = tmp_path / "restored"
+    cache.restore_prefix(store, store.load_entry("k1"), target, jobs=2)
+    assert (target / "bin/vlc.exe").read_bytes() == b"vlc"
+    assert (target / "lib/a.dll").read_bytes() == b"a"
+    assert entry.size == 4
+    assert not (tmp_path / "restored.restoring").exists()
+
+
+def test_store_duplicate_files_in_parallel(tmp_path):
+    store = cache.ArtifactStore(tmp_path / "store")
+    content = os.urandom(512 * 1024)
+    files = {f"plugins/{index}/libsame_plugin.dll": content for index in range(64)}
+    prefix = make_prefix(tmp_path / "prefix", files)
+    entry = cache.store_prefix(store, "k1", {}, prefix, jobs=16)
+
+    assert len({item.digest for item in entry.files}) == 1
+    assert len(store.object_usage()) == 1
+    assert not list((store.root / "objects").glob("*/*.tmp"))
+
+
+def test_corrupt_object_is_discarded(tmp_path):
+    store = cache.ArtifactStore(tmp_path / "store")
+    prefix = make_prefix(tmp_path / "prefix", {"a": b"content"})
+    entry = cache.store_prefix(store, "k1", {}, prefix, jobs=1)
+    digest = entry.files[0].digest
+    store.object_path(digest).write_bytes(b"garbage")
+
+    with pytest.raises(cache.CacheError):
+        store.read_object(digest)
+    assert not store.has_object(digest)
+
+
+def test_restore_swap_failure_keeps_prefix(tmp_path, monkeypatch):
+    store = cache.ArtifactStore(tmp_path / "store")
+    source = make_prefix(tmp_path / "source", {"a": b"new"})
+    entry = cache.store_prefix(store, "k1", {}, source, jobs=1)
+    prefix = make_prefix(tmp_path / "prefix", {"a": b"old"})
+
+    real_replace = os.replace
+
+    def locked_replace(src, dst):
+        if Path(src).name.endswith(".restoring"):
+            raise PermissionError("arquivo em uso")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(cache.os, "replace", locked_replace)
+    with pytest.raises(OSError):
+        cache.restore_prefix(store, entry, prefix, jobs=1)
+    assert (prefix / "a").read_bytes() == b"old"
+    assert not (tmp_path / "prefix.restoring").exists()
+
+
+def restore_args(tmp_path: Path) -> argparse.Namespace:
+    return argparse.Namespace(
+        cache_dir=tmp_path / "store", shared_dir=None, prefix=tmp_path / "prefix", jobs=1
+    )
+
+
+def test_command_restore_keeps_entry_on_os_error(tmp_path, monkeypatch):
+    store = cache.ArtifactStore(tmp_path / "store")
+    cache.store_prefix(store, "k1", {}, make_prefix(tmp_path / "src", {"a": b"x"}), jobs=1)
+    monkeypatch.setattr(cache, "resolve_key", lambda args: ("k1", {}))
+
+    def locked(*args, **kwargs):
+        raise PermissionError("vlc.exe em uso")
+
+    monkeypatch.setattr(cache, "restore_entry", locked)
+    assert cache.command_restore(restore_args(tmp_path)) == 1
+    assert store.load_entry("k1") is not None
+
+
+def test_command_restore_drops_corrupt_entry(tmp_path, monkeypatch):
+    store = cache.ArtifactStore(tmp_path / "store")
+    entry = cache.store_prefix(store, "k1", {}, make_prefix(tmp_path / "src", {"a": b"x"}), jobs=1)
+    store.object_path(entry.files[0].digest).write_bytes(b"garbage")
+    monkeypatch.setattr(cache, "resolve_key", lambda args: ("k1", {}))
+
+    assert cache.command_restore(restore_args(tmp_path)) == 1
+    assert store.load_entry("k1") is None
+
+
+def test_restore_from_shared_store(tmp_path):
+    local = cache.ArtifactStore(tmp_path / "local")
+    shared = cache.ArtifactStore(tmp_path / "shared")
+    entry = cache.store_prefix(shared, "k1", {}, make_prefix(tmp_path / "src", {"a": b"x"}), jobs=1)
+
+    cache.restore_entry(shared, local, entry, tmp_path / "prefix", jobs=1)
+    assert (tmp_path / "prefix" / "a").read_bytes() == b"x"
+    assert local.load_entry("k1") is not None
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    store = cache.ArtifactStore(tmp_path / "store")
+    cache.store_prefix(store, "old", {}, make_prefix(tmp_path / "p1", {"a": os.urandom(4096)}), jobs=1)
+    cache.store_prefix(store, "new", {}, make_prefix(tmp_path / "p2", {"b": os.urandom(4096)}), jobs=1)
+    past = time.time() - 10 * cache.GC_GRACE_S
+    os.utime(store.entry_path("old"), (past, past))
+    for path in (store.root / "objects").glob("*/*"):
+        os.utime(path, (past, past))
+
+    removed, freed = store.evict(max_bytes=6000)
+    assert removed == 1
+    assert freed > 0
+    assert store.load_entry("old") is None
+    assert store.load_entry("new") is not None
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+import bench_vlc_decode as bench
+
+
+STATS_BLOCK = """\
++----[ begin of statistical info ]
++-[Video Decoding]
+| video decoded    :      120
+| frames displayed :      118
+| frames late      :        3
+| frames lost      :        2
++-[Audio Decoding]
+| audio decoded    :      999
+| buffers lost     :        7
++----[ end of statistical info ]
+"""
+
+
+def feed(parser, text):
+    for line in text.splitlines():
+        parser.feed(line)
+
+
+def test_stats_parser_reads_video_section_only():
+    parser = bench.StatsParser()
+    feed(parser, STATS_BLOCK)
+    assert parser.latest == {"decoded": 120, "displayed": 118, "late": 3, "lost": 2}
+    assert parser.latest_at is not None
+
+
+def test_stats_parser_ignores_incomplete_block():
+    parser = bench.StatsParser()
+    feed(parser, STATS_BLOCK)
+    feed(parser, STATS_BLOCK.replace("120", "240").rsplit("+----[ end", 1)[0])
+    assert parser.latest["decoded"] == 120
+
+
+def test_stats_parser_keeps_latest_block():
+    parser = bench.StatsParser()
+    feed(parser, STATS_BLOCK)
+    feed(parser, STATS_BLOCK.replace("120", "240"))
+    assert parser.latest["decoded"] == 240
+
+
+def test_throughput_mode_is_unpaced_by_default():
+    args = bench.parse_args([])
+    assert args.mode == "throughput"
+    assert "--no-audio" in bench.MODE_ARGS["throughput"]
+    assert bench.MODE_ARGS["realtime"] == []
+
+
+def test_baseline_with_other_parameters_is_rejected():
+    parameters = {"mode": "throughput", "repeat": 1}
+    baseline = {"format": bench.BENCH_FORMAT, "parameters": {"mode": "realtime", "repeat": 1}}
+    assert bench.baseline_mismatch(parameters, baseline) == ["mode: 'realtime' no baseline, 'throughput' agora"]
+    assert bench.baseline_mismatch(parameters, {"format": bench.BENCH_FORMAT, "parameters": dict(parameters)}) == []
+    assert bench.baseline_mismatch(parameters, {"format": 1, "parameters": dict(parameters)})
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    result = bench.ClipResult(clip="a.mp4", wall_s=1.0, exit_code=0, decoded_fps=70.0, cpu_s=1.0, lost_frames=0)
+    baseline = {"a.mp4": {"decoded_fps": 100.0, "cpu_s": 1.05, "lost_frames": 0}}
+    assert bench.compare_with_baseline([result], baseline, 0.2) == ["a.mp4: decoded_fps 70 vs 100 (-30%)"]
+    assert bench.compare_with_baseline([result], baseline, 0.4) == []
+
+
+def test_control_args_per_channel():
+    assert "--rc-fake-tty" in bench.control_args("stdio")
+    socket_args = bench.control_args("socket", 4212)
+    assert "--rc-host=127.0.0.1:4212" in socket_args
+    assert "--rc-fake-tty" not in socket_args
+    assert "--rc-fake-tty" not in bench.VLC_BASE_ARGS
+
+
+@pytest.mark.skipif(os.name == "nt", reason="o vlc sintético é um script com shebang")
+@pytest.mark.parametrize("control", bench.CONTROL_CHANNELS)
+def test_run_clip_collects_stats_over_each_channel(tmp_path, monkeypatch, control):
+    monkeypatch.setenv("VLC_STUB_SECONDS", "0.6")
+    vlc = bench.create_stub(tmp_path)
+    clip = sorted((tmp_path / "clips").iterdir())[0]
+    result = bench.run_clip(vlc, clip, extra_args=[], interval=0.1, timeout=30, control=control)
+    assert result.exit_code == 0
+    assert result.decoded_frames is not None
+
+
+@pytest.mark.skipif(os.name == "nt", reason="o vlc sintético é um script com shebang")
+def test_missing_wait4_is_reported(monkeypatch, capsys):
+    monkeypatch.setenv("VLC_STUB_SECONDS", "0.2")
+    monkeypatch.delattr(bench.os, "wait4")
+    assert bench.main(["--stub", "--interval", "0.1"]) == 0
+    output = capsys.readouterr().out
+    assert "CPU e RSS indisponíveis" in output
@@ -0,0 +1,101 @@
+import argparse
+import os
+import signal
+from pathlib import Path
+
+import pytest
+
+import build_driver as driver
+
+
+@pytest.fixture
+def args():
+    return argparse.Namespace(reserve_mb=0.0, max_jobs=8)
+
+
+@pytest.fixture
+def ninja_calls(monkeypatch):
+    """Substitui o ninja por resultados pré-definidos e registra os -j usados."""
+    calls = []
+    results = []
+
+    def fake_run_ninja(build_dir, jobs, outputs=()):
+        calls.append(jobs)
+        return results.pop(0)
+
+    monkeypatch.setattr(driver, "run_ninja", fake_run_ninja)
+    monkeypatch.setattr(driver, "memory_budget_mb", lambda reserve: None)
+    return calls, results
+
+
+def batch(target="modules/foo"):
+    return driver.Batch([target], [f"{target}.p/a.c.o"], per_job_mb=100.0)
+
+
+def test_compile_error_is_not_retried(args, ninja_calls):
+    calls, results = ninja_calls
+    results.append(driver.NinjaRun(1, 200.0, out_of_memory=False))
+    assert driver.run_batch(Path("build"), batch(), {}, args) == 1
+    assert calls == [8]
+
+
+def test_out_of_memory_is_retried_with_half_the_jobs(args, ninja_calls):
+    calls, results = ninja_calls
+    results += [driver.NinjaRun(1, 900.0, out_of_memory=True), driver.NinjaRun(0, 700.0)]
+    table = {}
+    assert driver.run_batch(Path("build"), batch(), table, args) == 0
+    assert calls == [8, 4]
+    assert table["modules/foo"].exact
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "gcc: fatal error: Killed signal terminated program cc1plus",
+        "c++: internal compiler error: Killed (program cc1plus)",
+        "cc1plus.exe: out of memory allocating 65536 bytes",
+        "virtual memory exhausted: Cannot allocate memory",
+    ],
+)
+def test_out_of_memory_messages(line):
+    assert driver.OUT_OF_MEMORY.search(line)
+
+
+def test_plain_compile_error_is_not_out_of_memory():
+    assert not driver.OUT_OF_MEMORY.search("foo.c:12:3: error: unknown type name 'bar'")
+    assert not driver.looks_out_of_memory(1, False)
+    assert not driver.looks_out_of_memory(0, True)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="sinais POSIX")
+def test_sigkill_counts_as_out_of_memory():
+    assert driver.looks_out_of_memory(-signal.SIGKILL, False)
+
+
+def test_learn_exact_peak_decays_slowly():
+    table = {"t": driver.TargetMemory(1000.0, True, 1)}
+    driver.learn(table, driver.Batch(["t"]), 200.0)
+    assert table["t"].peak_mb == pytest.approx(800.0)
+    driver.learn(table, driver.Batch(["t"]), 1200.0)
+    assert table["t"].peak_mb == 1200.0
+
+
+def test_learn_shared_batch_sets_upper_bound():
+    table = {}
+    driver.learn(table, driver.Batch(["a", "b"], per_job_mb=400.0), 900.0)
+    assert table["a"] == driver.TargetMemory(900.0, False, 1)
+    driver.learn(table, driver.Batch(["a", "b"], per_job_mb=400.0), 300.0)
+    assert table["a"].samples == 1
+
+
+def test_jobs_for_memory_budget():
+    assert driver.jobs_for(1000.0, None, 8) == 8
+    assert driver.jobs_for(1000.0, 2500.0, 8) == 2
+    assert driver.jobs_for(1000.0, 100.0, 8) == 1
+
+
+def test_chunk_outputs_respects_command_limit():
+    outputs = [f"modules/x.p/{index:05d}.c.o" for index in range(3000)]
+    chunks = driver.chunk_outputs(outputs)
+    assert sum(len(chunk) for chunk in chunks) == len(outputs)
+    assert all(sum(len(item) + 1 for item in chunk) <= driver.MAX_COMMAND_CHARS for chunk in chunks)
@@ -0,0 +1,59 @@
+import build_history as history
+
+
+def host(name: str = "pc", cores: int = 8) -> history.HostInfo:
+    return history.HostInfo(
+        hostname=name, platform="Windows", cores=cores, total_ram_gb=32.0, available_ram_gb=16.0
+    )
+
+
+def record(minutes: float, kind: str, *, name: str = "pc", opts: str = "o1", status: str = "ok"):
+    return history.BuildRecord(
+        started_at=0.0,
+        duration_s=minutes * 60,
+        status=status,
+        kind=kind,
+        host=host(name),
+        vlc_commit=None,
+        options_hash=opts,
+    )
+
+
+def test_never_mixes_build_kinds():
+    records = [record(60, "clean")] + [record(2, "incremental") for _ in range(4)]
+    assert history.predict(records, host(), "o1", "clean") is None
+
+
+def test_prefers_strictest_criterion():
+    records = [record(30, "clean", opts="other") for _ in range(5)]
+    records += [record(60, "clean"), record(62, "clean")]
+    prediction = history.predict(records, host(), "o1", "clean")
+    assert prediction.basis == "mesmo host, opções e tipo"
+    assert prediction.samples == 2
+    assert 59 * 60 < prediction.expected_s < 63 * 60
+
+
+def test_falls_back_to_other_hosts_of_same_kind():
+    records = [record(40, "clean", name="ci"), record(50, "clean", name="ci"), record(3, "incremental")]
+    chosen, basis = history.similar_builds(records, host(), "o1", "clean")
+    assert basis == "mesmo tipo, outros hosts"
+    assert len(chosen) == 2
+
+
+def test_failed_builds_are_ignored():
+    records = [record(60, "clean"), record(1, "clean", status="fail"), record(1, "clean", status="fail")]
+    assert history.predict(records, host(), "o1", "clean") is None
+
+
+def test_duration_scaled_by_cores():
+    records = [record(60, "clean"), record(60, "clean")]
+    prediction = history.predict(records, host(cores=16), "o1", "clean")
+    assert round(prediction.expected_s) == 30 * 60
+    assert prediction.low_s <= prediction.expected_s <= prediction.high_s
+
+
+def test_prediction_window_keeps_recent_builds():
+    records = [record(100, "clean") for _ in range(30)] + [record(10, "clean") for _ in range(history.PREDICTION_WINDOW)]
+    chosen, _ = history.similar_builds(records, host(), "o1", "clean")
+    assert len(chosen) == history.PREDICTION_WINDOW
+    assert all(item.duration_s == 600 for item in chosen)
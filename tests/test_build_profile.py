@@ -0,0 +1,83 @@
+import build_profile
+
+
+OPTIONS_TXT = """\
+# Comentário com option('falsa', type: 'feature')
+option('qt', type: 'feature', value: 'auto', description: 'Qt interface plugin')
+option('avcodec', type: 'feature', value: 'enabled',
+    description: 'libavcodec decoder (with (nested) parens)')
+option('swscale', type: 'feature', description: 'libswscale image scaling and conversion')
+option('zlib', type: 'feature', value: 'auto', description: 'zlib compression')
+option('x11', type: 'feature', value: 'auto', description: 'X11 support')
+option('vulkan', type: 'feature', value: 'disabled', description: 'Vulkan video output')
+option('run_as_root', type: 'boolean', value: false, description: 'Allow running as root')
+option('lua', type: 'boolean', value: true)
+option('vendor', type: 'string', value: 'it\\'s me')
+"""
+
+
+def write_options(tmp_path):
+    path = tmp_path / "meson_options.txt"
+    path.write_text(OPTIONS_TXT, encoding="utf-8")
+    return build_profile.parse_meson_options(path)
+
+
+def test_parse_meson_options(tmp_path):
+    options = write_options(tmp_path)
+    assert "falsa" not in options
+    assert options["qt"].value == "auto"
+    assert options["avcodec"].value == "enabled"
+    assert options["avcodec"].description.startswith("libavcodec decoder")
+    assert options["run_as_root"].type == "boolean"
+    assert options["run_as_root"].value == "false"
+    assert options["vendor"].type == "string"
+
+
+def test_feature_without_value_defaults_to_auto(tmp_path):
+    options = write_options(tmp_path)
+    assert options["swscale"].value == "auto"
+
+
+def plan(tmp_path, profile):
+    return build_profile.plan_profile(profile, write_options(tmp_path), None, cores=4)
+
+
+def test_plan_keeps_base_options_enabled(tmp_path):
+    result = plan(tmp_path, {"features": {"interfaces": ["qt"]}})
+    assert result.args[0] == "-Dauto_features=disabled"
+    assert "-Dswscale=enabled" in result.args
+    assert "-Dzlib=enabled" in result.args
+    assert "-Dqt=enabled" in result.args
+    # Opção padrão 'enabled' que o perfil não pede é desligada explicitamente
+    assert "-Davcodec=disabled" in result.args
+    # Base inexistente nesta árvore (freetype, libxml2) não vira aviso
+    assert result.missing == []
+
+
+def test_plan_warns_about_dropped_non_plugin_options(tmp_path):
+    result = plan(tmp_path, {"features": {}})
+    assert result.unclear_drops == ["x11"]
+    assert "qt" in result.disabled
+    assert "qt" not in result.unclear_drops
+
+
+def test_profile_can_override_base(tmp_path):
+    result = plan(tmp_path, {"base": [], "features": {}})
+    assert "-Dswscale=enabled" not in result.args
+    assert "swscale" in result.disabled
+
+
+def test_unknown_features_and_missing_options(tmp_path):
+    result = plan(tmp_path, {"features": {"codecs": ["nope"], "demuxers": ["bluray"]}})
+    assert result.unknown_features == ["codecs/nope"]
+    assert result.missing == ["bluray"]
+
+
+def test_boolean_options_are_switched_on(tmp_path):
+    result = plan(tmp_path, {"enable": ["lua"], "features": {}})
+    assert "-Dlua=true" in result.args
+
+
+def test_savings_fall_back_without_ninja_log(tmp_path):
+    result = plan(tmp_path, {"features": {}})
+    assert result.saved_cpu_s == len(result.disabled) * build_profile.FALLBACK_OPTION_CPU_S
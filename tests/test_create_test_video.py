@@ -0,0 +1,72 @@
+import argparse
+import socket
+import sys
+import threading
+
+import pytest
+
+import create_test_video as ctv
+
+
+def python_command(code: str) -> list:
+    return [sys.executable, "-c", code]
+
+
+WRITE_AND_EXIT = "import sys; sys.stdout.buffer.write(b'x' * 100); sys.stdout.flush(); sys.exit({code})"
+
+
+def test_stream_pump_returns_bytes_sent():
+    received = []
+    sent = ctv.StreamPump(python_command(WRITE_AND_EXIT.format(code=0)), 1024 * 1024).run(received.append)
+    assert sent == 100
+    assert b"".join(received) == b"x" * 100
+
+
+def test_stream_pump_raises_when_ffmpeg_fails():
+    with pytest.raises(RuntimeError, match="codigo 1"):
+        ctv.StreamPump(python_command(WRITE_AND_EXIT.format(code=1)), 1024 * 1024).run(lambda chunk: None)
+
+
+def test_stream_pump_does_not_blame_ffmpeg_for_closed_consumer():
+    command = python_command("import sys\nwhile True: sys.stdout.buffer.write(b'x' * 65536)")
+
+    def closed(chunk):
+        raise BrokenPipeError()
+
+    with pytest.raises(BrokenPipeError):
+        ctv.StreamPump(command, 1024 * 1024).run(closed)
+
+
+def stream_args(tmp_target: str) -> argparse.Namespace:
+    return argparse.Namespace(
+        codec="hevc", resolution="1280x720", fps=30, bitrate="2M", duration=1, realtime=False,
+        buffer_mb=1, stream=tmp_target, once=True,
+    )
+
+
+def test_stream_media_exits_1_when_ffmpeg_fails(monkeypatch, capsysbinary):
+    monkeypatch.setattr(ctv, "stream_args", lambda *args: python_command(WRITE_AND_EXIT.format(code=1)))
+    assert ctv.stream_media(stream_args("-")) == 1
+
+
+def test_tcp_server_logs_failure(monkeypatch, capsys):
+    monkeypatch.setattr(ctv, "stream_args", lambda *args: python_command(WRITE_AND_EXIT.format(code=1)))
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    result = {}
+    server = threading.Thread(
+        target=lambda: result.setdefault("code", ctv.stream_media(stream_args(f"tcp://127.0.0.1:{port}")))
+    )
+    server.start()
+    for _ in range(100):
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=5) as client:
+                while client.recv(4096):
+                    pass
+            break
+        except ConnectionRefusedError:
+            threading.Event().wait(0.05)
+    server.join(timeout=30)
+    assert result["code"] == 1
+    assert "Stream falhou" in capsys.readouterr().err
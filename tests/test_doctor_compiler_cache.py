@@ -0,0 +1,24 @@
+import pytest
+
+import vlc_build_doctor as doctor
+
+
+@pytest.mark.parametrize("msystem, package", [
+    ("", "mingw-w64-ucrt-x86_64-ccache"),
+    ("UCRT64", "mingw-w64-ucrt-x86_64-ccache"),
+    ("MINGW64", "mingw-w64-x86_64-ccache"),
+    ("CLANG64", "mingw-w64-clang-x86_64-ccache"),
+])
+def test_ccache_hint_follows_msys2_environment(monkeypatch, msystem, package):
+    monkeypatch.setenv("MSYSTEM", msystem)
+    hints = []
+
+    def check_command(label, *args, hint=None, **kwargs):
+        hints.append(hint)
+        return doctor.CheckOutcome(name=label, status="fail", version=None, location=None, message=hint)
+
+    monkeypatch.setattr(doctor, "check_command", check_command)
+    outcome = doctor.check_compiler_cache()
+    assert outcome.status == "warn"
+    assert outcome.message.endswith(f"pacman -S {package}")
+    assert hints == [f"Instale com: pacman -S {package}"]
@@ -0,0 +1,57 @@
+import io
+import zipfile
+
+import pytest
+
+import vlc_build_doctor as doctor
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    doctor.set_tool_index(doctor.ToolIndex())
+    doctor.set_metadata_detection(True)
+    # Simula o VERSIONINFO do lançador do distlib
+    monkeypatch.setattr(doctor, "read_pe_version", lambda path: "1.1.0.14")
+    yield
+    doctor.set_tool_index(None)
+
+
+def launcher_bytes() -> bytes:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as bundle:
+        bundle.writestr("__main__.py", "import ninja; ninja.ninja()")
+    return b"MZ" + b"\0" * 512 + archive.getvalue()
+
+
+def test_appended_zip_is_a_launcher(tmp_path):
+    exe = tmp_path / "ninja.exe"
+    exe.write_bytes(launcher_bytes())
+    assert doctor.is_script_launcher(exe)
+    assert doctor.read_version_metadata(exe) is None
+
+
+def test_launcher_version_comes_from_dist_info(tmp_path):
+    scripts = tmp_path / "venv" / "Scripts"
+    site = tmp_path / "venv" / "Lib" / "site-packages"
+    scripts.mkdir(parents=True)
+    (site / "cmake-3.29.2.dist-info").mkdir(parents=True)
+    exe = scripts / "cmake.exe"
+    exe.write_bytes(b"MZ" + b"\0" * 512)
+
+    assert doctor.is_script_launcher(exe)
+    assert doctor.read_version_metadata(exe) == ("3.29.2", "pip cmake-3.29.2.dist-info")
+
+
+def test_regular_exe_uses_pe_version(tmp_path):
+    exe = tmp_path / "bin" / "ninja.exe"
+    exe.parent.mkdir()
+    exe.write_bytes(b"MZ" + b"\0" * 512)
+    assert not doctor.is_script_launcher(exe)
+    assert doctor.read_version_metadata(exe) == ("1.1.0.14", "PE VERSIONINFO")
+
+
+def test_metadata_detection_can_be_disabled(tmp_path):
+    exe = tmp_path / "tool.exe"
+    exe.write_bytes(b"MZ")
+    doctor.set_metadata_detection(False)
+    assert doctor.read_version_metadata(exe) is None
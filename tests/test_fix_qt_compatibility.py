@@ -0,0 +1,239 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import fix_qt_compatibility as fixqt
+
+
+ORIGINAL = "linha 1\nlinha 2\nlinha 3\nlinha 4\nlinha 5\n"
+PATCH = """--- a/src/a.c
++++ b/src/a.c
+@@ -2,3 +2,3 @@
+ linha 2
+-linha 3
++linha 3 corrigida
+ linha 4
+"""
+
+
+def write_patch(tmp_path: Path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def make_source(root: Path, files: dict) -> Path:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content if isinstance(content, bytes) else content.encode("utf-8"))
+    return root
+
+
+def staged_files(root: Path) -> list:
+    return [path for path in root.rglob("*") if path.name.endswith(fixqt.STAGED_SUFFIX)]
+
+
+def test_parse_unified_diff():
+    (path, hunks), = fixqt.parse_unified_diff(PATCH)
+    assert path == "src/a.c"
+    assert hunks[0].old_start == 2
+    assert hunks[0].old_lines == ["linha 2", "linha 3", "linha 4"]
+    assert hunks[0].new_lines == ["linha 2", "linha 3 corrigida", "linha 4"]
+
+
+def test_apply_hunks_with_offset_and_reverse():
+    (_, hunks), = fixqt.parse_unified_diff(PATCH)
+    lines = ["extra"] + ORIGINAL.splitlines()
+    patched = fixqt.apply_hunks(lines, hunks)
+    assert patched[3] == "linha 3 corrigida"
+    assert fixqt.apply_hunks(patched, hunks, reverse=True) == lines
+    assert fixqt.apply_hunks(["outra coisa"], hunks) is None
+
+
+def test_diff_patch_keeps_crlf_and_detects_applied(tmp_path):
+    patch = fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH))
+    files = {"src/a.c": ORIGINAL.replace("\n", "\r\n")}
+    assert patch.apply(files) == "applied"
+    assert "linha 3 corrigida\r\n" in files["src/a.c"]
+    assert files["src/a.c"].endswith("\r\n")
+    assert patch.apply(files) == "already"
+
+
+def test_optional_patch_that_does_not_fit_is_skipped(tmp_path):
+    patch = fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH), optional=True)
+    files = {"src/a.c": "nada a ver\n"}
+    assert patch.apply(files) == "skipped"
+    assert files["src/a.c"] == "nada a ver\n"
+
+
+@pytest.mark.parametrize("old, new, kind", [
+    ("/dev/null", "b/src/novo.c", "criação"),
+    ("a/src/a.c", "/dev/null", "remoção"),
+])
+def test_dev_null_patch_rejected_at_load(tmp_path, old, new, kind):
+    text = f"--- {old}\n+++ {new}\n@@ -1 +1 @@\n-x\n+y\n"
+    with pytest.raises(fixqt.PatchError, match=f"novo.patch: {kind} de arquivo não é suportada"):
+        fixqt.DiffPatch(write_patch(tmp_path, "novo.patch", text))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_series_applies_across_groups(tmp_path, jobs):
+    source = make_source(tmp_path / "vlc", {"src/a.c": ORIGINAL, "src/b.c": ORIGINAL})
+    series = [
+        fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH)),
+        fixqt.DiffPatch(write_patch(tmp_path, "b.patch", PATCH.replace("a.c", "b.c"))),
+    ]
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    statuses = fixqt.apply_series(str(source), series, jobs=jobs, store=store)
+
+    assert set(statuses.values()) == {"applied"}
+    for name in ("a.c", "b.c"):
+        assert "linha 3 corrigida" in (source / "src" / name).read_text(encoding="utf-8")
+    assert not staged_files(source)
+    assert fixqt.restore_pristine(str(source), store=store)
+    assert (source / "src/a.c").read_text(encoding="utf-8") == ORIGINAL
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_failing_hunk_rolls_back_series(tmp_path, jobs):
+    source = make_source(tmp_path / "vlc", {"src/a.c": ORIGINAL, "src/b.c": "outro conteúdo\n"})
+    series = [
+        fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH)),
+        fixqt.DiffPatch(write_patch(tmp_path, "b.patch", PATCH.replace("a.c", "b.c"))),
+    ]
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    with pytest.raises(fixqt.PatchError, match="hunks não encaixam"):
+        fixqt.apply_series(str(source), series, jobs=jobs, store=store)
+
+    assert (source / "src/a.c").read_text(encoding="utf-8") == ORIGINAL
+    assert not staged_files(source)
+    assert not os.path.exists(fixqt.manifest_path(str(source)))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_non_utf8_target_rolls_back_series(tmp_path, jobs):
+    source = make_source(tmp_path / "vlc", {"src/a.c": ORIGINAL, "src/b.c": b"linha \xe9 latin-1\n"})
+    series = [
+        fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH)),
+        fixqt.DiffPatch(write_patch(tmp_path, "b.patch", PATCH.replace("a.c", "b.c"))),
+    ]
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    with pytest.raises(fixqt.PatchError, match="não está em UTF-8"):
+        fixqt.apply_series(str(source), series, jobs=jobs, store=store)
+
+    assert (source / "src/a.c").read_text(encoding="utf-8") == ORIGINAL
+    assert not staged_files(source)
+
+
+def test_commit_failure_restores_committed_files(tmp_path, monkeypatch):
+    source = make_source(tmp_path / "vlc", {"src/a.c": ORIGINAL, "src/b.c": ORIGINAL})
+    series = [fixqt.DiffPatch(write_patch(
+        tmp_path, "ab.patch", PATCH + PATCH.replace("a.c", "b.c")
+    ))]
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    real_replace = os.replace
+
+    def locked_replace(src, dst):
+        if str(dst).endswith("b.c"):
+            raise PermissionError("arquivo em uso")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(fixqt.os, "replace", locked_replace)
+    with pytest.raises(OSError):
+        fixqt.apply_series(str(source), series, jobs=1, store=store)
+    assert (source / "src/a.c").read_text(encoding="utf-8") == ORIGINAL
+    assert (source / "src/b.c").read_text(encoding="utf-8") == ORIGINAL
+    assert not staged_files(source)
+
+
+def patch_tree(tmp_path: Path, name: str) -> Path:
+    return make_source(tmp_path / name, {"src/a.c": ORIGINAL})
+
+
+def test_store_put_same_object_concurrently(tmp_path):
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    data = os.urandom(256 * 1024)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        digests = list(pool.map(lambda _: store.put(data), range(32)))
+    assert len(set(digests)) == 1
+    assert store.get(digests[0]) == data
+    assert not list((tmp_path / "store").rglob("*" + fixqt.STAGED_SUFFIX))
+
+
+def test_concurrent_apply_and_gc_keep_backups(tmp_path):
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    patch = fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH))
+    trees = [patch_tree(tmp_path, f"vlc{index}") for index in range(4)]
+
+    def apply(tree):
+        for _ in range(5):
+            fixqt.apply_series(str(tree), [patch], jobs=1, store=store)
+            assert fixqt.restore_pristine(str(tree), store=store)
+        fixqt.apply_series(str(tree), [patch], jobs=1, store=store)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(apply, tree) for tree in trees]
+        futures += [pool.submit(store.gc) for _ in range(10)]
+        for future in futures:
+            future.result()
+
+    assert set(store.load_refs()) == {str(tree) for tree in trees}
+    store.gc(grace_s=0)
+    for tree in trees:
+        assert fixqt.restore_pristine(str(tree), store=store)
+        assert (tree / "src/a.c").read_text(encoding="utf-8") == ORIGINAL
+
+
+def test_gc_keeps_recent_and_temporary_objects(tmp_path):
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    tree = patch_tree(tmp_path, "vlc")
+    fixqt.apply_series(str(tree), [fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH))], jobs=1, store=store)
+    orphan = store.put(b"sem referencia")
+    temp = Path(store.object_path(orphan) + ".abc" + fixqt.STAGED_SUFFIX)
+    temp.write_bytes(b"em andamento")
+
+    assert store.gc() == (0, 0)
+    removed, _ = store.gc(grace_s=0)
+    assert removed == 1
+    assert not os.path.exists(store.object_path(orphan))
+    assert temp.exists()
+    assert fixqt.restore_pristine(str(tree), store=store)
+
+
+def test_gc_migrates_legacy_refs(tmp_path):
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    tree = patch_tree(tmp_path, "vlc")
+    fixqt.apply_series(str(tree), [fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH))], jobs=1, store=store)
+    refs = store.load_refs()
+    os.remove(store.tree_refs_path(str(tree)))
+    Path(store.legacy_refs_path()).write_text(json.dumps({"format": 1, "trees": refs}), encoding="utf-8")
+
+    store.gc(grace_s=0)
+    assert store.load_refs() == refs
+    assert not os.path.exists(store.legacy_refs_path())
+    assert fixqt.restore_pristine(str(tree), store=store)
+
+
+def test_gc_forgets_tree_without_manifest(tmp_path):
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    tree = patch_tree(tmp_path, "vlc")
+    fixqt.apply_series(str(tree), [fixqt.DiffPatch(write_patch(tmp_path, "a.patch", PATCH))], jobs=1, store=store)
+    os.remove(fixqt.manifest_path(str(tree)))
+
+    store.gc()
+    assert str(tree) in store.load_refs()
+    removed, _ = store.gc(grace_s=0)
+    assert store.load_refs() == {}
+    assert removed == 1
+
+
+def test_put_refreshes_existing_object(tmp_path):
+    store = fixqt.BackupStore(str(tmp_path / "store"))
+    digest = store.put(b"original")
+    os.utime(store.object_path(digest), (0, 0))
+    store.put(b"original")
+    assert os.path.getmtime(store.object_path(digest)) > 0
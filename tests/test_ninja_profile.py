@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+
+import ninja_profile
+
+
+HEADER = "# ninja log v5\n"
+
+
+def log_line(start: int, end: int, output: str, command_hash: str = "h") -> str:
+    return f"{start}\t{end}\t0\t{output}\t{command_hash}\n"
+
+
+def write_log(path: Path, *lines: str) -> Path:
+    path.write_text(HEADER + "".join(lines), encoding="utf-8")
+    return path
+
+
+def test_runs_split_when_end_goes_back(tmp_path):
+    log = write_log(
+        tmp_path / ".ninja_log",
+        log_line(0, 3000, "a.o"),
+        log_line(0, 4000, "b.o"),
+        log_line(0, 500, "c.o"),
+    )
+    runs = list(ninja_profile.read_log_runs(log))
+    assert [[step.outputs for step in run] for run in runs] == [[["a.o"], ["b.o"]], [["c.o"]]]
+
+
+def test_outputs_of_one_command_become_one_step(tmp_path):
+    log = write_log(
+        tmp_path / ".ninja_log",
+        log_line(10, 900, "lib.dll", "x"),
+        log_line(10, 900, "lib.dll.a", "x"),
+    )
+    (run,) = ninja_profile.read_log_runs(log)
+    assert len(run) == 1
+    assert run[0].outputs == ["lib.dll", "lib.dll.a"]
+    assert run[0].duration_ms == 890
+
+
+def test_since_offset_isolates_a_later_run(tmp_path):
+    # A segunda execução termina depois da primeira: a heurística a juntaria
+    log = write_log(tmp_path / ".ninja_log", log_line(0, 3000, "a.o"), log_line(0, 4000, "b.o"))
+    offset = log.stat().st_size
+    with open(log, "a", encoding="utf-8") as handle:
+        handle.write(log_line(100, 4500, "c.o"))
+
+    steps = ninja_profile.select_steps(log, since_offset=offset)
+    assert [step.outputs for step in steps] == [["c.o"]]
+    assert steps[0].start_ms == 0
+
+
+def test_since_offset_without_new_steps(tmp_path):
+    log = write_log(tmp_path / ".ninja_log", log_line(0, 3000, "a.o"))
+    assert ninja_profile.select_steps(log, since_offset=log.stat().st_size) == []
+
+
+def test_since_offset_zero_reads_whole_log(tmp_path):
+    log = write_log(tmp_path / ".ninja_log", log_line(0, 3000, "a.o"), log_line(0, 100, "b.o"))
+    assert len(ninja_profile.select_steps(log, since_offset=0)) == 2
+
+
+def test_shrunk_log_falls_back_to_last_run(tmp_path):
+    # Log recompactado: menor que o tamanho anotado antes do build
+    log = write_log(tmp_path / ".ninja_log", log_line(0, 3000, "a.o"), log_line(0, 100, "b.o"))
+    steps = ninja_profile.select_steps(log, since_offset=10 ** 6)
+    assert [step.outputs for step in steps] == [["b.o"]]
+
+
+def test_offset_in_middle_of_line_is_rejected(tmp_path):
+    log = write_log(tmp_path / ".ninja_log", log_line(0, 3000, "a.o"))
+    assert ninja_profile.appended_offset(log, len(HEADER) + 3) is None
+    assert ninja_profile.appended_offset(log, len(HEADER)) == len(HEADER)
+
+
+def test_runs_are_laid_end_to_end(tmp_path):
+    log = write_log(
+        tmp_path / ".ninja_log",
+        log_line(0, 1000, "a.o"),
+        log_line(0, 500, "b.o"),
+    )
+    steps = ninja_profile.select_steps(log, runs=2)
+    assert [(step.start_ms, step.end_ms) for step in steps] == [(0, 1000), (1000, 1500)]
+
+
+def test_unsupported_log_version(tmp_path):
+    log = tmp_path / ".ninja_log"
+    log.write_text("# ninja log v4\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(ninja_profile.read_log_runs(log))
@@ -0,0 +1,97 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import vlc_build_doctor as doctor
+
+
+def outcome(name="Ninja", status="ok"):
+    return doctor.CheckOutcome(name=name, status=status, version="1.12.1", location=None, message="")
+
+
+def test_hit_after_put_and_reload(tmp_path):
+    path = tmp_path / "probe-cache.json"
+    cache = doctor.ProbeCache(path)
+    cache.put("k", outcome())
+    cache.save()
+
+    reloaded = doctor.ProbeCache(path)
+    assert reloaded.get("k") == outcome()
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+
+def save_many(path, writer):
+    cache = doctor.ProbeCache(path, refresh=True, max_entries=20000)
+    for index in range(10000):
+        cache.put(f"{writer}-{index}", outcome())
+    cache.save()
+
+
+def test_concurrent_saves_leave_valid_cache(tmp_path):
+    path = tmp_path / "probe-cache.json"
+    with ProcessPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save_many, [path] * 16, range(16)))
+
+    assert json.loads(path.read_text(encoding="utf-8"))["format"] == doctor.CACHE_FORMAT
+    assert [item.name for item in tmp_path.iterdir()] == ["probe-cache.json"]
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    cache = doctor.ProbeCache(tmp_path / "c.json", ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(doctor.time, "time", lambda: now[0])
+    cache.put("k", outcome())
+    now[0] += 61
+    assert cache.get("k") is None
+    assert cache.misses == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    cache = doctor.ProbeCache(tmp_path / "c.json", max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr(doctor.time, "time", lambda: now[0])
+    cache.put("a", outcome("a"))
+    now[0] += 1
+    cache.put("b", outcome("b"))
+    now[0] += 1
+    assert cache.get("a") is not None
+    now[0] += 1
+    cache.put("c", outcome("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_refresh_ignores_existing_file(tmp_path):
+    path = tmp_path / "c.json"
+    cache = doctor.ProbeCache(path)
+    cache.put("k", outcome())
+    cache.save()
+    assert doctor.ProbeCache(path, refresh=True).get("k") is None
+
+
+def test_other_cache_format_is_ignored(tmp_path):
+    path = tmp_path / "c.json"
+    path.write_text('{"format": 1, "entries": {"k": {}}}', encoding="utf-8")
+    assert doctor.ProbeCache(path).get("k") is None
+
+
+def test_key_changes_with_executable(tmp_path):
+    exe = tmp_path / "ninja.exe"
+    exe.write_bytes(b"v1")
+    first = doctor.ProbeCache.make_key("Ninja", exe, ["--version"])
+    exe.write_bytes(b"v1.1")
+    assert doctor.ProbeCache.make_key("Ninja", exe, ["--version"]) != first
+    assert doctor.ProbeCache.make_key("Ninja", tmp_path / "missing.exe", []) is None
+
+
+def test_vs_signature_follows_installed_instances(tmp_path, monkeypatch):
+    monkeypatch.setenv("ProgramData", str(tmp_path))
+    empty = doctor.vs_instances_signature()
+    instance = doctor.vs_instances_dir() / "1a2b3c4d"
+    instance.mkdir(parents=True)
+    (instance / "state.json").write_text("{}", encoding="utf-8")
+    installed = doctor.vs_instances_signature()
+    assert installed != empty
+
+    (instance / "state.json").write_text('{"updated": true}', encoding="utf-8")
+    assert doctor.vs_instances_signature() != installed
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Artifact Cache - Cache do prefixo de instalação endereçado pelas entradas
+
+A chave de um build é o SHA-256 de tudo que determina o resultado: commit do
+VLC, conteúdo de patches/ e de resources/third_party/D3D12MemAlloc.h, o estado
+deixado pelo fix_qt_compatibility.py (manifesto .vlc-compiler-patches.json),
+as opções do meson e as versões do toolchain detectadas pelo doctor. Com a
+mesma chave, o prefixo instalado é restaurado do cache em segundos em vez de
+compilar de novo.
+
+Os arquivos do prefixo são guardados como objetos comprimidos endereçados pelo
+hash do conteúdo (arquivos iguais entre builds são guardados uma vez só) e
+conferidos na restauração. Cada build em cache é uma entrada em entries/; o
+mtime da entrada marca o último uso e o cache é podado por LRU até o limite de
+tamanho. Além do cache local, um diretório compartilhado (ex.: um share de
+rede) pode ser consultado e alimentado.
+
+Exemplos:
+    python tools/artifact_cache.py key --source vlc --options="-Dqt=enabled"
+    python tools/artifact_cache.py restore --source vlc --options="-Dqt=enabled" --prefix vlc-test
+    python tools/artifact_cache.py store --source vlc --options="-Dqt=enabled" --prefix vlc-test
+    python tools/artifact_cache.py list
+    python tools/artifact_cache.py verify
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+
+
+CACHE_FORMAT = 1
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR_ENV_VAR = "VLC_ARTIFACT_CACHE"
+SHARED_DIR_ENV_VAR = "VLC_ARTIFACT_SHARED"
+DEFAULT_MAX_SIZE_GB = 20.0
+# Manifesto gravado pelo scripts/fix_qt_compatibility.py na árvore do VLC
+QT_FIXES_MANIFEST = ".vlc-compiler-patches.json"
+D3D12_HEADER = PROJECT_ROOT / "resources" / "third_party" / "D3D12MemAlloc.h"
+# Checks do doctor cujas versões entram na chave
+TOOLCHAIN_CHECKS = ("python", "meson", "ninja", "nasm", "perl", "lua", "qsb", "mingw")
+# Objetos mais novos que isso não são apagados pelo gc (podem ser de um store em andamento)
+GC_GRACE_S = 3600
+COMPRESS_LEVEL = 1
+CHUNK_SIZE = 1024 * 1024
+
+
+class CacheError(RuntimeError):
+    """Falha de leitura ou integridade do cache."""
+
+
+@dataclass
+class CachedFile:
+    path: str
+    digest: str
+    size: int
+    mode: int
+
+
+@dataclass
+class CacheEntry:
+    """Um prefixo de instalação em cache."""
+
+    key: str
+    inputs: Dict[str, object]
+    created_at: float
+    files: List[CachedFile] = field(default_factory=list)
+    format: int = CACHE_FORMAT
+
+    @property
+    def size(self) -> int:
+        return sum(item.size for item in self.files)
+
+
+# === CHAVE ===
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_tree(root: Path) -> str:
+    """Hash do conteúdo de um diretório (caminhos relativos + conteúdo)."""
+    digest = hashlib.sha256()
+    if root.is_dir():
+        for path in sorted(p for p in root.rglob("*") if p.is_file()):
+            digest.update(path.relative_to(root).as_posix().encode("utf-8") + b"\0")
+            digest.update(sha256_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def git_output(source: Path, *args: str) -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(source), *args], capture_output=True, check=False
+        )
+    except OSError:
+        return None
+    return completed.stdout.decode("utf-8", "replace") if completed.returncode == 0 else None
+
+
+def qt_fixes_state(source: Path) -> str:
+    """
+    Estado deixado pelo fix_qt_compatibility.py: série aplicada e hash de cada
+    arquivo tocado. Sem manifesto, o diff da árvore contra o HEAD cobre o caso.
+    """
+    try:
+        manifest = json.loads((source / QT_FIXES_MANIFEST).read_text(encoding="utf-8"))
+        state = {
+            "series": manifest["series"],
+            "files": {name: info["sha256"] for name, info in manifest["files"].items()},
+        }
+        payload = json.dumps(state, sort_keys=True)
+    except (OSError, ValueError, KeyError, TypeError):
+        payload = git_output(source, "diff", "HEAD", "--binary") or ""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def toolchain_versions() -> Dict[str, str]:
+    """Versões do toolchain pelo doctor (com o cache de sondagens dele)."""
+    cache = doctor.ProbeCache(doctor.default_cache_path())
+    doctor.set_probe_cache(cache)
+    try:
+        outcomes = doctor.run_checks(TOOLCHAIN_CHECKS)
+    finally:
+        doctor.set_probe_cache(None)
+        cache.save()
+    keys = [dep.key for dep in doctor.select_dependencies(TOOLCHAIN_CHECKS)]
+    return {
+        key: outcome.version or outcome.status
+        for key, outcome in zip(keys, outcomes)
+    }
+
+
+def compute_inputs(source: Path, options: Sequence[str]) -> Dict[str, object]:
+    commit = (git_output(source, "rev-parse", "HEAD") or "").strip()
+    if not commit:
+        raise CacheError(f"{source} não é um repositório git; sem commit não há chave confiável")
+    return {
+        "format": CACHE_FORMAT,
+        "vlc_commit": commit,
+        "patches": hash_tree(PROJECT_ROOT / "patches"),
+        "d3d12memalloc": sha256_file(D3D12_HEADER) if D3D12_HEADER.is_file() else "ausente",
+        "qt_fixes": qt_fixes_state(source),
+        "meson_options": list(options),
+        "toolchain": toolchain_versions(),
+    }
+
+
+def cache_key(inputs: Dict[str, object]) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# === ARMAZENAMENTO ===
+def _temp_beside(path: Path) -> Path:
+    """Arquivo temporário exclusivo no diretório de ``path`` (seguro entre threads)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, name = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(handle)
+    return Path(name)
+
+
+def _replace(temp: Path, path: Path) -> None:
+    try:
+        os.replace(temp, path)
+    finally:
+        if temp.exists():
+            temp.unlink()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    temp = _temp_beside(path)
+    try:
+        temp.write_bytes(data)
+    except BaseException:
+        temp.unlink()
+        raise
+    _replace(temp, path)
+
+
+class ArtifactStore:
+    """
+    Objetos comprimidos (zlib) endereçados pelo SHA-256 do conteúdo original
+    e entradas JSON que listam os arquivos de cada prefixo em cache.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest[2:]
+
+    def entry_path(self, key: str) -> Path:
+        return self.root / "entries" / f"{key}.json"
+
+    def has_object(self, digest: str) -> bool:
+        return self.object_path(digest).is_file()
+
+    def put_file(self, path: Path) -> Tuple[str, int]:
+        """Guarda um arquivo uma única vez por conteúdo; retorna (hash, tamanho)."""
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.has_object(digest):
+            try:
+                write_atomic(self.object_path(digest), zlib.compress(data, COMPRESS_LEVEL))
+            except OSError:
+                # Outra thread gravou o mesmo conteúdo ao mesmo tempo (no Windows
+                # o replace sobre um arquivo aberto falha): o objeto já existe
+                if not self.has_object(digest):
+                    raise
+        return digest, len(data)
+
+    def read_object(self, digest: str) -> bytes:
+        """
+        Conteúdo original de um objeto, conferindo a integridade. Um objeto
+        corrompido é apagado, para que uma nova cópia (de outro store ou de um
+        novo build) possa substituí-lo.
+        """
+        path = self.object_path(digest)
+        try:
+            data = zlib.decompress(path.read_bytes())
+        except FileNotFoundError:
+            raise CacheError(f"objeto {digest[:12]} ausente") from None
+        except (OSError, zlib.error) as exc:
+            self._discard(path)
+            raise CacheError(f"objeto {digest[:12]} corrompido: {exc}") from None
+        if hashlib.sha256(data).hexdigest() != digest:
+            self._discard(path)
+            raise CacheError(f"objeto {digest[:12]} corrompido (hash não confere)")
+        return data
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def load_entry(self, key: str) -> Optional[CacheEntry]:
+        try:
+            data = json.loads(self.entry_path(key).read_text(encoding="utf-8"))
+            if data.get("format") != CACHE_FORMAT:
+                return None
+            data["files"] = [CachedFile(**item) for item in data["files"]]
+            return CacheEntry(**data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save_entry(self, entry: CacheEntry) -> None:
+        # A entrada é gravada por último: um store interrompido fica invisível
+        write_atomic(self.entry_path(entry.key), json.dumps(asdict(entry)).encode("utf-8"))
+
+    def touch(self, key: str) -> None:
+        """Marca o uso da entrada (mtime), base da ordem LRU."""
+        try:
+            os.utime(self.entry_path(key))
+        except OSError:
+            pass
+
+    def entries(self) -> List[Tuple[float, CacheEntry]]:
+        """Entradas com o instante do último uso, da menos para a mais recente."""
+        found = []
+        for path in (self.root / "entries").glob("*.json"):
+            entry = self.load_entry(path.stem)
+            if entry is not None:
+                try:
+                    found.append((path.stat().st_mtime, entry))
+                except OSError:
+                    continue
+        return sorted(found, key=lambda item: item[0])
+
+    def remove_entry(self, key: str) -> None:
+        try:
+            self.entry_path(key).unlink()
+        except OSError:
+            pass
+
+    def object_usage(self) -> Dict[str, Tuple[int, float]]:
+        """Tamanho em disco e mtime de cada objeto."""
+        usage: Dict[str, Tuple[int, float]] = {}
+        for path in (self.root / "objects").glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            usage[path.parent.name + path.name] = (info.st_size, info.st_mtime)
+        return usage
+
+    def evict(self, max_bytes: int) -> Tuple[int, int]:
+        """
+        Remove entradas menos usadas até os objetos caberem em ``max_bytes`` e
+        apaga objetos sem referência. Retorna (entradas removidas, bytes liberados).
+        """
+        entries = self.entries()
+        usage = self.object_usage()
+        refcount: Dict[str, int] = {}
+        for _, entry in entries:
+            for digest in {item.digest for item in entry.files}:
+                refcount[digest] = refcount.get(digest, 0) + 1
+
+        live_bytes = sum(size for digest, (size, _) in usage.items() if refcount.get(digest))
+        removed = 0
+        while entries and live_bytes > max_bytes:
+            _, oldest = entries.pop(0)
+            self.remove_entry(oldest.key)
+            removed += 1
+            for digest in {item.digest for item in oldest.files}:
+                refcount[digest] -= 1
+                if refcount[digest] == 0 and digest in usage:
+                    live_bytes -= usage[digest][0]
+
+        freed = 0
+        now = time.time()
+        for digest, (size, mtime) in usage.items():
+            if refcount.get(digest) or now - mtime < GC_GRACE_S:
+                continue
+            try:
+                self.object_path(digest).unlink()
+                freed += size
+            except OSError:
+                continue
+        return removed, freed
+
+
+def prefix_files(prefix: Path) -> List[Path]:
+    return sorted(path for path in prefix.rglob("*") if path.is_file() and not path.is_symlink())
+
+
+def store_prefix(store: ArtifactStore, key: str, inputs: Dict[str, object], prefix: Path, jobs: int) -> CacheEntry:
+    """Guarda o prefixo; arquivos já presentes no store não são regravados."""
+    paths = prefix_files(prefix)
+
+    def put(path: Path) -> CachedFile:
+        digest, size = store.put_file(path)
+        mode = path.stat().st_mode & 0o777
+        return CachedFile(path.relative_to(prefix).as_posix(), digest, size, mode)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        files = list(executor.map(put, paths))
+    entry = CacheEntry(key=key, inputs=inputs, created_at=time.time(), files=files)
+    store.save_entry(entry)
+    return entry
+
+
+def restore_prefix(store: ArtifactStore, entry: CacheEntry, prefix: Path, jobs: int) -> None:
+    """
+    Restaura o prefixo numa pasta temporária ao lado e troca no fim: um objeto
+    corrompido aborta a restauração sem estragar o prefixo existente.
+    """
+    staging = prefix.with_name(prefix.name + ".restoring")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    def extract(item: CachedFile) -> None:
+        target = staging / item.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(store.read_object(item.digest))
+        if os.name != "nt":
+            os.chmod(target, item.mode)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(extract, entry.files))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Troca: um prefixo em uso (ex.: vlc.exe aberto no Windows) faz o replace
+    # falhar; o prefixo antigo volta ao lugar e a pasta temporária é apagada
+    previous = prefix.with_name(prefix.name + ".previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    try:
+        if prefix.exists():
+            os.replace(prefix, previous)
+        try:
+            os.replace(staging, prefix)
+        except OSError:
+            if previous.exists() and not prefix.exists():
+                os.replace(previous, prefix)
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def restore_entry(
+    source: ArtifactStore,
+    local: ArtifactStore,
+    entry: CacheEntry,
+    prefix: Path,
+    jobs: int,
+) -> None:
+    """
+    Restaura uma entrada do store local ou, trazendo-a antes, do compartilhado.
+    Objetos locais corrompidos são apagados na leitura; vindo do compartilhado,
+    uma segunda cópia os substitui.
+    """
+    attempts = 1 if source is local else 2
+    for attempt in range(attempts):
+        if source is not local:
+            copy_entry(source, local, entry)
+        try:
+            restore_prefix(local, entry, prefix, jobs)
+            return
+        except CacheError:
+            if attempt == attempts - 1:
+                raise
+
+
+def copy_entry(source: ArtifactStore, dest: ArtifactStore, entry: CacheEntry) -> None:
+    """Copia a entrada e os objetos que faltam (já comprimidos) entre stores."""
+    for digest in {item.digest for item in entry.files}:
+        if not dest.has_object(digest):
+            target = dest.object_path(digest)
+            temp = _temp_beside(target)
+            try:
+                shutil.copyfile(source.object_path(digest), temp)
+            except BaseException:
+                temp.unlink()
+                raise
+            _replace(temp, target)
+    dest.save_entry(entry)
+
+
+# === CLI ===
+def default_cache_dir() -> Path:
+    override = os.environ.get(CACHE_DIR_ENV_VAR)
+    if override:
+        return Path(override)
+    return doctor.default_cache_path().parent / "artifacts"
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size:.0f} B"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def stores(args: argparse.Namespace) -> List[ArtifactStore]:
+    found = [ArtifactStore(args.cache_dir)]
+    if args.shared_dir:
+        found.append(ArtifactStore(args.shared_dir))
+    return found
+
+
+def resolve_key(args: argparse.Namespace) -> Tuple[str, Dict[str, object]]:
+    inputs = compute_inputs(args.source, shlex.split(args.options or ""))
+    return cache_key(inputs), inputs
+
+
+def command_key(args: argparse.Namespace) -> int:
+    key, inputs = resolve_key(args)
+    print(key)
+    if args.verbose:
+        print(json.dumps(inputs, indent=2, sort_keys=True))
+    return 0
+
+
+def command_restore(args: argparse.Namespace) -> int:
+    key, _ = resolve_key(args)
+    local, *shared = stores(args)
+    for store in (local, *shared):
+        entry = store.load_entry(key)
+        if entry is None:
+            continue
+        start = time.perf_counter()
+        try:
+            restore_entry(store, local, entry, args.prefix, args.jobs)
+        except CacheError as exc:
+            print(f"⚠️ Entrada {key[:12]} inutilizável ({exc}); descartada do cache local.")
+            local.remove_entry(key)
+            continue
+        except OSError as exc:
+            # Prefixo em uso ou store compartilhado inacessível: a entrada continua válida
+            print(f"⚠️ Não foi possível restaurar {key[:12]} de {store.root}: {exc}")
+            continue
+        local.touch(key)
+        print(
+            f"♻️ Cache de artefatos: {key[:12]} restaurado em {args.prefix} "
+            f"({len(entry.files)} arquivos, {format_size(entry.size)}, "
+            f"{time.perf_counter() - start:.1f} s)"
+        )
+        return 0
+    print(f"🔍 Cache de artefatos: {key[:12]} não encontrado; é preciso compilar.")
+    return 1
+
+
+def command_store(args: argparse.Namespace) -> int:
+    if not args.prefix.is_dir():
+        print(f"❌ Prefixo inexistente: {args.prefix}")
+        return 1
+    key, inputs = resolve_key(args)
+    local, *shared = stores(args)
+    start = time.perf_counter()
+    try:
+        entry = store_prefix(local, key, inputs, args.prefix, args.jobs)
+    except OSError as exc:
+        print(f"❌ Não foi possível guardar {args.prefix} no cache: {exc}")
+        return 1
+    for store in shared:
+        try:
+            copy_entry(local, store, entry)
+        except OSError as exc:
+            print(f"⚠️ Não foi possível publicar em {store.root}: {exc}")
+    removed, freed = local.evict(int(args.max_size_gb * 1024 ** 3))
+    print(
+        f"💾 Cache de artefatos: {key[:12]} guardado ({len(entry.files)} arquivos, "
+        f"{format_size(entry.size)}, {time.perf_counter() - start:.1f} s)"
+    )
+    if removed or freed:
+        print(f"🧹 LRU: {removed} entradas antigas removidas, {format_size(freed)} liberados")
+    return 0
+
+
+def command_list(args: argparse.Namespace) -> int:
+    for store in stores(args):
+        print(f"{store.root}:")
+        for last_used, entry in reversed(store.entries()):
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(last_used))
+            commit = str(entry.inputs.get("vlc_commit", "-"))[:10]
+            print(f"  {entry.key[:12]}  {used}  {format_size(entry.size):>9}  {commit}")
+    return 0
+
+
+def command_verify(args: argparse.Namespace) -> int:
+    """Confere todos os objetos de todas as entradas; remove as corrompidas."""
+    broken = 0
+    for store in stores(args):
+        for _, entry in store.entries():
+            try:
+                for digest in {item.digest for item in entry.files}:
+                    store.read_object(digest)
+            except CacheError as exc:
+                broken += 1
+                print(f"❌ {store.root} {entry.key[:12]}: {exc}; entrada removida")
+                store.remove_entry(entry.key)
+    print("✅ Cache íntegro." if not broken else f"{broken} entradas corrompidas removidas.")
+    return 1 if broken else 0
+
+
+def command_gc(args: argparse.Namespace) -> int:
+    removed, freed = ArtifactStore(args.cache_dir).evict(int(args.max_size_gb * 1024 ** 3))
+    print(f"🧹 {removed} entradas removidas, {format_size(freed)} liberados")
+    return 0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Cache do prefixo de instalação do VLC endereçado pelas entradas do build.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help=f"Cache local (padrão: junto ao cache do doctor ou ${CACHE_DIR_ENV_VAR}).",
+    )
+    parser.add_argument(
+        "--shared-dir",
+        type=Path,
+        default=os.environ.get(SHARED_DIR_ENV_VAR) or None,
+        help=f"Cache compartilhado consultado e alimentado além do local (${SHARED_DIR_ENV_VAR}).",
+    )
+    parser.add_argument(
+        "--max-size-gb",
+        type=float,
+        default=DEFAULT_MAX_SIZE_GB,
+        help=f"Limite do cache local antes da poda LRU (padrão: {DEFAULT_MAX_SIZE_GB:g} GB).",
+    )
+    parser.add_argument("--jobs", "-j", type=doctor.positive_int, default=doctor.default_jobs(), help="Arquivos processados em paralelo.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_key_options(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--source", type=Path, default=doctor.default_build_dir().parent, help="Fonte do VLC (padrão: vlc/).")
+        sub.add_argument("--options", default="", help='Opções do meson em uma string (use --options="-Dqt=enabled ...").')
+
+    key_parser = subparsers.add_parser("key", help="Calcular a chave do build atual.")
+    add_key_options(key_parser)
+    key_parser.add_argument("--verbose", "-v", action="store_true", help="Mostrar também as entradas da chave.")
+    key_parser.set_defaults(handler=command_key)
+
+    for name, handler, help_text in (
+        ("restore", command_restore, "Restaurar o prefixo do cache (código 1 se não houver)."),
+        ("store", command_store, "Guardar o prefixo instalado no cache."),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        add_key_options(sub)
+        sub.add_argument("--prefix", type=Path, required=True, help="Prefixo de instalação do VLC.")
+        sub.set_defaults(handler=handler)
+
+    subparsers.add_parser("list", help="Listar as entradas em cache.").set_defaults(handler=command_list)
+    subparsers.add_parser("verify", help="Conferir a integridade de todos os objetos.").set_defaults(handler=command_verify)
+    subparsers.add_parser("gc", help="Aplicar o limite LRU e apagar objetos órfãos.").set_defaults(handler=command_gc)
+
+    args = parser.parse_args(argv)
+    if args.cache_dir is None:
+        args.cache_dir = default_cache_dir()
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        return args.handler(args)
+    except CacheError as exc:
+        print(f"❌ {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
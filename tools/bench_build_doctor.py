@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Build Doctor - Benchmark com toolchain sintética
+
+Gera stubs de gcc, meson, ninja, perl, qsb e demais ferramentas em um diretório
+temporário, monta um PATH com centenas de entradas e um layout MSYS2 falso, e
+mede run_checks, discover_msys2_roots e a renderização dos relatórios ao longo
+de várias iterações. Roda em qualquer Linux/macOS, sem toolchain Windows.
+
+Exemplos:
+    python tools/bench_build_doctor.py --iterations 30 --latency-ms 20
+    python tools/bench_build_doctor.py --baseline-out bench-baseline.json
+    python tools/bench_build_doctor.py --compare bench-baseline.json --threshold 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+
+
+BENCH_FORMAT = 1
+
+# Ferramentas no PATH: nome do executável -> saída de versão
+PATH_STUBS: Dict[str, str] = {
+    "python": "Python 3.12.7",
+    "git": "git version 2.47.1.windows.1",
+    "cmake": "cmake version 3.31.2",
+    "ninja": "1.12.1",
+    "meson": "1.6.0",
+    "pkg-config": "2.3.0",
+    "nasm": "NASM version 2.16.03 compiled on Jan  1 2025",
+    "perl": "This is perl 5, version 40, subversion 0 (v5.40.0)",
+    "lua": "Lua 5.4.7  Copyright (C) 1994-2024 Lua.org, PUC-Rio",
+    "qsb": "qsb 6.8.0",
+}
+
+# Layout MSYS2: caminho relativo à raiz -> saída de versão
+MSYS2_STUBS: Dict[str, str] = {
+    "usr/bin/bash.exe": "GNU bash, version 5.2.37(1)-release",
+    "usr/bin/perl.exe": "This is perl 5, version 40, subversion 0 (v5.40.0)",
+    "ucrt64/bin/gcc.exe": "gcc.exe (Rev2, Built by MSYS2 project) 14.2.0",
+}
+
+# Banco local do pacman: pacote -> (versão, arquivos instalados)
+MSYS2_PACKAGES: Dict[str, Tuple[str, Sequence[str]]] = {
+    "bash": ("5.2.037-1", ("usr/bin/bash.exe",)),
+    "perl": ("5.40.0-2", ("usr/bin/perl.exe",)),
+    "mingw-w64-ucrt-x86_64-gcc": ("14.2.0-3", ("ucrt64/bin/gcc.exe",)),
+}
+
+
+def write_stub(path: Path, output: str, latency_ms: float, sleep_bin: Optional[str]) -> None:
+    """Cria um executável sh que espera ``latency_ms`` e imprime ``output``."""
+    lines = ["#!/bin/sh"]
+    if latency_ms > 0 and sleep_bin:
+        lines.append(f"{sleep_bin} {latency_ms / 1000:.3f}")
+    lines.append(f"printf '%s\\n' '{output}'")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    path.chmod(0o755)
+
+
+def write_pacman_db(msys_root: Path, filler_packages: int) -> None:
+    """Cria var/lib/pacman/local com os pacotes dos stubs e pacotes extras."""
+    local = msys_root / "var" / "lib" / "pacman" / "local"
+    packages = dict(MSYS2_PACKAGES)
+    for idx in range(filler_packages):
+        packages[f"mingw-w64-ucrt-x86_64-filler{idx:03d}"] = (
+            "1.0.0-1",
+            tuple(f"ucrt64/share/filler{idx:03d}/file{n:02d}.txt" for n in range(20)),
+        )
+
+    for name, (version, files) in packages.items():
+        entry = local / f"{name}-{version}"
+        entry.mkdir(parents=True, exist_ok=True)
+        (entry / "desc").write_text(
+            f"%NAME%\n{name}\n\n%VERSION%\n{version}\n\n", encoding="utf-8"
+        )
+        (entry / "files").write_text(
+            "%FILES%\n" + "\n".join(files) + "\n\n", encoding="utf-8"
+        )
+
+
+def build_fake_environment(
+    root: Path,
+    *,
+    path_entries: int,
+    latency_ms: float,
+    packages: int = 0,
+) -> Dict[str, str]:
+    """
+    Monta a árvore sintética e retorna as variáveis de ambiente que a usam.
+
+    As ferramentas ficam no fim de um PATH com ``path_entries`` diretórios
+    vazios, que é o pior caso para a busca de executáveis. Com ``packages``
+    > 0, o MSYS2 falso ganha um banco do pacman com esse número de pacotes
+    extras, exercitando a detecção de versão por metadados.
+    """
+    sleep_bin = shutil.which("sleep")
+
+    tools_dir = root / "tools" / "bin"
+    for name, output in PATH_STUBS.items():
+        write_stub(tools_dir / name, output, latency_ms, sleep_bin)
+
+    msys_root = root / "msys64"
+    for relative, output in MSYS2_STUBS.items():
+        write_stub(msys_root / relative, output, latency_ms, sleep_bin)
+    if packages:
+        write_pacman_db(msys_root, packages)
+
+    vcpkg_root = root / "vcpkg"
+    write_stub(vcpkg_root / "vcpkg.exe", "vcpkg package management program version 2025-01-01", latency_ms, sleep_bin)
+
+    program_files = root / "Program Files (x86)"
+    write_stub(
+        program_files / "Microsoft Visual Studio" / "Installer" / "vswhere.exe",
+        "2022",
+        latency_ms,
+        sleep_bin,
+    )
+
+    filler: List[str] = []
+    for idx in range(path_entries):
+        entry = root / "path" / f"entry{idx:04d}"
+        entry.mkdir(parents=True, exist_ok=True)
+        filler.append(str(entry))
+
+    path = filler + [str(msys_root / "usr" / "bin"), str(tools_dir)]
+    return {
+        "PATH": os.pathsep.join(path),
+        "MSYS2_ROOT": str(msys_root),
+        "VCPKG_ROOT": str(vcpkg_root),
+        "ProgramFiles(x86)": str(program_files),
+        "ProgramFiles": str(program_files),
+    }
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Percentil por interpolação linear (fraction entre 0 e 1)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize_samples(samples: Sequence[float]) -> Dict[str, float]:
+    """Estatísticas em milissegundos de uma série de medições."""
+    return {
+        "iterations": len(samples),
+        "min": round(min(samples), 3),
+        "mean": round(statistics.fmean(samples), 3),
+        "p50": round(percentile(samples, 0.50), 3),
+        "p90": round(percentile(samples, 0.90), 3),
+        "p99": round(percentile(samples, 0.99), 3),
+        "max": round(max(samples), 3),
+    }
+
+
+def time_call(func: Callable[[], object], iterations: int, warmup: int) -> List[float]:
+    """Executa ``func`` repetidamente e retorna as durações em ms."""
+    for _ in range(warmup):
+        func()
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_benchmarks(
+    root: Path,
+    *,
+    iterations: int,
+    warmup: int,
+    jobs: int,
+) -> Dict[str, Dict[str, float]]:
+    """Mede as operações do doctor no ambiente sintético já ativo."""
+    report_dir = root / "reports"
+    doctor.set_probe_cache(None)
+    outcomes = doctor.run_checks(jobs=jobs)
+
+    benchmarks: Dict[str, Callable[[], object]] = {
+        "run_checks": lambda: doctor.run_checks(jobs=jobs),
+        "run_checks_sequential": lambda: doctor.run_checks(jobs=1),
+        "discover_msys2_roots": doctor.discover_msys2_roots,
+        "tool_index_which": lambda: [
+            doctor.ToolIndex().which(name) for name in PATH_STUBS
+        ],
+        "render_table": lambda: doctor.render_table(outcomes),
+        "write_json_report": lambda: doctor.write_json_report(
+            report_dir / "doctor.json", outcomes
+        ),
+        "write_markdown_report": lambda: doctor.write_markdown_report(
+            report_dir / "doctor.md", outcomes
+        ),
+    }
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, func in benchmarks.items():
+        results[name] = summarize_samples(time_call(func, iterations, warmup))
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Lista os benchmarks cujo p50 piorou mais que ``threshold`` (fração)."""
+    regressions: List[str] = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get("p50"):
+            continue
+        ratio = stats["p50"] / reference["p50"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: p50 {stats['p50']:.2f} ms vs {reference['p50']:.2f} ms (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def render_results(results: Dict[str, Dict[str, float]]) -> str:
+    """Tabela de percentis para o terminal."""
+    columns = ("min", "p50", "p90", "p99", "max")
+    name_width = max(len(name) for name in results) + 2
+    header = f"{'Benchmark'.ljust(name_width)}" + "".join(
+        f"{col + ' (ms)':>12}" for col in columns
+    )
+    lines = [header, "-" * len(header)]
+    for name, stats in results.items():
+        lines.append(
+            f"{name.ljust(name_width)}" + "".join(f"{stats[col]:>12.2f}" for col in columns)
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark do vlc_build_doctor com stubs de toolchain sintéticos.",
+    )
+    parser.add_argument("--iterations", type=doctor.positive_int, default=20, help="Iterações medidas por benchmark (padrão: 20).")
+    parser.add_argument("--warmup", type=int, default=2, help="Iterações descartadas antes da medição (padrão: 2).")
+    parser.add_argument("--path-entries", type=int, default=300, help="Diretórios extras no PATH sintético (padrão: 300).")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Latência de inicialização de cada stub em ms (padrão: 10).")
+    parser.add_argument("--packages", type=int, default=200, help="Pacotes extras no banco do pacman sintético; 0 desativa o banco (padrão: 200).")
+    parser.add_argument("--jobs", type=doctor.positive_int, default=doctor.default_jobs(), help="Workers usados por run_checks (padrão: núcleos lógicos).")
+    parser.add_argument("--baseline-out", type=Path, help="Salvar resultados como baseline JSON.")
+    parser.add_argument("--compare", type=Path, help="Comparar com um baseline JSON salvo anteriormente.")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Piora tolerada no p50 em relação ao baseline (padrão: 0.20 = 20%%).")
+    parser.add_argument("--keep", action="store_true", help="Não apagar a árvore sintética ao final.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if os.name == "nt":
+        print("Os stubs sintéticos usam /bin/sh; execute o benchmark em Linux ou macOS.")
+        return 2
+
+    root = Path(tempfile.mkdtemp(prefix="vlc-doctor-bench-"))
+    saved_env = dict(os.environ)
+    try:
+        os.environ.update(
+            build_fake_environment(
+                root,
+                path_entries=args.path_entries,
+                latency_ms=args.latency_ms,
+                packages=args.packages,
+            )
+        )
+        results = run_benchmarks(
+            root,
+            iterations=args.iterations,
+            warmup=args.warmup,
+            jobs=args.jobs,
+        )
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        doctor.set_tool_index(None)
+        if args.keep:
+            print(f"Árvore sintética mantida em: {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print("VLC Build Doctor - Benchmark")
+    print(
+        f"Iterações: {args.iterations} | PATH: {args.path_entries} entradas | "
+        f"Latência dos stubs: {args.latency_ms:g} ms | Jobs: {args.jobs}"
+    )
+    print()
+    print(render_results(results))
+
+    if args.baseline_out:
+        payload = {
+            "tool": "vlc-build-doctor-bench",
+            "format": BENCH_FORMAT,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "parameters": {
+                "iterations": args.iterations,
+                "path_entries": args.path_entries,
+                "latency_ms": args.latency_ms,
+                "packages": args.packages,
+                "jobs": args.jobs,
+            },
+            "results": results,
+        }
+        args.baseline_out.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline_out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nBaseline salvo em: {args.baseline_out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(
+            results, baseline.get("results", {}), args.threshold
+        )
+        if regressions:
+            print(f"\nRegressões acima de {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"- {line}")
+            return 1
+        print(f"\nSem regressões acima de {args.threshold:.0%} em relação a {args.compare}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
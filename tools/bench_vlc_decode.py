@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Decode Benchmark - Desempenho de decodificação do VLC compilado
+
+Roda o `vlc` sem interface gráfica (interface e saídas de vídeo/áudio dummy)
+em cada clipe de teste e coleta, por clipe: fps decodificado, fator de tempo
+real, CPU de usuário e de sistema, pico de RSS e quadros perdidos/atrasados.
+Os contadores de quadros vêm das estatísticas do VLC, pedidas periodicamente
+pela interface de controle (`stats` da interface rc/cli): pelo stdin/stdout
+do VLC fora do Windows e, no Windows (onde a interface rc não lê comandos de
+um pipe), por um socket TCP local (--rc-host). CPU e memória vêm do rusage do
+processo filho e só estão disponíveis onde há os.wait4 (Linux e macOS).
+
+Por padrão (--mode throughput) o VLC roda sem ritmo de relógio: sem áudio,
+na taxa máxima de reprodução e sem descartar quadros atrasados, de modo que o
+fps medido é a vazão do decodificador. --mode realtime reproduz no ritmo do
+clipe (quadros atrasados/perdidos indicam falta de folga para tocar ao vivo).
+
+Os resultados podem ser salvos como JSON e comparados com um baseline medido
+com os mesmos parâmetros (modo, repetições, argumentos extras). Com
+--stub, um `vlc` sintético substitui o binário real, para exercitar a
+ferramenta em qualquer Linux sem um build do VLC.
+
+Exemplos:
+    python tools/bench_vlc_decode.py test-videos/matrix/*.mkv
+    python tools/bench_vlc_decode.py --baseline-out decode-baseline.json
+    python tools/bench_vlc_decode.py --compare decode-baseline.json --threshold 0.15
+    python tools/bench_vlc_decode.py --mode realtime test-videos/matrix/*.mp4
+    python tools/bench_vlc_decode.py --stub
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+
+
+BENCH_FORMAT = 2
+MEDIA_EXTENSIONS = (".mp4", ".mkv", ".webm", ".ts")
+DEFAULT_STATS_INTERVAL = 0.5
+DEFAULT_CLIP_TIMEOUT = 300.0
+
+# Interface dummy + saídas dummy; a interface de controle vem de control_args()
+VLC_BASE_ARGS = [
+    "--intf", "dummy",
+    "--vout", "dummy",
+    "--aout", "dummy",
+    "--no-video-title-show",
+    "--play-and-exit",
+    "--no-repeat",
+    "--no-loop",
+    "--stats",
+]
+# Sem ritmo de relógio: sem áudio (que dita o relógio), taxa máxima do VLC e
+# todos os quadros decodificados e exibidos, mesmo atrasados
+UNPACED_RATE = 32
+MODE_ARGS: Dict[str, List[str]] = {
+    "throughput": [
+        "--no-audio",
+        f"--rate={UNPACED_RATE}",
+        "--no-drop-late-frames",
+        "--no-skip-frames",
+    ],
+    "realtime": [],
+}
+DEFAULT_MODE = "throughput"
+
+# Canal da interface rc: stdin/stdout (--rc-fake-tty só existe fora do Windows)
+# ou socket TCP local (--rc-host), o único que o rc lê no Windows
+CONTROL_CHANNELS = ("stdio", "socket")
+DEFAULT_CONTROL = "socket" if os.name == "nt" else "stdio"
+RC_HOST = "127.0.0.1"
+RC_CONNECT_TIMEOUT = 0.2
+
+STATS_SECTION = re.compile(r"^\+-\[(?P<name>[^\]]+)\]")
+STATS_LINE = re.compile(r"^\|\s*(?P<label>[^:]+?)\s*:\s*(?P<value>\d+)")
+STATS_END = "end of statistical info"
+FPS_IN_NAME = re.compile(r"_(\d+)fps")
+
+# Métricas comparadas com o baseline: (campo, maior é melhor)
+COMPARED_METRICS = (
+    ("decoded_fps", True),
+    ("cpu_s", False),
+    ("peak_rss_mb", False),
+)
+
+
+@dataclass
+class ClipResult:
+    """Medições de um clipe (mediana das repetições)."""
+
+    clip: str
+    wall_s: float
+    exit_code: Optional[int]
+    timed_out: bool = False
+    decoded_frames: Optional[int] = None
+    displayed_frames: Optional[int] = None
+    late_frames: Optional[int] = None
+    lost_frames: Optional[int] = None
+    decoded_fps: Optional[float] = None
+    media_duration_s: Optional[float] = None
+    realtime_factor: Optional[float] = None
+    user_cpu_s: Optional[float] = None
+    sys_cpu_s: Optional[float] = None
+    cpu_s: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+
+
+class StatsParser:
+    """
+    Lê a saída da interface de controle e guarda o último bloco completo de
+    `stats` (seção "Video Decoding"), com o instante em que chegou.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latest: Dict[str, int] = {}
+        self.latest_at: Optional[float] = None
+        self._section = ""
+        self._current: Dict[str, int] = {}
+
+    def feed(self, line: str) -> None:
+        line = line.strip()
+        section = STATS_SECTION.match(line)
+        if section:
+            self._section = section.group("name").lower()
+            return
+        if STATS_END in line:
+            with self.lock:
+                if self._current:
+                    self.latest = dict(self._current)
+                    self.latest_at = time.monotonic()
+            self._current = {}
+            return
+        match = STATS_LINE.match(line)
+        if not match or "video" not in self._section:
+            return
+        label = match.group("label").lower()
+        value = int(match.group("value"))
+        if "decoded" in label:
+            self._current["decoded"] = value
+        elif "displayed" in label:
+            self._current["displayed"] = value
+        elif "late" in label:
+            self._current["late"] = value
+        elif "lost" in label:
+            self._current["lost"] = value
+
+
+def free_port() -> int:
+    """Porta TCP livre em RC_HOST para a interface rc do VLC."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind((RC_HOST, 0))
+        return probe.getsockname()[1]
+
+
+def control_args(control: str, port: Optional[int] = None) -> List[str]:
+    """Argumentos que ligam a interface rc no canal escolhido."""
+    if control == "socket":
+        return ["--extraintf", "rc", f"--rc-host={RC_HOST}:{port}", "--rc-quiet"]
+    return ["--extraintf", "rc", "--rc-fake-tty"]
+
+
+class RcChannel:
+    """
+    Envia comandos à interface rc e repassa as respostas ao StatsParser, pelo
+    stdin/stdout do processo ou por um socket TCP conectado sob demanda (o VLC
+    só escuta na porta depois de carregar a interface).
+    """
+
+    def __init__(self, process: subprocess.Popen, parser: StatsParser, port: Optional[int] = None) -> None:
+        self.process = process
+        self.parser = parser
+        self.port = port
+        self.connection: Optional[socket.socket] = None
+        self.reader: Optional[threading.Thread] = None
+        if port is None:
+            self._start_reader(process.stdout)
+
+    def _start_reader(self, stream) -> None:
+        def read_output() -> None:
+            try:
+                for line in stream:
+                    self.parser.feed(line)
+            except (OSError, ValueError):
+                pass
+
+        self.reader = threading.Thread(target=read_output, daemon=True)
+        self.reader.start()
+
+    def _connect(self) -> bool:
+        try:
+            self.connection = socket.create_connection((RC_HOST, self.port), timeout=RC_CONNECT_TIMEOUT)
+        except OSError:
+            return False
+        self.connection.settimeout(None)
+        self._start_reader(self.connection.makefile("r", encoding="utf-8", errors="replace"))
+        return True
+
+    def send(self, command: str) -> None:
+        try:
+            if self.port is None:
+                self.process.stdin.write(command + "\n")
+                self.process.stdin.flush()
+            elif self.connection is not None or self._connect():
+                self.connection.sendall((command + "\n").encode("utf-8"))
+        except (BrokenPipeError, OSError):
+            pass
+
+    def close(self) -> None:
+        if self.reader is not None:
+            self.reader.join(timeout=2)
+        if self.connection is not None:
+            self.connection.close()
+
+
+def media_duration(clip: Path, decoded_frames: Optional[int]) -> Optional[float]:
+    """Duração do clipe via ffprobe; sem ffprobe, quadros / fps do nome da matriz."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        try:
+            completed = subprocess.run(
+                [ffprobe, "-v", "error", "-show_entries", "format=duration",
+                 "-of", "default=noprint_wrappers=1:nokey=1", str(clip)],
+                capture_output=True, text=True, check=False, timeout=30,
+            )
+            return float(completed.stdout.strip())
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+    match = FPS_IN_NAME.search(clip.name)
+    if match and decoded_frames:
+        return decoded_frames / int(match.group(1))
+    return None
+
+
+def run_clip(
+    vlc: str,
+    clip: Path,
+    *,
+    extra_args: Sequence[str],
+    interval: float,
+    timeout: float,
+    mode: str = DEFAULT_MODE,
+    control: str = DEFAULT_CONTROL,
+) -> ClipResult:
+    """Roda o VLC em um clipe, pedindo `stats` a cada ``interval`` segundos."""
+    port = free_port() if control == "socket" else None
+    command = (
+        [vlc] + VLC_BASE_ARGS + control_args(control, port) + MODE_ARGS[mode] + list(extra_args) + [str(clip)]
+    )
+    parser = StatsParser()
+    popen_kwargs: Dict[str, object] = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs["start_new_session"] = True
+
+    started = time.monotonic()
+    stdio = subprocess.PIPE if port is None else subprocess.DEVNULL
+    process = subprocess.Popen(
+        command,
+        stdin=stdio,
+        stdout=stdio,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1,
+        **popen_kwargs,
+    )
+    channel = RcChannel(process, parser, port)
+
+    rusage = None
+    timed_out = False
+    deadline = started + timeout
+    while True:
+        if hasattr(os, "wait4"):
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                break
+        elif process.poll() is not None:
+            break
+        if time.monotonic() > deadline:
+            timed_out = True
+            doctor.kill_process_tree(process)
+            if hasattr(os, "wait4"):
+                _, status, rusage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(status)
+            else:
+                process.wait()
+            break
+        channel.send("stats")
+        time.sleep(interval)
+
+    wall = time.monotonic() - started
+    channel.close()
+
+    result = ClipResult(
+        clip=clip.name, wall_s=round(wall, 3), exit_code=process.returncode, timed_out=timed_out
+    )
+    if rusage is not None:
+        result.user_cpu_s = round(rusage.ru_utime, 3)
+        result.sys_cpu_s = round(rusage.ru_stime, 3)
+        result.cpu_s = round(rusage.ru_utime + rusage.ru_stime, 3)
+        # ru_maxrss: KiB no Linux, bytes no macOS
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        result.peak_rss_mb = round(rusage.ru_maxrss / divisor, 1)
+
+    with parser.lock:
+        stats, stats_at = dict(parser.latest), parser.latest_at
+    if stats:
+        result.decoded_frames = stats.get("decoded")
+        result.displayed_frames = stats.get("displayed")
+        result.late_frames = stats.get("late")
+        result.lost_frames = stats.get("lost")
+        elapsed = (stats_at or time.monotonic()) - started
+        if result.decoded_frames is not None and elapsed > 0:
+            result.decoded_fps = round(result.decoded_frames / elapsed, 2)
+
+    duration = media_duration(clip, result.decoded_frames)
+    if duration:
+        result.media_duration_s = round(duration, 3)
+        result.realtime_factor = round(duration / wall, 3) if wall > 0 else None
+    return result
+
+
+def median_result(samples: Sequence[ClipResult]) -> ClipResult:
+    """Combina repetições de um clipe pela mediana de cada métrica."""
+    merged = asdict(samples[0])
+    for field_name, value in merged.items():
+        if field_name == "clip" or isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        values = [getattr(sample, field_name) for sample in samples]
+        values = [v for v in values if v is not None]
+        if values:
+            middle = statistics.median(values)
+            merged[field_name] = type(value)(middle) if isinstance(value, int) else round(middle, 3)
+    return ClipResult(**merged)
+
+
+def find_vlc() -> Optional[str]:
+    """VLC instalado pelo build_vlc.sh ou, senão, o do PATH."""
+    project_root = Path(__file__).resolve().parent.parent
+    candidates = [project_root / "vlc-test" / "bin"]
+    username = os.environ.get("USERNAME")
+    if username:
+        candidates.append(Path(f"/c/Users/{username}/vlc-test/bin"))
+    for directory in candidates:
+        for name in ("vlc", "vlc.exe"):
+            if (directory / name).is_file():
+                return str(directory / name)
+    return shutil.which("vlc")
+
+
+def default_clips() -> List[Path]:
+    """Clipes de test-videos/ (incluindo a matriz do create_test_video.py)."""
+    test_videos = Path(__file__).resolve().parent.parent / "test-videos"
+    if not test_videos.is_dir():
+        return []
+    return sorted(
+        path for path in test_videos.rglob("*")
+        if path.suffix in MEDIA_EXTENSIONS and ".partial" not in path.name
+    )
+
+
+STUB_SOURCE = '''#!{python}
+# VLC sintético para o bench_vlc_decode: "toca" cada clipe por alguns
+# segundos, gasta CPU e responde a "stats" como a interface rc, pelo stdin
+# ou, com --rc-host, por um socket TCP.
+import os, socket, sys, threading, time
+
+duration = float(os.environ.get("VLC_STUB_SECONDS", "1.0"))
+fps = float(os.environ.get("VLC_STUB_FPS", "30"))
+started = time.monotonic()
+lock = threading.Lock()
+
+def stats(out):
+    frames = int((time.monotonic() - started) * fps)
+    with lock:
+        out.write("+----[ begin of statistical info ]\\n")
+        out.write("+-[Video Decoding]\\n")
+        out.write("| video decoded    :    %5d\\n" % frames)
+        out.write("| frames displayed :    %5d\\n" % frames)
+        out.write("| frames late      :    %5d\\n" % (frames // 100))
+        out.write("| frames lost      :    %5d\\n" % 0)
+        out.write("+-[Audio Decoding]\\n")
+        out.write("| audio decoded    :    %5d\\n" % frames)
+        out.write("| buffers lost     :    %5d\\n" % 0)
+        out.write("+----[ end of statistical info ]\\n")
+        out.flush()
+
+def commands(source, out):
+    for line in source:
+        if line.strip() == "stats":
+            stats(out)
+
+def serve(host):
+    address, port = host.rsplit(":", 1)
+    server = socket.create_server((address, int(port)))
+    connection, _ = server.accept()
+    stream = connection.makefile("rw", encoding="utf-8")
+    commands(stream, stream)
+
+hosts = [arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--rc-host=")]
+if hosts:
+    threading.Thread(target=serve, args=(hosts[0],), daemon=True).start()
+else:
+    threading.Thread(target=commands, args=(sys.stdin, sys.stdout), daemon=True).start()
+ballast = bytearray(32 * 1024 * 1024)
+while time.monotonic() - started < duration:
+    sum(range(20000))
+'''
+
+
+def create_stub(root: Path) -> str:
+    """Cria o vlc sintético (script Python) e clipes vazios nomeados como a matriz."""
+    stub = root / "vlc"
+    stub.write_text(STUB_SOURCE.format(python=sys.executable), encoding="utf-8")
+    stub.chmod(0o755)
+    clips_dir = root / "clips"
+    clips_dir.mkdir()
+    for name in ("h264_1280x720_30fps_gop60_aac-stereo.mp4", "hevc_1920x1080_60fps_gop60_aac-stereo.mp4"):
+        (clips_dir / name).write_bytes(b"")
+    return str(stub)
+
+
+def compare_with_baseline(
+    results: Sequence[ClipResult],
+    baseline: Dict[str, dict],
+    threshold: float,
+) -> List[str]:
+    """Lista as piores variações acima de ``threshold`` por clipe do baseline."""
+    regressions: List[str] = []
+    for result in results:
+        reference = baseline.get(result.clip)
+        if not reference:
+            continue
+        for field_name, higher_is_better in COMPARED_METRICS:
+            current, previous = getattr(result, field_name), reference.get(field_name)
+            if not current or not previous:
+                continue
+            change = (current - previous) / previous
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(
+                    f"{result.clip}: {field_name} {current:g} vs {previous:g} ({change:+.0%})"
+                )
+        for field_name in ("late_frames", "lost_frames"):
+            current, previous = getattr(result, field_name), reference.get(field_name)
+            if current is None or previous is None:
+                continue
+            if current - previous > max(2, previous * threshold):
+                regressions.append(f"{result.clip}: {field_name} {current} vs {previous}")
+    return regressions
+
+
+def baseline_mismatch(parameters: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    """Parâmetros que diferem do baseline (um baseline sem parâmetros nunca confere)."""
+    recorded = baseline.get("parameters")
+    if baseline.get("format") != BENCH_FORMAT or not isinstance(recorded, dict):
+        return ["formato do baseline"]
+    return [
+        f"{name}: {recorded.get(name)!r} no baseline, {value!r} agora"
+        for name, value in parameters.items()
+        if recorded.get(name) != value
+    ]
+
+
+def format_metric(value: Optional[float], digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def render_results(results: Sequence[ClipResult]) -> str:
+    """Tabela de resultados para o terminal."""
+    columns = (
+        ("fps", "decoded_fps", 1),
+        ("x tempo real", "realtime_factor", 2),
+        ("CPU usr (s)", "user_cpu_s", 2),
+        ("CPU sys (s)", "sys_cpu_s", 2),
+        ("RSS (MB)", "peak_rss_mb", 1),
+        ("atrasados", "late_frames", 0),
+        ("perdidos", "lost_frames", 0),
+    )
+    name_width = max([len("Clipe")] + [len(result.clip) for result in results]) + 2
+    header = "Clipe".ljust(name_width) + "".join(f"{title:>14}" for title, _, _ in columns)
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            result.clip.ljust(name_width)
+            + "".join(
+                f"{format_metric(getattr(result, field_name), digits):>14}"
+                for _, field_name, digits in columns
+            )
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark de decodificação do VLC compilado (interface e saídas dummy).",
+    )
+    parser.add_argument("clips", nargs="*", type=Path, help="Clipes a medir (padrão: test-videos/).")
+    parser.add_argument("--vlc", default=None, help="Binário do VLC (padrão: vlc-test/bin ou o do PATH).")
+    parser.add_argument(
+        "--mode",
+        choices=sorted(MODE_ARGS),
+        default=DEFAULT_MODE,
+        help="throughput: sem ritmo de relógio, mede a vazão do decodificador (padrão); realtime: no ritmo do clipe.",
+    )
+    parser.add_argument(
+        "--control",
+        choices=CONTROL_CHANNELS,
+        default=DEFAULT_CONTROL,
+        help=f"Canal da interface rc para pedir stats: stdio ou socket TCP local (padrão nesta plataforma: {DEFAULT_CONTROL}).",
+    )
+    parser.add_argument("--stub", action="store_true", help="Usar um vlc sintético e clipes vazios (teste da ferramenta).")
+    parser.add_argument("--repeat", type=doctor.positive_int, default=1, help="Execuções por clipe; usa a mediana (padrão: 1).")
+    parser.add_argument("--interval", type=doctor.positive_float, default=DEFAULT_STATS_INTERVAL, help="Intervalo entre pedidos de stats em s (padrão: 0.5).")
+    parser.add_argument("--timeout", type=doctor.positive_float, default=DEFAULT_CLIP_TIMEOUT, help="Tempo máximo por clipe em s (padrão: 300).")
+    parser.add_argument("--vlc-arg", action="append", default=[], help="Argumento extra para o VLC (repetível), ex.: --vlc-arg=--avcodec-threads=1.")
+    parser.add_argument("--json", type=Path, help="Salvar os resultados em JSON.")
+    parser.add_argument("--baseline-out", type=Path, help="Salvar resultados como baseline JSON.")
+    parser.add_argument("--compare", type=Path, help="Comparar com um baseline JSON salvo anteriormente.")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Piora tolerada em relação ao baseline (padrão: 0.20 = 20%%).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    parameters = {
+        "mode": args.mode,
+        "mode_args": MODE_ARGS[args.mode],
+        "repeat": args.repeat,
+        "interval": args.interval,
+        "vlc_args": args.vlc_arg,
+    }
+
+    baseline: Optional[Dict] = None
+    if args.compare:
+        try:
+            baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"Não foi possível ler o baseline {args.compare}: {exc}")
+            return 2
+        mismatch = baseline_mismatch(parameters, baseline)
+        if mismatch:
+            print(f"O baseline {args.compare} foi medido com outros parâmetros; meça um novo com --baseline-out:")
+            for line in mismatch:
+                print(f"- {line}")
+            return 2
+
+    stub_root: Optional[Path] = None
+    if args.stub:
+        if os.name == "nt":
+            print("O vlc sintético é um script com shebang; execute --stub em Linux ou macOS.")
+            return 2
+        stub_root = Path(tempfile.mkdtemp(prefix="vlc-decode-bench-"))
+        vlc = create_stub(stub_root)
+        clips = args.clips or sorted((stub_root / "clips").iterdir())
+    else:
+        vlc = args.vlc or find_vlc()
+        clips = args.clips or default_clips()
+
+    try:
+        if not vlc:
+            print("VLC não encontrado: use --vlc, instale em vlc-test/ ou rode com --stub.")
+            return 2
+        if not clips:
+            print("Nenhum clipe encontrado: gere com tools/create_test_video.py --matrix ou passe os arquivos.")
+            return 2
+
+        print("VLC Decode Benchmark")
+        print(f"VLC: {vlc} | Clipes: {len(clips)} | Repetições: {args.repeat} | Modo: {args.mode}")
+        results: List[ClipResult] = []
+        for clip in clips:
+            samples = [
+                run_clip(
+                    vlc,
+                    clip,
+                    extra_args=args.vlc_arg,
+                    interval=args.interval,
+                    timeout=args.timeout,
+                    mode=args.mode,
+                    control=args.control,
+                )
+                for _ in range(args.repeat)
+            ]
+            results.append(median_result(samples))
+            if results[-1].timed_out:
+                print(f"  ⚠ {clip.name}: tempo esgotado ({args.timeout:g} s), VLC encerrado")
+            elif results[-1].exit_code not in (0, None):
+                print(f"  ⚠ {clip.name}: VLC saiu com código {results[-1].exit_code}")
+    finally:
+        if stub_root is not None:
+            shutil.rmtree(stub_root, ignore_errors=True)
+
+    print()
+    print(render_results(results))
+    if all(result.decoded_frames is None for result in results):
+        print(f"\nSem contadores de quadros: a interface de controle do VLC ({args.control}) não respondeu a 'stats'.")
+    if not hasattr(os, "wait4"):
+        print("\nCPU e RSS indisponíveis nesta plataforma: o rusage do processo filho exige os.wait4 (Linux/macOS).")
+
+    payload = {
+        "tool": "vlc-decode-bench",
+        "format": BENCH_FORMAT,
+        "platform": platform.platform(),
+        "vlc": vlc if stub_root is None else "stub",
+        "parameters": parameters,
+        "results": {result.clip: asdict(result) for result in results},
+    }
+    for path in (args.json, args.baseline_out):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            print(f"\nResultados salvos em: {path}")
+
+    if baseline is not None:
+        regressions = compare_with_baseline(results, baseline.get("results", {}), args.threshold)
+        if regressions:
+            print(f"\nRegressões acima de {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"- {line}")
+            return 1
+        print(f"\nSem regressões acima de {args.threshold:.0%} em relação a {args.compare}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Build Driver - Compilação com paralelismo ajustado à memória
+
+Substitui o `meson compile` por uma sequência de chamadas ao ninja em que o
+número de jobs de cada etapa sai dos núcleos e da RAM livre naquele momento.
+Os objetos pendentes são agrupados por target; o pico de memória por job de
+cada target é medido (os.wait4 ou Job Object no Windows) e guardado para os
+próximos builds. Targets pesados, como os do Qt/QML em modules/gui/qt, rodam
+sozinhos e com menos jobs; os leves rodam juntos e com todos os núcleos.
+
+Exemplos:
+    python tools/build_driver.py --build-dir vlc/build-mingw
+    python tools/build_driver.py --build-dir vlc/build-mingw --dry-run
+    python tools/build_driver.py --show
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+
+
+MEMORY_FORMAT = 1
+MEMORY_ENV_VAR = "VLC_TARGET_MEMORY"
+# Pico por job assumido para targets nunca medidos, em MB
+DEFAULT_JOB_MB = 400.0
+# Estimativas iniciais para targets sabidamente pesados (prefixo do caminho)
+HEAVY_TARGET_HINTS = (("modules/gui/qt", 1536.0),)
+# A etapa final (links, targets customizados) é aprendida sob este nome
+FINAL_PHASE = "(final)"
+FINAL_PHASE_DEFAULT_MB = 1024.0
+# Targets a partir deste pico rodam sozinhos, o que também mede o pico exato
+HEAVY_JOB_MB = 1024.0
+# Peso de uma medida menor que o pico já aprendido (queda gradual)
+PEAK_DECAY = 0.25
+# Margem sobre o pico aprendido e RAM deixada livre para o sistema
+SAFETY_FACTOR = 1.25
+DEFAULT_RESERVE_MB = 1024.0
+# Limite da linha de comando do Windows (32767) com folga
+MAX_COMMAND_CHARS = 24000
+# Descrição das regras de compilação do meson ("Compiling C object <saída>")
+COMPILE_DESCRIPTION = re.compile(r"Compiling .+? object (\S+)$")
+MB = 1024 * 1024
+# Sinais de que um job morreu por falta de memória (OOM killer no Linux,
+# alocação negada no Windows); só nesses casos a etapa é repetida
+OUT_OF_MEMORY = re.compile(
+    r"out of memory|cannot allocate memory|memory exhausted|std::bad_alloc"
+    r"|killed \(program |killed signal|signal 9 \(killed\)",
+    re.IGNORECASE,
+)
+# Windows: criar o ninja suspenso para entrar no Job Object antes dos filhos
+CREATE_SUSPENDED = 0x00000004
+STATUS_NO_MEMORY = 0xC0000017
+
+
+@dataclass
+class TargetMemory:
+    """Pico de memória de um job de compilação do target."""
+
+    peak_mb: float
+    # True quando medido com o target sozinho; False é só um limite superior
+    exact: bool = False
+    samples: int = 0
+
+
+@dataclass
+class Batch:
+    """Objetos de um ou mais targets compilados numa mesma etapa do ninja."""
+
+    targets: List[str]
+    outputs: List[str] = field(default_factory=list)
+    per_job_mb: float = DEFAULT_JOB_MB
+
+
+def default_memory_path() -> Path:
+    """Picos aprendidos ao lado do cache do doctor (ou em VLC_TARGET_MEMORY)."""
+    override = os.environ.get(MEMORY_ENV_VAR)
+    if override:
+        return Path(override)
+    return doctor.default_cache_path().parent / "target-memory.json"
+
+
+def load_memory(path: Path) -> Dict[str, TargetMemory]:
+    """Lê os picos aprendidos, ignorando arquivo ausente ou de outro formato."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != MEMORY_FORMAT:
+        return {}
+    table: Dict[str, TargetMemory] = {}
+    for target, entry in data.get("targets", {}).items():
+        try:
+            table[target] = TargetMemory(**entry)
+        except TypeError:
+            continue
+    return table
+
+
+def save_memory(path: Path, table: Dict[str, TargetMemory]) -> None:
+    """Grava os picos de forma atômica (arquivo temporário + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "format": MEMORY_FORMAT,
+        "targets": {target: asdict(entry) for target, entry in sorted(table.items())},
+    }
+    temp = path.with_suffix(path.suffix + ".tmp")
+    temp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    os.replace(temp, path)
+
+
+def target_of(output: str) -> str:
+    """Target dono de um objeto: o meson os coloca em '<saída do target>.p/'."""
+    head, sep, _ = output.partition(".p/")
+    return head if sep else str(Path(output).parent.as_posix())
+
+
+def estimate_mb(target: str, table: Dict[str, TargetMemory]) -> float:
+    """Pico por job esperado: o aprendido, senão a dica do caminho, senão o padrão."""
+    entry = table.get(target)
+    if entry is not None:
+        return entry.peak_mb
+    if target == FINAL_PHASE:
+        return FINAL_PHASE_DEFAULT_MB
+    for prefix, hint_mb in HEAVY_TARGET_HINTS:
+        if target.startswith(prefix):
+            return hint_mb
+    return DEFAULT_JOB_MB
+
+
+def pending_compiles(build_dir: Path) -> Dict[str, List[str]]:
+    """Objetos que o ninja compilaria agora (dry run), agrupados por target."""
+    completed = subprocess.run(
+        ["ninja", "-C", str(build_dir), "-n"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or completed.stdout.strip())
+    pending: Dict[str, List[str]] = {}
+    for line in completed.stdout.splitlines():
+        match = COMPILE_DESCRIPTION.search(line)
+        if match:
+            output = match.group(1)
+            pending.setdefault(target_of(output), []).append(output)
+    return pending
+
+
+def memory_budget_mb(reserve_mb: float) -> Optional[float]:
+    """RAM livre agora, descontada a reserva; None se não for possível medir."""
+    available = doctor.available_memory()
+    if available is None:
+        return None
+    return max(0.0, available / MB - reserve_mb)
+
+
+def jobs_for(per_job_mb: float, budget_mb: Optional[float], max_jobs: int) -> int:
+    """Quantos jobs cabem no orçamento de memória, entre 1 e max_jobs."""
+    if budget_mb is None:
+        return max_jobs
+    fitting = int(budget_mb // (per_job_mb * SAFETY_FACTOR))
+    return max(1, min(max_jobs, fitting))
+
+
+def plan_batches(
+    pending: Dict[str, List[str]],
+    table: Dict[str, TargetMemory],
+    budget_mb: Optional[float],
+    max_jobs: int,
+) -> List[Batch]:
+    """
+    Agrupa os targets pendentes em etapas.
+
+    Targets pesados (pico estimado a partir de HEAVY_JOB_MB) ganham uma etapa
+    própria; os demais são agrupados pelo número de jobs que suportam. As
+    etapas mais pesadas vêm primeiro, para que os targets longos comecem cedo.
+    """
+    solo: List[Batch] = []
+    grouped: Dict[int, Batch] = {}
+    for target, outputs in pending.items():
+        per_job = estimate_mb(target, table)
+        if per_job >= HEAVY_JOB_MB:
+            solo.append(Batch([target], list(outputs), per_job))
+            continue
+        jobs = jobs_for(per_job, budget_mb, max_jobs)
+        batch = grouped.setdefault(jobs, Batch([], [], 0.0))
+        batch.targets.append(target)
+        batch.outputs.extend(outputs)
+        batch.per_job_mb = max(batch.per_job_mb, per_job)
+
+    solo.sort(key=lambda batch: (-batch.per_job_mb, -len(batch.outputs)))
+    return solo + [grouped[jobs] for jobs in sorted(grouped)]
+
+
+def chunk_outputs(outputs: Sequence[str]) -> List[List[str]]:
+    """Divide os objetos para que cada linha de comando caiba no Windows."""
+    chunks: List[List[str]] = [[]]
+    length = 0
+    for output in outputs:
+        if chunks[-1] and length + len(output) + 1 > MAX_COMMAND_CHARS:
+            chunks.append([])
+            length = 0
+        chunks[-1].append(output)
+        length += len(output) + 1
+    return [chunk for chunk in chunks if chunk]
+
+
+class _PeakMemoryJob:
+    """Job Object do Windows: reporta o pico de memória do maior processo da árvore."""
+
+    def __init__(self) -> None:
+        import ctypes
+
+        self._ctypes = ctypes
+        self._kernel32 = ctypes.windll.kernel32
+        self._job = self._kernel32.CreateJobObjectW(None, None)
+
+    def attach_and_resume(self, pid: int) -> None:
+        """
+        Coloca no job um processo criado com CREATE_SUSPENDED e o retoma:
+        como nada rodou ainda, todos os compiladores que ele criar herdam o job.
+        """
+        process_access = 0x0100 | 0x0001 | 0x0800  # SET_QUOTA | TERMINATE | SUSPEND_RESUME
+        handle = self._kernel32.OpenProcess(process_access, False, pid)
+        if not handle:
+            raise OSError(f"OpenProcess falhou para o ninja (pid {pid})")
+        try:
+            self._kernel32.AssignProcessToJobObject(self._job, handle)
+            self._ctypes.windll.ntdll.NtResumeProcess(handle)
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def peak_bytes(self) -> Optional[int]:
+        ctypes = self._ctypes
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [(name, ctypes.c_ulonglong) for name in (
+                "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+                "ReadTransferCount", "WriteTransferCount", "OtherTransferCount",
+            )]
+
+        class JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+            _fields_ = [
+                ("PerProcessUserTimeLimit", ctypes.c_longlong),
+                ("PerJobUserTimeLimit", ctypes.c_longlong),
+                ("LimitFlags", ctypes.c_ulong),
+                ("MinimumWorkingSetSize", ctypes.c_size_t),
+                ("MaximumWorkingSetSize", ctypes.c_size_t),
+                ("ActiveProcessLimit", ctypes.c_ulong),
+                ("Affinity", ctypes.c_size_t),
+                ("PriorityClass", ctypes.c_ulong),
+                ("SchedulingClass", ctypes.c_ulong),
+            ]
+
+        class JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+            _fields_ = [
+                ("BasicLimitInformation", JOBOBJECT_BASIC_LIMIT_INFORMATION),
+                ("IoInfo", IO_COUNTERS),
+                ("ProcessMemoryLimit", ctypes.c_size_t),
+                ("JobMemoryLimit", ctypes.c_size_t),
+                ("PeakProcessMemoryUsed", ctypes.c_size_t),
+                ("PeakJobMemoryUsed", ctypes.c_size_t),
+            ]
+
+        info = JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+        job_object_extended_limit_information = 9
+        if not self._kernel32.QueryInformationJobObject(
+            self._job,
+            job_object_extended_limit_information,
+            ctypes.byref(info),
+            ctypes.sizeof(info),
+            None,
+        ):
+            return None
+        return int(info.PeakProcessMemoryUsed)
+
+    def close(self) -> None:
+        self._kernel32.CloseHandle(self._job)
+
+
+@dataclass
+class NinjaRun:
+    """Resultado de uma chamada ao ninja."""
+
+    returncode: int
+    peak_mb: Optional[float]
+    out_of_memory: bool = False
+
+
+def looks_out_of_memory(returncode: int, output_matched: bool) -> bool:
+    """Falha por memória: mensagem típica na saída ou processo morto por SIGKILL/STATUS_NO_MEMORY."""
+    if returncode == 0:
+        return False
+    if output_matched:
+        return True
+    if os.name == "nt":
+        return returncode & 0xFFFFFFFF == STATUS_NO_MEMORY
+    return returncode == -signal.SIGKILL
+
+
+def relay_output(process: subprocess.Popen) -> bool:
+    """Repassa a saída do ninja ao terminal; indica se apareceu um sinal de falta de memória."""
+    matched = False
+    assert process.stdout is not None
+    for line in process.stdout:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+        if not matched and OUT_OF_MEMORY.search(line):
+            matched = True
+    return matched
+
+
+def run_ninja(
+    build_dir: Path,
+    jobs: int,
+    outputs: Sequence[str] = (),
+) -> NinjaRun:
+    """
+    Executa o ninja com ``jobs`` jobs e devolve código de saída e pico em MB.
+
+    O pico é o do maior processo da árvore (um job de compilação ou o próprio
+    ninja): ru_maxrss do os.wait4 ou PeakProcessMemoryUsed do Job Object. No
+    Windows o ninja nasce suspenso e só é retomado depois de entrar no job,
+    para que nenhum compilador escape da medida.
+    """
+    command = ["ninja", "-C", str(build_dir), "-j", str(jobs), *outputs]
+    popen_kwargs: Dict[str, object] = {
+        "stdout": subprocess.PIPE,
+        "stderr": subprocess.STDOUT,
+        "text": True,
+        "errors": "replace",
+    }
+
+    if os.name == "nt":
+        job = _PeakMemoryJob()
+        try:
+            process = subprocess.Popen(command, creationflags=CREATE_SUSPENDED, **popen_kwargs)
+            try:
+                job.attach_and_resume(process.pid)
+            except OSError:
+                process.kill()
+                raise
+            matched = relay_output(process)
+            returncode = process.wait()
+            peak = job.peak_bytes()
+        finally:
+            job.close()
+        return NinjaRun(returncode, peak / MB if peak else None, looks_out_of_memory(returncode, matched))
+
+    process = subprocess.Popen(command, **popen_kwargs)
+    matched = relay_output(process)
+    if hasattr(os, "wait4"):
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss vem em KB no Linux e em bytes no macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        peak: Optional[float] = rusage.ru_maxrss * scale / MB
+    else:
+        process.wait()
+        peak = None
+    return NinjaRun(process.returncode, peak, looks_out_of_memory(process.returncode, matched))
+
+
+def learn(table: Dict[str, TargetMemory], batch: Batch, peak_mb: Optional[float]) -> None:
+    """
+    Atualiza os picos aprendidos com a medida de uma etapa.
+
+    Uma etapa com um único target dá o pico exato dele; picos maiores valem
+    na hora, menores só puxam a estimativa aos poucos (uma etapa que quase não
+    compilou nada não derruba o pico de um target pesado). Numa etapa com
+    vários, o pico só diz que nenhum passou dele: se superou a estimativa, os
+    targets sem medida exata herdam esse limite e rodarão sozinhos no próximo
+    build.
+    """
+    if peak_mb is None:
+        return
+    if len(batch.targets) == 1:
+        target = batch.targets[0]
+        entry = table.get(target)
+        if entry is not None and entry.exact and peak_mb < entry.peak_mb:
+            peak_mb = entry.peak_mb * (1 - PEAK_DECAY) + peak_mb * PEAK_DECAY
+        samples = entry.samples if entry else 0
+        table[target] = TargetMemory(round(peak_mb, 1), True, samples + 1)
+        return
+    if peak_mb <= batch.per_job_mb:
+        return
+    for target in batch.targets:
+        entry = table.get(target)
+        if entry is None or not entry.exact:
+            samples = entry.samples if entry else 0
+            table[target] = TargetMemory(round(peak_mb, 1), False, samples + 1)
+
+
+def describe(batch: Batch) -> str:
+    if len(batch.targets) == 1:
+        return batch.targets[0]
+    return f"{len(batch.targets)} targets leves"
+
+
+def run_batch(
+    build_dir: Path,
+    batch: Batch,
+    table: Dict[str, TargetMemory],
+    args: argparse.Namespace,
+) -> int:
+    """Roda uma etapa com os jobs que a RAM livre permite agora."""
+    budget = memory_budget_mb(args.reserve_mb)
+    jobs = jobs_for(batch.per_job_mb, budget, args.max_jobs)
+    free = f"{budget:.0f} MB livres" if budget is not None else "RAM livre desconhecida"
+    print(
+        f"🧮 {describe(batch)}: {len(batch.outputs) or 'todos os'} objetos, "
+        f"~{batch.per_job_mb:.0f} MB/job -> -j {jobs} ({free})",
+        flush=True,
+    )
+
+    chunks = chunk_outputs(batch.outputs) if batch.outputs else [[]]
+    peaks: List[float] = []
+    for chunk in chunks:
+        result = run_ninja(build_dir, jobs, chunk)
+        if result.out_of_memory and jobs > 1:
+            # Job morto por falta de memória: tenta com metade. Erros de
+            # compilação comuns não são repetidos (sairiam duas vezes).
+            jobs = max(1, jobs // 2)
+            print(f"⚠️ ninja falhou por falta de memória; repetindo com -j {jobs}", flush=True)
+            result = run_ninja(build_dir, jobs, chunk)
+        if result.peak_mb is not None:
+            peaks.append(result.peak_mb)
+        if result.returncode != 0:
+            return result.returncode
+
+    learn(table, batch, max(peaks) if peaks else None)
+    return 0
+
+
+def show_table(table: Dict[str, TargetMemory], path: Path) -> int:
+    if not table:
+        print(f"Nenhum pico aprendido ainda: {path}")
+        return 0
+    for target, entry in sorted(table.items(), key=lambda item: -item[1].peak_mb):
+        kind = "exato" if entry.exact else "limite"
+        print(f"{entry.peak_mb:>8.0f} MB  {kind:<6} {entry.samples:>3}x  {target}")
+    return 0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compila o VLC com o número de jobs ajustado à memória livre.",
+    )
+    parser.add_argument(
+        "--build-dir",
+        type=Path,
+        default=None,
+        help="Diretório de build do meson (padrão: vlc/build-mingw).",
+    )
+    parser.add_argument(
+        "--memory-file",
+        type=Path,
+        default=None,
+        help=f"Picos aprendidos por target (padrão: junto ao cache do doctor ou ${MEMORY_ENV_VAR}).",
+    )
+    parser.add_argument(
+        "--max-jobs",
+        type=doctor.positive_int,
+        default=doctor.usable_cores(),
+        help="Limite de jobs em paralelo (padrão: núcleos utilizáveis).",
+    )
+    parser.add_argument(
+        "--reserve-mb",
+        type=float,
+        default=DEFAULT_RESERVE_MB,
+        help=f"RAM deixada livre para o sistema, em MB (padrão: {DEFAULT_RESERVE_MB:g}).",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Mostrar as etapas sem compilar.")
+    parser.add_argument("--show", action="store_true", help="Listar os picos aprendidos e sair.")
+    args = parser.parse_args(argv)
+    if args.build_dir is None:
+        args.build_dir = doctor.default_build_dir()
+    if args.memory_file is None:
+        args.memory_file = default_memory_path()
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    table = load_memory(args.memory_file)
+    if args.show:
+        return show_table(table, args.memory_file)
+
+    try:
+        pending = pending_compiles(args.build_dir)
+    except (OSError, RuntimeError) as exc:
+        print(f"❌ Não foi possível consultar o ninja em {args.build_dir}: {exc}")
+        return 1
+
+    batches = plan_batches(
+        pending, table, memory_budget_mb(args.reserve_mb), args.max_jobs
+    )
+    # Etapa final: links e tudo que não é compilação, com o pico aprendido para ela
+    batches.append(Batch([FINAL_PHASE], [], estimate_mb(FINAL_PHASE, table)))
+    if args.dry_run:
+        for batch in batches:
+            budget = memory_budget_mb(args.reserve_mb)
+            jobs = jobs_for(batch.per_job_mb, budget, args.max_jobs)
+            print(
+                f"{describe(batch)}: {len(batch.outputs)} objetos, "
+                f"~{batch.per_job_mb:.0f} MB/job -> -j {jobs}"
+            )
+        return 0
+
+    try:
+        for batch in batches:
+            returncode = run_batch(args.build_dir, batch, table, args)
+            if returncode != 0:
+                return returncode
+    finally:
+        try:
+            save_memory(args.memory_file, table)
+        except OSError as exc:
+            print(f"⚠️ Não foi possível gravar os picos em {args.memory_file}: {exc}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
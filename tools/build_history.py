@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Build History - Histórico e previsão de duração dos builds
+
+Registra a duração de cada build junto com as características do host (as
+mesmas que o vlc_build_doctor coleta), o commit do VLC e as opções do meson em
+um histórico local (JSON Lines). Antes do `meson compile`, prevê a duração do
+próximo build com um intervalo de confiança a partir dos builds parecidos.
+
+Exemplos:
+    python tools/build_history.py predict --options="-Dqt=enabled"
+    python tools/build_history.py record --start 1700000000 --end 1700003600 \\
+        --status ok --source-dir vlc --options="-Dqt=enabled"
+    python tools/build_history.py show --limit 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+
+
+HISTORY_FORMAT = 1
+HISTORY_ENV_VAR = "VLC_BUILD_HISTORY"
+# Estimativa do README para o primeiro build, usada sem histórico
+README_ESTIMATE_MINUTES = (45, 90)
+# Quantos builds parecidos (mais recentes) entram na previsão
+PREDICTION_WINDOW = 20
+# Valores críticos t de Student (bicaudal, 90%) por graus de liberdade
+T_CRITICAL_90 = {
+    1: 6.314, 2: 2.920, 3: 2.353, 4: 2.132, 5: 2.015, 6: 1.943, 7: 1.895,
+    8: 1.860, 9: 1.833, 10: 1.812, 12: 1.782, 15: 1.753, 20: 1.725,
+    25: 1.708, 30: 1.697,
+}
+
+
+@dataclass
+class HostInfo:
+    """Características do host que influenciam a duração do build."""
+
+    hostname: str
+    platform: str
+    cores: int
+    total_ram_gb: Optional[float]
+    available_ram_gb: Optional[float]
+
+
+@dataclass
+class BuildRecord:
+    """Um build concluído (com sucesso ou não)."""
+
+    started_at: float
+    duration_s: float
+    status: str
+    kind: str
+    host: HostInfo
+    vlc_commit: Optional[str]
+    meson_options: List[str] = field(default_factory=list)
+    options_hash: str = ""
+    format: int = HISTORY_FORMAT
+
+
+@dataclass
+class Prediction:
+    """Duração prevista e intervalo de confiança de 90%, em segundos."""
+
+    expected_s: float
+    low_s: float
+    high_s: float
+    samples: int
+    basis: str
+
+
+def default_history_path() -> Path:
+    """Histórico ao lado do cache do doctor (ou em VLC_BUILD_HISTORY)."""
+    override = os.environ.get(HISTORY_ENV_VAR)
+    if override:
+        return Path(override)
+    return doctor.default_cache_path().parent / "build-history.jsonl"
+
+
+def collect_host_info() -> HostInfo:
+    """Coleta os dados de host usando as mesmas funções do doctor."""
+    total = doctor.total_memory()
+    available = doctor.available_memory()
+    return HostInfo(
+        hostname=platform.node(),
+        platform=platform.platform(),
+        cores=doctor.usable_cores(),
+        total_ram_gb=round(total / doctor.GIB, 1) if total else None,
+        available_ram_gb=round(available / doctor.GIB, 1) if available else None,
+    )
+
+
+def vlc_commit(source_dir: Optional[Path]) -> Optional[str]:
+    """Commit atual do fonte do VLC, se for um repositório git."""
+    if source_dir is None:
+        return None
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(source_dir), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    commit = completed.stdout.strip()
+    return commit if completed.returncode == 0 and commit else None
+
+
+def options_hash(options: Sequence[str]) -> str:
+    """Identificador estável de um conjunto de opções do meson."""
+    canonical = "\n".join(sorted(options))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def load_history(path: Path) -> List[BuildRecord]:
+    """Lê o histórico, ignorando linhas corrompidas ou de outro formato."""
+    records: List[BuildRecord] = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return records
+
+    for line in lines:
+        try:
+            data = json.loads(line)
+            if data.get("format") != HISTORY_FORMAT:
+                continue
+            data["host"] = HostInfo(**data["host"])
+            records.append(BuildRecord(**data))
+        except (ValueError, TypeError, KeyError):
+            continue
+    return records
+
+
+def append_record(path: Path, record: BuildRecord) -> None:
+    """Acrescenta um build ao histórico (uma linha JSON por build)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(asdict(record)) + "\n")
+
+
+def t_critical(degrees: int) -> float:
+    """Valor t de 90% para ``degrees`` graus de liberdade (aproximação tabelada)."""
+    if degrees <= 0:
+        return float("inf")
+    if degrees > max(T_CRITICAL_90):
+        return 1.645
+    return T_CRITICAL_90[max(df for df in T_CRITICAL_90 if df <= degrees)]
+
+
+def similar_builds(
+    records: Sequence[BuildRecord],
+    host: HostInfo,
+    opts_hash: str,
+    kind: str,
+) -> Tuple[List[BuildRecord], str]:
+    """
+    Seleciona os builds mais parecidos com o próximo, do critério mais
+    estrito ao mais amplo, até encontrar pelo menos dois.
+
+    Tipos de build nunca se misturam: um build limpo e um incremental diferem
+    em uma ordem de grandeza. Com menos de dois builds do mesmo tipo não há
+    previsão (vale a estimativa do README).
+    """
+    same_kind = [
+        record for record in records if record.status == "ok" and record.kind == kind
+    ]
+
+    def same_host(record: BuildRecord) -> bool:
+        return record.host.hostname == host.hostname
+
+    criteria = (
+        ("mesmo host, opções e tipo", lambda r: same_host(r) and r.options_hash == opts_hash),
+        ("mesmo host e tipo", same_host),
+        ("mesmo tipo, outros hosts", lambda r: True),
+    )
+    for basis, matches in criteria:
+        chosen = [record for record in same_kind if matches(record)][-PREDICTION_WINDOW:]
+        if len(chosen) >= 2:
+            return chosen, basis
+    return [], ""
+
+
+def predict(
+    records: Sequence[BuildRecord],
+    host: HostInfo,
+    opts_hash: str,
+    kind: str,
+) -> Optional[Prediction]:
+    """
+    Prevê a duração do próximo build.
+
+    Cada build vira "trabalho" (duração x núcleos), escalado para os núcleos
+    do host atual. A previsão é a média geométrica e o intervalo de 90% vem da
+    distribuição t sobre o log das durações (durações de build são
+    aproximadamente log-normais).
+    """
+    chosen, basis = similar_builds(records, host, opts_hash, kind)
+    if not chosen:
+        return None
+
+    scaled = [
+        record.duration_s * max(record.host.cores, 1) / max(host.cores, 1)
+        for record in chosen
+    ]
+    logs = [math.log(max(value, 1.0)) for value in scaled]
+    mean = statistics.fmean(logs)
+    spread = statistics.stdev(logs) * math.sqrt(1 + 1 / len(logs))
+    margin = t_critical(len(logs) - 1) * spread
+    return Prediction(
+        expected_s=math.exp(mean),
+        low_s=math.exp(mean - margin),
+        high_s=math.exp(mean + margin),
+        samples=len(logs),
+        basis=basis,
+    )
+
+
+def format_minutes(seconds: float) -> str:
+    return f"{seconds / 60:.0f} min"
+
+
+def command_predict(args: argparse.Namespace) -> int:
+    options = shlex.split(args.options or "")
+    host = collect_host_info()
+    prediction = predict(
+        load_history(args.history), host, options_hash(options), args.kind
+    )
+
+    if prediction is None:
+        low, high = README_ESTIMATE_MINUTES
+        print(
+            f"⏱️ Menos de 2 builds '{args.kind}' no histórico; "
+            f"estimativa do README: {low}-{high} minutos."
+        )
+        return 0
+
+    print(
+        f"⏱️ Previsão: ~{format_minutes(prediction.expected_s)} "
+        f"(IC 90%: {format_minutes(prediction.low_s)}-{format_minutes(prediction.high_s)}; "
+        f"{prediction.samples} builds, {prediction.basis})"
+    )
+    if args.json:
+        print(json.dumps(asdict(prediction)))
+    return 0
+
+
+def command_record(args: argparse.Namespace) -> int:
+    options = shlex.split(args.options or "")
+    end = args.end if args.end is not None else time.time()
+    record = BuildRecord(
+        started_at=args.start,
+        duration_s=max(0.0, end - args.start),
+        status=args.status,
+        kind=args.kind,
+        host=collect_host_info(),
+        vlc_commit=vlc_commit(args.source_dir),
+        meson_options=options,
+        options_hash=options_hash(options),
+    )
+    try:
+        append_record(args.history, record)
+    except OSError as exc:
+        print(f"⚠️ Não foi possível gravar o histórico em {args.history}: {exc}")
+        return 1
+    print(
+        f"📝 Build registrado: {format_minutes(record.duration_s)} "
+        f"({record.status}, {record.kind}) em {args.history}"
+    )
+    return 0
+
+
+def command_show(args: argparse.Namespace) -> int:
+    records = load_history(args.history)[-args.limit:]
+    if not records:
+        print(f"Histórico vazio: {args.history}")
+        return 0
+    for record in records:
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(record.started_at))
+        commit = (record.vlc_commit or "-")[:10]
+        print(
+            f"{started}  {format_minutes(record.duration_s):>8}  {record.status:<5} "
+            f"{record.kind:<12} {record.host.hostname} ({record.host.cores} núcleos)  {commit}"
+        )
+    return 0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Histórico de builds do VLC e previsão da duração do próximo build.",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=None,
+        help=f"Arquivo de histórico (padrão: junto ao cache do doctor ou ${HISTORY_ENV_VAR}).",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_build_options(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument(
+            "--options",
+            default="",
+            help='Opções do meson em uma string (use --options="-Dqt=enabled ...").',
+        )
+        sub.add_argument(
+            "--kind",
+            default="clean",
+            help="Tipo de build, ex.: clean ou incremental (padrão: clean).",
+        )
+
+    predict_parser = subparsers.add_parser("predict", help="Prever a duração do próximo build.")
+    add_build_options(predict_parser)
+    predict_parser.add_argument("--json", action="store_true", help="Imprimir também a previsão em JSON.")
+    predict_parser.set_defaults(handler=command_predict)
+
+    record_parser = subparsers.add_parser("record", help="Registrar um build concluído.")
+    add_build_options(record_parser)
+    record_parser.add_argument("--start", type=float, required=True, help="Início do build (epoch, date +%%s).")
+    record_parser.add_argument("--end", type=float, default=None, help="Fim do build (epoch; padrão: agora).")
+    record_parser.add_argument("--status", choices=("ok", "fail"), default="ok", help="Resultado do build.")
+    record_parser.add_argument("--source-dir", type=Path, default=None, help="Fonte do VLC, para registrar o commit.")
+    record_parser.set_defaults(handler=command_record)
+
+    show_parser = subparsers.add_parser("show", help="Listar os últimos builds registrados.")
+    show_parser.add_argument("--limit", type=doctor.positive_int, default=20, help="Quantos builds listar (padrão: 20).")
+    show_parser.set_defaults(handler=command_show)
+
+    args = parser.parse_args(argv)
+    if args.history is None:
+        args.history = default_history_path()
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
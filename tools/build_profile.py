@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Build Profile - Conjunto mínimo de opções do meson a partir de um perfil
+
+Um perfil (profiles/*.json) declara os codecs, demuxers, saídas e interfaces
+que realmente distribuímos. O gerador lê o meson_options.txt do fonte do VLC,
+resolve cada feature para as opções do meson que ela exige e produz o menor
+conjunto de opções que ainda a atende: `-Dauto_features=disabled` desliga de
+uma vez todos os módulos auto-detectados, e só o necessário é ligado
+explicitamente. Dependências de base que nenhuma feature nomeia mas o player
+precisa (swscale, zlib...) ficam sempre ligadas; as opções 'auto' desligadas
+que não parecem ser de um plugin são listadas como aviso. A economia de
+compilação é estimada pelo .ninja_log do último build (tempo dos plugins que
+deixam de ser compilados).
+
+Exemplos:
+    python tools/build_profile.py profiles/player-minimal.json --source vlc
+    python tools/build_profile.py profiles/player-minimal.json --source vlc --args-out opts.txt
+    python tools/build_profile.py --list-features
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+import ninja_profile  # noqa: E402
+
+
+PROFILE_FORMAT = 1
+OPTION_FILES = ("meson_options.txt", "meson.options")
+CATEGORIES = ("codecs", "demuxers", "outputs", "interfaces")
+# Features -> opções do meson do VLC que precisam estar ligadas. Tupla vazia:
+# o módulo é compilado sempre (sem opção), nada a ligar.
+FEATURE_CATALOG: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "codecs": {
+        "h264": ("avcodec",),
+        "hevc": ("avcodec",),
+        "vp9": ("avcodec",),
+        "av1": ("dav1d",),
+        "mpeg2": ("libmpeg2",),
+        "aac": ("avcodec",),
+        "mp3": ("mpg123",),
+        "opus": ("opus",),
+        "vorbis": ("vorbis",),
+        "flac": ("flac",),
+        "ac3": ("a52",),
+        "dts": ("dca",),
+        "ass-subtitles": ("libass", "freetype"),
+        "text-subtitles": ("freetype",),
+    },
+    "demuxers": {
+        "mp4": (),
+        "ts": (),
+        "avi": (),
+        "mkv": ("matroska",),
+        "ogg": ("ogg",),
+        "avformat": ("avformat",),
+        "bluray": ("bluray",),
+        "dvd": ("dvdread", "dvdnav"),
+    },
+    "outputs": {
+        "direct3d11": (),
+        "opengl": (),
+        "wasapi": (),
+        "directsound": (),
+        "vulkan": ("vulkan", "libplacebo"),
+        "pulse": ("pulse",),
+        "alsa": ("alsa",),
+    },
+    "interfaces": {
+        "qt": ("qt",),
+        "skins2": ("skins2",),
+        "lua": ("lua",),
+        "ncurses": ("ncurses",),
+        "dbus": ("dbus",),
+    },
+}
+# Dependências do núcleo ligadas em todo perfil (sobrescreva com "base" no perfil):
+# -Dauto_features=disabled as desligaria sem que nenhuma feature as peça
+BASE_OPTIONS: Dict[str, str] = {
+    "swscale": "conversão de chroma e escala de vídeo",
+    "zlib": "cabeçalhos comprimidos (MKV, MP4) e PNG",
+    "freetype": "texto na tela (OSD, títulos)",
+    "libxml2": "playlists XSPF e listas de reprodução",
+}
+# Palavras na descrição de uma opção que indicam um plugin opcional
+PLUGIN_HINTS = (
+    "plugin", "module", "decoder", "encoder", "demux", "muxer", "access",
+    "output", "interface", "filter", "codec", "discovery",
+)
+# CPU por plugin desligado quando não há .ninja_log para medir (estimativa grosseira)
+FALLBACK_OPTION_CPU_S = 20.0
+
+
+@dataclass
+class MesonOption:
+    name: str
+    type: str
+    value: Optional[str]
+    description: str = ""
+
+
+@dataclass
+class ProfilePlan:
+    """Resultado do gerador para um perfil."""
+
+    profile: str
+    args: List[str]
+    enabled: List[str]
+    disabled: List[str]
+    missing: List[str] = field(default_factory=list)
+    unknown_features: List[str] = field(default_factory=list)
+    # Opções 'auto' desligadas que não parecem ser de um plugin (revise o perfil)
+    unclear_drops: List[str] = field(default_factory=list)
+    saved_cpu_s: float = 0.0
+    saved_wall_s: float = 0.0
+    estimate_basis: str = ""
+
+
+def find_options_file(source: Path) -> Path:
+    for name in OPTION_FILES:
+        candidate = source / name
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(f"nenhum {' ou '.join(OPTION_FILES)} em {source}")
+
+
+def _option_calls(text: str) -> List[str]:
+    """Argumentos de cada chamada option(...), respeitando strings e parênteses."""
+    calls: List[str] = []
+    for match in re.finditer(r"\boption\s*\(", text):
+        depth, index, quoted = 1, match.end(), False
+        while index < len(text) and depth:
+            char = text[index]
+            if char == "\\" and quoted:
+                index += 1
+            elif char == "'":
+                quoted = not quoted
+            elif not quoted and char == "(":
+                depth += 1
+            elif not quoted and char == ")":
+                depth -= 1
+            index += 1
+        calls.append(text[match.end():index - 1])
+    return calls
+
+
+def parse_meson_options(path: Path) -> Dict[str, MesonOption]:
+    """
+    Lê nome, tipo, valor padrão e descrição das opções do meson_options.txt.
+
+    Uma feature declarada sem ``value:`` vale 'auto' (padrão do meson).
+    """
+    text = "\n".join(
+        line for line in path.read_text(encoding="utf-8").splitlines()
+        if not line.lstrip().startswith("#")
+    )
+    options: Dict[str, MesonOption] = {}
+    for call in _option_calls(text):
+        name = re.match(r"\s*'([^']+)'", call)
+        if not name:
+            continue
+        kind = re.search(r"\btype\s*:\s*'(\w+)'", call)
+        value = re.search(r"\bvalue\s*:\s*('([^']*)'|\w+)", call)
+        description = re.search(r"\bdescription\s*:\s*'([^']*)'", call)
+        option_type = kind.group(1) if kind else "string"
+        default = (value.group(2) if value.group(2) is not None else value.group(1)) if value else None
+        if default is None and option_type == "feature":
+            default = "auto"
+        options[name.group(1)] = MesonOption(
+            name=name.group(1),
+            type=option_type,
+            value=default,
+            description=description.group(1) if description else "",
+        )
+    return options
+
+
+def load_profile(path: Path) -> Dict:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("format", PROFILE_FORMAT) != PROFILE_FORMAT:
+        raise ValueError(f"formato de perfil não suportado em {path}")
+    return data
+
+
+def required_options(profile: Dict) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Opções exigidas (opção -> features que a pedem) e features desconhecidas.
+
+    As opções de base aparecem com o motivo "base".
+    """
+    required: Dict[str, List[str]] = {}
+    unknown: List[str] = []
+    for option in profile.get("base", list(BASE_OPTIONS)):
+        required.setdefault(option, []).append("base")
+    features = profile.get("features", {})
+    for category in CATEGORIES:
+        catalog = FEATURE_CATALOG[category]
+        for feature in features.get(category, []):
+            if feature not in catalog:
+                unknown.append(f"{category}/{feature}")
+                continue
+            for option in catalog[feature]:
+                required.setdefault(option, []).append(feature)
+    for option in profile.get("enable", []):
+        required.setdefault(option, []).append("enable")
+    return required, unknown
+
+
+def looks_like_plugin(option: MesonOption) -> bool:
+    """Opção de um plugin opcional: está no catálogo ou a descrição diz que é."""
+    if any(option.name in needs for catalog in FEATURE_CATALOG.values() for needs in catalog.values()):
+        return True
+    description = option.description.lower()
+    return any(hint in description for hint in PLUGIN_HINTS)
+
+
+def measured_option_costs(build_dir: Path, options: Sequence[str]) -> Optional[Dict[str, float]]:
+    """
+    CPU (s) do último build gasta nos plugins de cada opção, pelo .ninja_log.
+
+    Um passo pertence à opção se o target é `lib<opção>...plugin` ou fica num
+    diretório de módulo com o nome dela (ex.: modules/gui/qt para qt).
+    """
+    log = build_dir / ninja_profile.NINJA_LOG
+    if not log.is_file():
+        return None
+    latest: Dict[str, float] = {}
+    try:
+        for run in ninja_profile.read_log_runs(log):
+            for step in run:
+                for output in step.outputs:
+                    latest[output] = step.duration_ms / 1000 / len(step.outputs)
+    except (OSError, ValueError):
+        return None
+
+    costs = {option: 0.0 for option in options}
+    for output, seconds in latest.items():
+        target, module = ninja_profile.owner(output, {})
+        target_name = Path(target).name
+        for option in options:
+            if (
+                (target_name.startswith(f"lib{option}") and "plugin" in target_name)
+                or module.endswith(f"/{option}")
+            ):
+                costs[option] += seconds
+                break
+    return costs
+
+
+def plan_profile(
+    profile: Dict,
+    options: Dict[str, MesonOption],
+    build_dir: Optional[Path],
+    cores: int,
+) -> ProfilePlan:
+    required, unknown = required_options(profile)
+    features = {name: opt for name, opt in options.items() if opt.type == "feature"}
+    # Opções de base ausentes nesta versão do VLC são ignoradas em silêncio
+    missing = sorted(
+        option for option, reasons in required.items()
+        if option not in options and reasons != ["base"]
+    )
+    enabled = sorted(option for option in required if option in features)
+    switches = sorted(
+        option for option in required
+        if option in options and options[option].type == "boolean"
+    )
+
+    # auto_features=disabled cobre tudo que é 'auto'; o que vem 'enabled' por
+    # padrão e não é exigido precisa ser desligado explicitamente
+    disabled_explicit = sorted(
+        name for name, opt in features.items()
+        if opt.value == "enabled" and name not in required
+    )
+    args = ["-Dauto_features=disabled"]
+    args += [f"-D{name}=enabled" for name in enabled]
+    args += [f"-D{name}=disabled" for name in disabled_explicit]
+    args += [f"-D{name}=true" for name in switches]
+    for name, value in sorted(profile.get("options", {}).items()):
+        args.append(f"-D{name}={value}")
+
+    dropped = sorted(
+        name for name, opt in features.items()
+        if opt.value in ("auto", "enabled") and name not in required
+    )
+    plan = ProfilePlan(
+        profile=profile.get("name", "?"),
+        args=args,
+        enabled=enabled + switches,
+        disabled=dropped,
+        missing=missing,
+        unknown_features=unknown,
+        unclear_drops=[
+            name for name in dropped
+            if features[name].value == "auto" and not looks_like_plugin(features[name])
+        ],
+    )
+
+    costs = measured_option_costs(build_dir, dropped) if build_dir else None
+    if costs is not None:
+        plan.saved_cpu_s = round(sum(costs.values()), 1)
+        plan.estimate_basis = f"medido no .ninja_log de {build_dir}"
+    else:
+        plan.saved_cpu_s = round(len(dropped) * FALLBACK_OPTION_CPU_S, 1)
+        plan.estimate_basis = f"sem .ninja_log: ~{FALLBACK_OPTION_CPU_S:g} s de CPU por opção"
+    plan.saved_wall_s = round(plan.saved_cpu_s / max(cores, 1), 1)
+    return plan
+
+
+def print_plan(plan: ProfilePlan) -> None:
+    print(f"🧩 Perfil {plan.profile}: {len(plan.args)} opções do meson")
+    print(f"  ✓ Ligadas: {', '.join(plan.enabled) or '(nenhuma)'}")
+    print(f"  ✗ Desligadas (auto-detectadas ou padrão): {len(plan.disabled)} opções")
+    for name in plan.missing:
+        print(f"  ⚠️ Opção '{name}' não existe neste meson_options.txt; ignorada")
+    for feature in plan.unknown_features:
+        print(f"  ⚠️ Feature desconhecida '{feature}' (veja --list-features)")
+    if plan.unclear_drops:
+        print(
+            f"  ⚠️ Desligadas sem parecer plugins (confira se o perfil não precisa; "
+            f"use \"enable\" para mantê-las): {', '.join(plan.unclear_drops)}"
+        )
+    print(
+        f"  ⏱️ Economia estimada: {plan.saved_cpu_s / 60:.1f} min de CPU "
+        f"(~{plan.saved_wall_s / 60:.1f} min de relógio; {plan.estimate_basis})"
+    )
+
+
+def list_features() -> None:
+    print("base (sempre ligadas; \"base\" no perfil substitui a lista):")
+    for option, reason in BASE_OPTIONS.items():
+        print(f"  {option:<16} {reason}")
+    for category in CATEGORIES:
+        print(f"{category}:")
+        for feature, options in FEATURE_CATALOG[category].items():
+            needs = ", ".join(options) if options else "sempre compilado"
+            print(f"  {feature:<16} {needs}")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Gera o conjunto mínimo de opções do meson para um perfil de features do VLC.",
+    )
+    parser.add_argument("profile", type=Path, nargs="?", help="Perfil JSON (ex.: profiles/player-minimal.json).")
+    parser.add_argument("--source", type=Path, default=None, help="Fonte do VLC (padrão: vlc/ ao lado do repositório).")
+    parser.add_argument(
+        "--build-dir",
+        type=Path,
+        default=None,
+        help="Build anterior cujo .ninja_log mede a economia (padrão: <fonte>/build-mingw).",
+    )
+    parser.add_argument("--args-out", type=Path, default=None, help="Gravar as opções, uma por linha, neste arquivo.")
+    parser.add_argument("--json", action="store_true", help="Imprimir o plano em JSON em vez do resumo.")
+    parser.add_argument("--list-features", action="store_true", help="Listar as features conhecidas e sair.")
+    args = parser.parse_args(argv)
+    if not args.list_features and args.profile is None:
+        parser.error("informe o perfil ou use --list-features")
+    if args.source is None:
+        args.source = doctor.default_build_dir().parent
+    if args.build_dir is None:
+        args.build_dir = args.source / "build-mingw"
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.list_features:
+        list_features()
+        return 0
+
+    try:
+        profile = load_profile(args.profile)
+        options = parse_meson_options(find_options_file(args.source))
+    except (OSError, ValueError) as exc:
+        print(f"❌ {exc}")
+        return 1
+
+    plan = plan_profile(profile, options, args.build_dir, doctor.usable_cores())
+    if args.json:
+        print(json.dumps(asdict(plan), indent=2))
+    else:
+        print_plan(plan)
+    if args.args_out:
+        args.args_out.write_text("\n".join(plan.args) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
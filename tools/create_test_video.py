@@ -1,89 +1,689 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Cria um video de teste simples para validar o VLC compilado.
-Usa apenas ffmpeg (ja disponivel no MSYS2) para criar um video curto.
+Cria videos de teste para validar o VLC compilado.
+Usa apenas ffmpeg (ja disponivel no MSYS2).
+
+Sem argumentos, cria o video curto usado pelo Validate-VLC-Playback.ps1.
+Com --matrix, gera uma matriz declarativa de midias (codecs, resolucoes ate
+4K, frame rates, GOP, faixas de audio e containers) em paralelo, com um numero
+limitado de processos ffmpeg ao mesmo tempo. Cada saida e identificada pelo
+hash dos seus parametros do ffmpeg: execucoes seguintes pulam o que ja existe
+e continua valido.
+
+Com --stream, gera um MPEG-TS sem fim (ou longo, com --duration) direto para o
+stdout, um FIFO ou um servidor TCP/HTTP local, sem arquivos intermediarios. O
+buffer entre o ffmpeg e o destino e limitado: se o consumidor (o VLC) fica
+para tras, o ffmpeg e freado em vez de acumular dados em memoria.
+
+Exemplos:
+    python tools/create_test_video.py --stream - | vlc -
+    python tools/create_test_video.py --stream http://127.0.0.1:8080 --bitrate 80M
+    vlc http://127.0.0.1:8080
 """
 
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import queue
+import socket
+import stat
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-def create_test_video(output_path: Path) -> bool:
-    """Cria um video de teste de 5 segundos com cor solida e texto."""
-    
-    try:
-        # Comando ffmpeg para gerar video de teste
-        # - 5 segundos de duracao
-        # - 1280x720 resolucao
-        # - Background gradiente
-        # - Texto "VLC TEST VIDEO"
-        cmd = [
-            "ffmpeg",
+CACHE_INDEX_NAME = ".media-cache.json"
+MATRIX_DIR_NAME = "matrix"
+DEFAULT_DURATION = 5
+
+# Argumentos de cada codec de video (presets rapidos: o objetivo e cobertura)
+VIDEO_CODECS: Dict[str, List[str]] = {
+    "h264": ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p"],
+    "hevc": ["-c:v", "libx265", "-preset", "ultrafast", "-pix_fmt", "yuv420p"],
+    "vp9": ["-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8", "-pix_fmt", "yuv420p"],
+    "av1": ["-c:v", "libsvtav1", "-preset", "12", "-pix_fmt", "yuv420p"],
+    "mpeg2": ["-c:v", "mpeg2video", "-q:v", "4", "-pix_fmt", "yuv420p"],
+}
+
+# Faixas de audio: (encoder, canais) por faixa
+AUDIO_LAYOUTS: Dict[str, List[Tuple[str, int]]] = {
+    "none": [],
+    "aac-stereo": [("aac", 2)],
+    "opus-stereo": [("libopus", 2)],
+    "aac-5.1": [("aac", 6)],
+    "aac-stereo+5.1": [("aac", 2), ("aac", 6)],
+}
+
+# Combinacoes aceitas por container; as demais sao descartadas da matriz
+CONTAINERS: Dict[str, Dict[str, object]] = {
+    "mp4": {"video": {"h264", "hevc", "av1", "mpeg2"}, "audio": {"aac", "libopus"}, "args": ["-movflags", "+faststart"]},
+    "mkv": {"video": set(VIDEO_CODECS), "audio": {"aac", "libopus"}, "args": []},
+    "webm": {"video": {"vp9", "av1"}, "audio": {"libopus"}, "args": []},
+    "ts": {"video": {"h264", "hevc", "mpeg2"}, "audio": {"aac"}, "args": []},
+}
+
+# Matriz padrao: cada grupo e o produto cartesiano dos seus eixos
+DEFAULT_MATRIX = {
+    "duration": DEFAULT_DURATION,
+    "groups": [
+        {
+            "name": "codecs",
+            "video": ["h264", "hevc", "vp9", "av1", "mpeg2"],
+            "container": ["mp4", "mkv", "webm", "ts"],
+            "resolution": ["1280x720"],
+            "fps": [30],
+            "gop": [60],
+            "audio": ["aac-stereo", "opus-stereo"],
+        },
+        {
+            "name": "resolucoes",
+            "video": ["h264", "hevc"],
+            "resolution": ["640x360", "1280x720", "1920x1080", "3840x2160"],
+            "fps": [24, 30, 60],
+            "gop": [60],
+            "audio": ["aac-stereo"],
+            "container": ["mp4"],
+        },
+        {
+            "name": "gop",
+            "video": ["h264"],
+            "resolution": ["1920x1080"],
+            "fps": [30],
+            "gop": [1, 12, 250],
+            "audio": ["none"],
+            "container": ["mkv"],
+        },
+        {
+            "name": "audio",
+            "video": ["h264"],
+            "resolution": ["1280x720"],
+            "fps": [30],
+            "gop": [60],
+            "audio": list(AUDIO_LAYOUTS),
+            "container": ["mkv"],
+        },
+    ],
+}
+
+MATRIX_AXES = ("video", "resolution", "fps", "gop", "audio", "container")
+
+STREAM_CHUNK = 64 * 1024
+DEFAULT_STREAM_BUFFER_MB = 8
+STREAM_STATUS_INTERVAL = 5.0
+HTTP_RESPONSE_HEADERS = (
+    b"HTTP/1.0 200 OK\r\n"
+    b"Content-Type: video/mp2t\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+
+@dataclass(frozen=True)
+class MediaSpec:
+    """Uma midia da matriz."""
+
+    video: str
+    resolution: str
+    fps: int
+    gop: int
+    audio: str
+    container: str
+    duration: int = DEFAULT_DURATION
+
+    @property
+    def label(self) -> str:
+        return f"{self.video}_{self.resolution}_{self.fps}fps_gop{self.gop}_{self.audio}"
+
+    def is_supported(self) -> bool:
+        """Codec de video e encoders de audio cabem no container?"""
+        container = CONTAINERS[self.container]
+        if self.video not in container["video"]:
+            return False
+        return all(encoder in container["audio"] for encoder, _ in AUDIO_LAYOUTS[self.audio])
+
+
+def media_args(spec: MediaSpec) -> List[str]:
+    """Argumentos do ffmpeg (sem threads nem arquivo de saida) para uma midia."""
+    width, height = spec.resolution.split("x")
+    args = [
+        "-f", "lavfi",
+        "-i", f"testsrc2=size={width}x{height}:rate={spec.fps}:duration={spec.duration}",
+    ]
+    tracks = AUDIO_LAYOUTS[spec.audio]
+    for index, _ in enumerate(tracks):
+        args += [
             "-f", "lavfi",
-            "-i", "color=c=blue:s=1280x720:d=5",
-            "-f", "lavfi", 
-            "-i", "color=c=red:s=1280x720:d=5",
-            "-filter_complex",
-            "[0:v][1:v]blend=all_mode=addition:all_opacity=0.5,drawtext=text='VLC TEST VIDEO':fontsize=72:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
-            "-c:v", "libx264",
-            "-preset", "ultrafast",
-            "-pix_fmt", "yuv420p",
-            "-y",
-            str(output_path)
+            "-i", f"sine=frequency={440 * (index + 1)}:sample_rate=48000:duration={spec.duration}",
         ]
-        
-        print(f"Criando video de teste em: {output_path}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        
-        if result.returncode != 0:
-            print(f"Erro ao criar video: {result.stderr}")
+
+    args += ["-map", "0:v"]
+    args += [item for index in range(len(tracks)) for item in ("-map", f"{index + 1}:a")]
+    args += VIDEO_CODECS[spec.video] + ["-g", str(spec.gop), "-r", str(spec.fps)]
+    if spec.video == "hevc" and spec.container == "mp4":
+        args += ["-tag:v", "hvc1"]
+
+    for index, (encoder, channels) in enumerate(tracks):
+        args += [f"-c:a:{index}", encoder, f"-ac:a:{index}", str(channels)]
+        if encoder == "libopus" and channels > 2:
+            args += [f"-mapping_family:a:{index}", "1"]
+
+    args += list(CONTAINERS[spec.container]["args"])
+    args += ["-t", str(spec.duration)]
+    return args
+
+
+def cache_key(args: Sequence[str]) -> str:
+    """Hash dos parametros do ffmpeg que definem o conteudo da saida."""
+    return hashlib.sha256(json.dumps(list(args)).encode("utf-8")).hexdigest()[:12]
+
+
+def expand_matrix(matrix: dict) -> Tuple[List[MediaSpec], int]:
+    """Expande os grupos da matriz; retorna (midias unicas, combinacoes descartadas)."""
+    duration = int(matrix.get("duration", DEFAULT_DURATION))
+    specs: List[MediaSpec] = []
+    seen = set()
+    discarded = 0
+    for group in matrix.get("groups", []):
+        unknown = [axis for axis in group if axis not in MATRIX_AXES + ("name",)]
+        if unknown:
+            raise ValueError(f"Eixo desconhecido no grupo {group.get('name', '?')}: {', '.join(unknown)}")
+        axes = [group.get(axis) or [] for axis in MATRIX_AXES]
+        for values in itertools.product(*axes):
+            spec = MediaSpec(*values, duration=duration)
+            if spec.video not in VIDEO_CODECS or spec.audio not in AUDIO_LAYOUTS or spec.container not in CONTAINERS:
+                raise ValueError(f"Valor desconhecido na matriz: {spec}")
+            if not spec.is_supported():
+                discarded += 1
+                continue
+            if spec not in seen:
+                seen.add(spec)
+                specs.append(spec)
+    return specs, discarded
+
+
+def load_matrix(path: Optional[Path]) -> dict:
+    """Matriz de um arquivo JSON (mesmo formato de DEFAULT_MATRIX) ou a padrao."""
+    if path is None:
+        return DEFAULT_MATRIX
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class MediaCache:
+    """
+    Indice das midias geradas em um diretorio: hash dos parametros e tamanho
+    de cada arquivo. Uma saida so e reaproveitada se existir com o mesmo hash
+    e o mesmo tamanho registrado.
+    """
+
+    def __init__(self, directory: Path):
+        self.path = directory / CACHE_INDEX_NAME
+        self.lock = threading.Lock()
+        try:
+            self.entries: Dict[str, dict] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_valid(self, output: Path, key: str) -> bool:
+        entry = self.entries.get(output.name)
+        if not entry or entry.get("key") != key:
             return False
-        
-        if output_path.exists():
-            size_mb = output_path.stat().st_size / (1024 * 1024)
-            print(f"✓ Video criado com sucesso! ({size_mb:.2f} MB)")
-            return True
-        
-        return False
-        
+        try:
+            size = output.stat().st_size
+        except OSError:
+            return False
+        return size > 0 and size == entry.get("size")
+
+    def record(self, output: Path, key: str) -> None:
+        with self.lock:
+            self.entries[output.name] = {"key": key, "size": output.stat().st_size}
+            self.save()
+
+    def forget_missing(self) -> None:
+        directory = self.path.parent
+        with self.lock:
+            self.entries = {
+                name: entry for name, entry in self.entries.items() if (directory / name).exists()
+            }
+            self.save()
+
+    def save(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def run_ffmpeg(args: Sequence[str], output_path: Path, threads: Optional[int] = None) -> Tuple[bool, str]:
+    """
+    Roda o ffmpeg gravando em um arquivo parcial e renomeia no final, para
+    que uma execucao interrompida nunca deixe uma saida "valida" pela metade.
+    """
+    partial = output_path.with_name(f"{output_path.stem}.partial{output_path.suffix}")
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"] + list(args)
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd += ["-y", str(partial)]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
     except FileNotFoundError:
-        print("Erro: ffmpeg nao encontrado no PATH")
+        return False, "ffmpeg nao encontrado no PATH"
+
+    if result.returncode != 0 or not partial.exists():
+        partial.unlink(missing_ok=True)
+        return False, result.stderr.strip() or f"ffmpeg saiu com codigo {result.returncode}"
+
+    os.replace(partial, output_path)
+    return True, ""
+
+
+def create_test_video(output_path: Path, force: bool = False) -> bool:
+    """Cria um video de teste de 5 segundos com cor solida e texto."""
+
+    # Comando ffmpeg para gerar video de teste
+    # - 5 segundos de duracao
+    # - 1280x720 resolucao
+    # - Background gradiente
+    # - Texto "VLC TEST VIDEO"
+    args = [
+        "-f", "lavfi",
+        "-i", "color=c=blue:s=1280x720:d=5",
+        "-f", "lavfi",
+        "-i", "color=c=red:s=1280x720:d=5",
+        "-filter_complex",
+        "[0:v][1:v]blend=all_mode=addition:all_opacity=0.5,drawtext=text='VLC TEST VIDEO':fontsize=72:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
+        "-c:v", "libx264",
+        "-preset", "ultrafast",
+        "-pix_fmt", "yuv420p",
+    ]
+    key = cache_key(args)
+    cache = MediaCache(output_path.parent)
+
+    if not force and cache.is_valid(output_path, key):
+        print(f"✓ Video de teste ja existe e esta atualizado: {output_path}")
+        return True
+
+    print(f"Criando video de teste em: {output_path}")
+    ok, error = run_ffmpeg(args, output_path)
+    if not ok:
+        print(f"Erro ao criar video: {error}")
         return False
-    except Exception as e:
-        print(f"Erro inesperado: {e}")
+
+    cache.record(output_path, key)
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"✓ Video criado com sucesso! ({size_mb:.2f} MB)")
+    return True
+
+
+def default_jobs() -> int:
+    """Metade dos nucleos: cada ffmpeg ja usa varias threads."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def generate_matrix(
+    specs: Iterable[MediaSpec],
+    output_dir: Path,
+    *,
+    jobs: int,
+    force: bool = False,
+    prune: bool = False,
+) -> int:
+    """Gera as midias que faltam em paralelo; retorna o numero de falhas."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache = MediaCache(output_dir)
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+
+    pending = []
+    expected = set()
+    cached = 0
+    for spec in specs:
+        args = media_args(spec)
+        key = cache_key(args)
+        output = output_dir / f"{spec.label}-{key}.{spec.container}"
+        expected.add(output.name)
+        if not force and cache.is_valid(output, key):
+            cached += 1
+        else:
+            pending.append((spec, args, key, output))
+
+    print(f"Matriz: {len(expected)} midias, {cached} em cache, {len(pending)} para gerar ({jobs} em paralelo)")
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(run_ffmpeg, args, output, threads): (spec, key, output)
+            for spec, args, key, output in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            spec, key, output = futures[future]
+            ok, error = future.result()
+            if ok:
+                cache.record(output, key)
+                print(f"  [{done}/{len(pending)}] ✓ {output.name}")
+            else:
+                failures += 1
+                print(f"  [{done}/{len(pending)}] ✗ {spec.label}.{spec.container}: {error.splitlines()[-1] if error else ''}")
+
+    if prune:
+        removed = 0
+        for path in output_dir.iterdir():
+            if path.name != CACHE_INDEX_NAME and path.is_file() and path.name not in expected:
+                path.unlink()
+                removed += 1
+        cache.forget_missing()
+        print(f"Removidas {removed} midias fora da matriz atual")
+
+    return failures
+
+
+def log(message: str) -> None:
+    """Mensagens do modo stream vao para o stderr (o stdout pode ser o video)."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def stream_args(
+    codec: str,
+    resolution: str,
+    fps: int,
+    bitrate: str,
+    duration: int,
+    realtime: bool,
+) -> List[str]:
+    """Comando do ffmpeg para um MPEG-TS gerado (duration 0 = sem fim) no stdout."""
+    limit = f":duration={duration}" if duration else ""
+    args = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if realtime:
+        args.append("-re")
+    args += [
+        "-f", "lavfi", "-i", f"testsrc2=size={resolution}:rate={fps}{limit}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000{limit}",
+        "-map", "0:v", "-map", "1:a",
+    ]
+    args += VIDEO_CODECS[codec] + ["-g", str(fps * 2), "-r", str(fps)]
+    if codec in ("h264", "hevc"):
+        args += ["-tune", "zerolatency"]
+    args += ["-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate]
+    args += ["-c:a", "aac", "-f", "mpegts", "pipe:1"]
+    return args
+
+
+class StreamPump:
+    """
+    Copia a saida do ffmpeg para um destino passando por uma fila limitada.
+    Com a fila cheia a thread leitora para de ler o pipe, o pipe enche e o
+    ffmpeg bloqueia: a producao acompanha o ritmo do consumidor.
+    """
+
+    def __init__(self, command: Sequence[str], buffer_bytes: int):
+        self.command = list(command)
+        self.chunks: "queue.Queue[Optional[bytes]]" = queue.Queue(
+            maxsize=max(1, buffer_bytes // STREAM_CHUNK)
+        )
+        self.stop = threading.Event()
+
+    def _put(self, item: Optional[bytes]) -> bool:
+        while not self.stop.is_set():
+            try:
+                self.chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
         return False
 
+    def _read(self, process: subprocess.Popen) -> None:
+        while not self.stop.is_set():
+            chunk = process.stdout.read(STREAM_CHUNK)
+            if not chunk or not self._put(chunk):
+                break
+        self._put(None)
+
+    def run(self, write: Callable[[bytes], None]) -> int:
+        """
+        Transmite ate o fim do stream ou ate o destino fechar; retorna os bytes
+        enviados. RuntimeError se o ffmpeg terminar sozinho com erro.
+        """
+        try:
+            process = subprocess.Popen(
+                self.command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg nao encontrado no PATH")
+
+        reader = threading.Thread(target=self._read, args=(process,), daemon=True)
+        reader.start()
+        sent = 0
+        returncode = None
+        started = last_status = time.monotonic()
+        try:
+            while True:
+                chunk = self.chunks.get()
+                if chunk is None:
+                    # Fim da saida: o ffmpeg terminou sozinho (sem terminate)
+                    try:
+                        returncode = process.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        pass
+                    break
+                write(chunk)
+                sent += len(chunk)
+                now = time.monotonic()
+                if now - last_status >= STREAM_STATUS_INTERVAL:
+                    last_status = now
+                    rate = sent / (now - started) / (1024 * 1024)
+                    fill = self.chunks.qsize() * 100 // self.chunks.maxsize
+                    log(f"  {sent / (1024 * 1024):.0f} MB enviados, {rate:.1f} MB/s, buffer {fill}%")
+        finally:
+            self.stop.set()
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            reader.join(timeout=1)
+        if returncode:
+            raise RuntimeError(
+                f"ffmpeg saiu com codigo {returncode} apos {sent / (1024 * 1024):.0f} MB "
+                "(veja a mensagem do ffmpeg acima; encoder indisponivel?)"
+            )
+        return sent
+
+
+def open_fifo(path: Path):
+    """Abre (criando se preciso) um FIFO para escrita; bloqueia ate haver leitor."""
+    if not path.exists():
+        if not hasattr(os, "mkfifo"):
+            raise RuntimeError("FIFOs nao sao suportados neste sistema; use tcp:// ou http://")
+        os.mkfifo(path)
+    elif not stat.S_ISFIFO(path.stat().st_mode):
+        raise RuntimeError(f"{path} existe e nao e um FIFO")
+    log(f"Aguardando leitor no FIFO {path}...")
+    return open(path, "wb", buffering=0)
+
+
+def parse_address(target: str) -> Tuple[str, str, int]:
+    """tcp://host:porta ou http://host:porta -> (esquema, host, porta)."""
+    scheme, _, rest = target.partition("://")
+    host, _, port = rest.rstrip("/").rpartition(":")
+    if not host or not port.isdigit():
+        raise RuntimeError(f"Endereco invalido: {target} (use {scheme}://127.0.0.1:8080)")
+    return scheme, host, int(port)
+
+
+def read_http_request(conn: socket.socket) -> bool:
+    """Le o cabecalho do pedido HTTP; False se o cliente desistiu."""
+    data = b""
+    conn.settimeout(10)
+    while b"\r\n\r\n" not in data and len(data) < 8192:
+        chunk = conn.recv(1024)
+        if not chunk:
+            return False
+        data += chunk
+    conn.settimeout(None)
+    return True
+
+
+def serve_stream(command: Sequence[str], target: str, buffer_bytes: int, once: bool) -> int:
+    """Servidor local de um cliente por vez; cada cliente recebe um stream novo."""
+    scheme, host, port = parse_address(target)
+    with socket.create_server((host, port)) as server:
+        log(f"Servindo stream em {scheme}://{host}:{port} (Ctrl+C para parar)")
+        while True:
+            conn, peer = server.accept()
+            with conn:
+                if scheme == "http":
+                    if not read_http_request(conn):
+                        continue
+                    conn.sendall(HTTP_RESPONSE_HEADERS)
+                log(f"Cliente conectado: {peer[0]}:{peer[1]}")
+                try:
+                    sent = StreamPump(command, buffer_bytes).run(conn.sendall)
+                    log(f"Stream concluido: {sent / (1024 * 1024):.0f} MB")
+                except (BrokenPipeError, ConnectionError):
+                    log("Cliente desconectou")
+                except RuntimeError as exc:
+                    log(f"✗ Stream falhou: {exc}")
+                    if once:
+                        return 1
+            if once:
+                return 0
+
+
+def stream_media(args: argparse.Namespace) -> int:
+    """Modo --stream: stdout ('-'), FIFO, tcp://host:porta ou http://host:porta."""
+    command = stream_args(
+        args.codec, args.resolution, args.fps, args.bitrate, args.duration, args.realtime
+    )
+    buffer_bytes = args.buffer_mb * 1024 * 1024
+    target = args.stream
+    try:
+        if target.startswith(("tcp://", "http://")):
+            return serve_stream(command, target, buffer_bytes, args.once)
+
+        if target == "-":
+            sink = sys.stdout.buffer
+        else:
+            sink = open_fifo(Path(target))
+        try:
+            sent = StreamPump(command, buffer_bytes).run(sink.write)
+            sink.flush()
+        finally:
+            if sink is not sys.stdout.buffer:
+                sink.close()
+        log(f"Stream concluido: {sent / (1024 * 1024):.0f} MB")
+        return 0
+    except (BrokenPipeError, ConnectionError):
+        log("Consumidor fechou o stream")
+        return 0
+    except (OSError, RuntimeError) as exc:
+        log(f"✗ {exc}")
+        return 1
+    except KeyboardInterrupt:
+        log("Stream interrompido")
+        return 0
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("o valor deve ser >= 1")
+    return number
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cria videos de teste para o VLC compilado.")
+    parser.add_argument(
+        "--matrix",
+        nargs="?",
+        const="default",
+        default=None,
+        help="Gerar a matriz de midias (padrao interna ou um arquivo JSON no mesmo formato).",
+    )
+    parser.add_argument("--jobs", "-j", type=positive_int, default=default_jobs(), help="ffmpeg em paralelo (padrao: metade dos nucleos).")
+    parser.add_argument("--only", default=None, help="Gerar so as midias cujo nome contem este texto.")
+    parser.add_argument("--list", action="store_true", help="Listar as midias da matriz e sair.")
+    parser.add_argument("--force", action="store_true", help="Regerar mesmo o que esta em cache.")
+    parser.add_argument("--prune", action="store_true", help="Apagar midias da pasta da matriz que nao fazem mais parte dela.")
+
+    stream = parser.add_argument_group("stream (--stream)")
+    stream.add_argument(
+        "--stream",
+        metavar="DESTINO",
+        default=None,
+        help="Transmitir um MPEG-TS gerado para '-' (stdout), um FIFO, tcp://host:porta ou http://host:porta.",
+    )
+    stream.add_argument("--codec", choices=sorted(CONTAINERS["ts"]["video"]), default="h264", help="Codec de video (padrao: h264).")
+    stream.add_argument("--resolution", default="1920x1080", help="Resolucao (padrao: 1920x1080).")
+    stream.add_argument("--fps", type=positive_int, default=30, help="Frame rate (padrao: 30).")
+    stream.add_argument("--bitrate", default="20M", help="Bitrate de video do ffmpeg (padrao: 20M).")
+    stream.add_argument("--duration", type=int, default=0, help="Duracao em segundos (padrao: 0 = sem fim).")
+    stream.add_argument("--realtime", action="store_true", help="Produzir no ritmo de reproducao (ffmpeg -re) em vez do maximo possivel.")
+    stream.add_argument("--buffer-mb", type=positive_int, default=DEFAULT_STREAM_BUFFER_MB, help=f"Buffer maximo entre ffmpeg e destino (padrao: {DEFAULT_STREAM_BUFFER_MB} MB).")
+    stream.add_argument("--once", action="store_true", help="Servidor TCP/HTTP: encerrar depois do primeiro cliente.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.stream is not None:
+        if args.matrix is not None:
+            log("✗ --stream e --matrix sao modos diferentes; use um de cada vez")
+            return 1
+        return stream_media(args)
 
-def main():
     # Diretorio do projeto
     project_root = Path(__file__).parent.parent
     test_videos_dir = project_root / "test-videos"
     test_videos_dir.mkdir(exist_ok=True)
-    
-    output_file = test_videos_dir / "vlc-test-video.mp4"
-    
-    # Remover video antigo se existir
-    if output_file.exists():
-        print(f"Removendo video antigo: {output_file}")
-        output_file.unlink()
-    
-    # Criar novo video
-    success = create_test_video(output_file)
-    
-    if success:
-        print(f"\n✓ Video de teste pronto para uso!")
-        print(f"  Local: {output_file}")
+
+    if args.matrix is None:
+        output_file = test_videos_dir / "vlc-test-video.mp4"
+        success = create_test_video(output_file, force=args.force)
+
+        if success:
+            print(f"\n✓ Video de teste pronto para uso!")
+            print(f"  Local: {output_file}")
+            return 0
+        else:
+            print(f"\n✗ Falha ao criar video de teste")
+            return 1
+
+    try:
+        matrix = load_matrix(None if args.matrix == "default" else Path(args.matrix))
+        specs, discarded = expand_matrix(matrix)
+    except (OSError, ValueError) as exc:
+        print(f"✗ Matriz invalida: {exc}")
+        return 1
+
+    if args.only and args.prune:
+        print("✗ --prune nao pode ser combinado com --only (apagaria o resto da matriz)")
+        return 1
+    if args.only:
+        specs = [spec for spec in specs if args.only in f"{spec.label}.{spec.container}"]
+    if discarded:
+        print(f"({discarded} combinacoes descartadas por incompatibilidade de container)")
+
+    if args.list:
+        for spec in specs:
+            print(f"{spec.label}.{spec.container}")
         return 0
-    else:
-        print(f"\n✗ Falha ao criar video de teste")
+
+    output_dir = test_videos_dir / MATRIX_DIR_NAME
+    failures = generate_matrix(specs, output_dir, jobs=args.jobs, force=args.force, prune=args.prune)
+    if failures:
+        print(f"\n✗ {failures} midias falharam (veja acima; o encoder pode nao estar no ffmpeg instalado)")
         return 1
 
+    print(f"\n✓ Matriz de teste pronta em: {output_dir}")
+    return 0
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Ninja Profile - Perfil do build a partir do log do ninja
+
+Lê `.ninja_log` do diretório de build em streaming e, para o último build
+(ou só o que foi acrescentado ao log a partir de um tamanho anotado antes de
+compilar, como faz o build_vlc.sh), relata:
+targets e passos mais lentos, tempo por diretório de módulo do VLC, caminho
+crítico pelo grafo de dependências (`ninja -t graph`) e o paralelismo obtido
+ao longo do tempo. Os nomes e diretórios dos targets vêm da introspecção do
+meson (meson-info/); a saída de `ninja -d stats`, se salva em arquivo, é
+resumida junto. Exporta também um trace JSON para chrome://tracing/Perfetto.
+
+Exemplos:
+    python tools/ninja_profile.py --build-dir vlc/build-mingw
+    python tools/ninja_profile.py --trace build-trace.json --top 30
+    python tools/ninja_profile.py --runs 3 --stats ninja-stats.txt --json profile.json
+    python tools/ninja_profile.py --since-offset 183422 --trace build-trace.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+from build_driver import target_of  # noqa: E402
+
+
+NINJA_LOG = ".ninja_log"
+SUPPORTED_LOG_VERSIONS = (5, 6)
+DEFAULT_TOP = 15
+DEFAULT_TIMELINE_BUCKETS = 20
+# Linhas do `ninja -t graph` (formato dot; ids são ponteiros, "0x..." ou sem prefixo)
+GRAPH_NODE = re.compile(r'^"([^"]+)" \[label="(.*?)"(, shape=ellipse)?\]$')
+GRAPH_EDGE = re.compile(r'^"([^"]+)" -> "([^"]+)"')
+
+
+@dataclass
+class Step:
+    """Um comando executado pelo ninja (pode gerar várias saídas)."""
+
+    start_ms: int
+    end_ms: int
+    outputs: List[str] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+
+@dataclass
+class TargetInfo:
+    """Dados do meson sobre o target dono de uma saída."""
+
+    name: str
+    type: str
+    module: str
+
+
+@dataclass
+class Profile:
+    """Resumo de um build, também exportado com --json."""
+
+    wall_s: float
+    busy_s: float
+    steps: int
+    average_parallelism: float
+    slowest_targets: List[Tuple[str, float, int]]
+    slowest_steps: List[Tuple[str, float]]
+    modules: List[Tuple[str, float, int]]
+    critical_path_s: Optional[float]
+    critical_path: List[Tuple[str, float]]
+    timeline: List[float]
+
+
+def appended_offset(path: Path, offset: int) -> Optional[int]:
+    """
+    Posição de onde ler o que foi acrescentado ao log desde que ele tinha
+    ``offset`` bytes, ou None se o log encolheu ou foi reescrito (o ninja
+    recompacta o log de tempos em tempos) e é preciso lê-lo inteiro.
+    """
+    try:
+        size = path.stat().st_size
+        if offset <= 0 or offset > size:
+            return None
+        with open(path, "rb") as handle:
+            header = handle.readline()
+            if offset < len(header):
+                return None
+            handle.seek(offset - 1)
+            return offset if handle.read(1) == b"\n" else None
+    except OSError:
+        return None
+
+
+def read_log_runs(path: Path, offset: int = 0) -> Iterator[List[Step]]:
+    """
+    Lê o .ninja_log em streaming e devolve as execuções do ninja em ordem.
+
+    Cada execução grava as saídas na ordem em que terminam, com tempos
+    relativos ao seu início; um fim menor que o anterior marca uma nova
+    execução. A heurística junta duas execuções quando a segunda termina
+    depois do fim da primeira (ex.: um rebuild de um arquivo só após um build
+    curto); para isolar um build, leia a partir do ``offset`` anotado antes
+    dele. Saídas do mesmo comando (mesmo início, fim e hash) viram um Step.
+    """
+    with open(path, "rb") as binary:
+        handle = (raw.decode("utf-8", "replace") for raw in binary)
+        header = next(handle, "")
+        match = re.match(r"# ninja log v(\d+)", header)
+        if not match or int(match.group(1)) not in SUPPORTED_LOG_VERSIONS:
+            raise ValueError(f"formato de log não suportado: {header.strip()!r}")
+        if offset:
+            binary.seek(offset)
+
+        run: List[Step] = []
+        by_command: Dict[Tuple[int, int, str], Step] = {}
+        last_end = -1
+        for line in handle:
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) != 5:
+                continue
+            try:
+                start, end = int(fields[0]), int(fields[1])
+            except ValueError:
+                continue
+            output, command_hash = fields[3], fields[4]
+            if end < last_end:
+                yield run
+                run, by_command = [], {}
+            last_end = end
+            key = (start, end, command_hash)
+            step = by_command.get(key)
+            if step is None:
+                step = by_command[key] = Step(start, end)
+                run.append(step)
+            step.outputs.append(output)
+        if run:
+            yield run
+
+
+def select_steps(path: Path, runs: int = 1, since_offset: Optional[int] = None) -> List[Step]:
+    """
+    Junta as execuções escolhidas numa linha do tempo contínua.
+
+    Com ``since_offset`` (tamanho do log antes do build, anotado pelo
+    build_vlc.sh), só as linhas acrescentadas depois dele contam; 0 indica
+    que o log não existia. Se o log encolheu desde então, ou sem offset,
+    ficam as ``runs`` últimas execuções. Cada execução começa onde a
+    anterior terminou.
+    """
+    start = appended_offset(path, since_offset) if since_offset else None
+    if start is not None:
+        chosen = list(read_log_runs(path, start))
+    elif since_offset == 0:
+        chosen = list(read_log_runs(path))
+    else:
+        chosen = list(read_log_runs(path))[-runs:]
+
+    merged: List[Step] = []
+    offset = 0
+    for run in chosen:
+        if not run:
+            continue
+        base = min(step.start_ms for step in run)
+        for step in run:
+            merged.append(
+                Step(step.start_ms - base + offset, step.end_ms - base + offset, step.outputs)
+            )
+        offset = max(step.end_ms for step in merged)
+    return merged
+
+
+def load_introspection(build_dir: Path) -> Dict[str, TargetInfo]:
+    """Mapeia a saída de cada target (relativa ao build) para nome, tipo e módulo."""
+    info_dir = build_dir / "meson-info"
+    try:
+        targets = json.loads((info_dir / "intro-targets.json").read_text(encoding="utf-8"))
+        meson_info = json.loads((info_dir / "meson-info.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    source_dir = Path(meson_info.get("directories", {}).get("source", ""))
+
+    mapping: Dict[str, TargetInfo] = {}
+    for target in targets:
+        defined_in = Path(target.get("defined_in", ""))
+        try:
+            module = defined_in.parent.relative_to(source_dir).as_posix()
+        except ValueError:
+            module = defined_in.parent.as_posix()
+        info = TargetInfo(target.get("name", "?"), target.get("type", "?"), module or ".")
+        for filename in target.get("filename", []):
+            try:
+                relative = Path(filename).relative_to(build_dir.resolve()).as_posix()
+            except ValueError:
+                relative = Path(filename).as_posix()
+            mapping[relative] = info
+    return mapping
+
+
+def owner(output: str, targets: Dict[str, TargetInfo]) -> Tuple[str, str]:
+    """(target, diretório de módulo) de uma saída; sem introspecção, pelo caminho."""
+    # Objetos ficam em '<target>.p/'; as demais saídas (links) são o próprio target
+    target = target_of(output) if ".p/" in output else output
+    info = targets.get(target)
+    if info is not None:
+        return info.name, info.module
+    module = Path(target).parent.as_posix()
+    return target, module if module else "."
+
+
+def stream_graph(build_dir: Path) -> Iterator[str]:
+    """Linhas do `ninja -t graph` lidas conforme o ninja as escreve."""
+    process = subprocess.Popen(
+        ["ninja", "-C", str(build_dir), "-t", "graph"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    assert process.stdout is not None
+    try:
+        for line in process.stdout:
+            yield line.strip()
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def parse_graph(lines: Iterable[str]) -> Dict[str, Set[str]]:
+    """
+    Dependências diretas entre arquivos: saída -> entradas.
+
+    No dot do ninja, um passo com várias entradas ou saídas vira um nó de
+    regra (elipse) entre elas; passos simples são uma aresta direta.
+    """
+    labels: Dict[str, str] = {}
+    rules: Set[str] = set()
+    rule_inputs: Dict[str, Set[str]] = defaultdict(set)
+    rule_outputs: Dict[str, Set[str]] = defaultdict(set)
+    direct: List[Tuple[str, str]] = []
+
+    for line in lines:
+        node = GRAPH_NODE.match(line)
+        if node:
+            labels[node.group(1)] = node.group(2)
+            if node.group(3):
+                rules.add(node.group(1))
+            continue
+        edge = GRAPH_EDGE.match(line)
+        if edge:
+            direct.append((edge.group(1), edge.group(2)))
+
+    depends: Dict[str, Set[str]] = defaultdict(set)
+    for source, dest in direct:
+        if dest in rules:
+            rule_inputs[dest].add(source)
+        elif source in rules:
+            rule_outputs[source].add(dest)
+        else:
+            depends[labels.get(dest, dest)].add(labels.get(source, source))
+    for rule, outputs in rule_outputs.items():
+        inputs = {labels.get(node, node) for node in rule_inputs.get(rule, ())}
+        for output in outputs:
+            depends[labels.get(output, output)].update(inputs)
+    return depends
+
+
+def critical_path(
+    steps: Sequence[Step],
+    depends: Dict[str, Set[str]],
+) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Caminho mais longo (em duração) pelo grafo, considerando só o que rodou.
+
+    Cada arquivo custa a duração do passo que o gerou (zero se não rodou);
+    o custo acumulado é o do passo mais o maior custo entre as dependências.
+    """
+    duration: Dict[str, float] = {}
+    for step in steps:
+        for output in step.outputs:
+            duration[output] = step.duration_ms / 1000
+
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for root in duration:
+        stack: List[Tuple[str, bool]] = [(root, False)]
+        on_stack: Set[str] = set()
+        while stack:
+            node, expanded = stack.pop()
+            if node in finish:
+                continue
+            inputs = depends.get(node, ())
+            if not expanded:
+                on_stack.add(node)
+                stack.append((node, True))
+                stack.extend(
+                    (dep, False) for dep in inputs if dep not in finish and dep not in on_stack
+                )
+                continue
+            best, best_dep = 0.0, None
+            for dep in inputs:
+                if finish.get(dep, 0.0) > best:
+                    best, best_dep = finish[dep], dep
+            finish[node] = best + duration.get(node, 0.0)
+            previous[node] = best_dep
+            on_stack.discard(node)
+
+    if not finish:
+        return 0.0, []
+    end = max(finish, key=finish.get)
+    chain: List[Tuple[str, float]] = []
+    node: Optional[str] = end
+    while node is not None:
+        if duration.get(node, 0.0) > 0:
+            chain.append((node, duration[node]))
+        node = previous.get(node)
+    chain.reverse()
+    return finish[end], chain
+
+
+def parallelism_timeline(steps: Sequence[Step], buckets: int) -> List[float]:
+    """Paralelismo médio (passos simultâneos) em cada fatia da duração do build."""
+    if not steps:
+        return []
+    begin = min(step.start_ms for step in steps)
+    end = max(step.end_ms for step in steps)
+    width = max(1.0, (end - begin) / buckets)
+    busy = [0.0] * buckets
+    for step in steps:
+        start, stop = step.start_ms - begin, step.end_ms - begin
+        first = min(buckets - 1, int(start // width))
+        last = min(buckets - 1, int(stop // width))
+        for bucket in range(first, last + 1):
+            low, high = bucket * width, (bucket + 1) * width
+            busy[bucket] += max(0.0, min(stop, high) - max(start, low))
+    return [value / width for value in busy]
+
+
+def build_profile(
+    steps: Sequence[Step],
+    targets: Dict[str, TargetInfo],
+    depends: Optional[Dict[str, Set[str]]],
+    top: int,
+    buckets: int,
+) -> Profile:
+    wall_ms = max(step.end_ms for step in steps) - min(step.start_ms for step in steps)
+    busy_ms = sum(step.duration_ms for step in steps)
+
+    per_target: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    per_module: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    for step in steps:
+        target, module = owner(step.outputs[0], targets)
+        for bucket, key in ((per_target, target), (per_module, module)):
+            bucket[key][0] += step.duration_ms / 1000
+            bucket[key][1] += 1
+
+    def ranked(table: Dict[str, List[float]], limit: Optional[int]) -> List[Tuple[str, float, int]]:
+        rows = sorted(table.items(), key=lambda item: -item[1][0])
+        return [(name, round(total, 2), int(count)) for name, (total, count) in rows[:limit]]
+
+    slowest_steps = sorted(steps, key=lambda step: -step.duration_ms)[:top]
+    path_s: Optional[float] = None
+    path: List[Tuple[str, float]] = []
+    if depends is not None:
+        path_s, path = critical_path(steps, depends)
+
+    return Profile(
+        wall_s=round(wall_ms / 1000, 2),
+        busy_s=round(busy_ms / 1000, 2),
+        steps=len(steps),
+        average_parallelism=round(busy_ms / wall_ms, 2) if wall_ms else 0.0,
+        slowest_targets=ranked(per_target, top),
+        slowest_steps=[(step.outputs[0], round(step.duration_ms / 1000, 2)) for step in slowest_steps],
+        modules=ranked(per_module, None),
+        critical_path_s=round(path_s, 2) if path_s is not None else None,
+        critical_path=[(output, round(seconds, 2)) for output, seconds in path],
+        timeline=[round(value, 2) for value in parallelism_timeline(steps, buckets)],
+    )
+
+
+def parse_ninja_stats(path: Path) -> List[Tuple[str, int, float]]:
+    """Linhas (métrica, contagem, total em ms) da saída de `ninja -d stats`."""
+    rows: List[Tuple[str, int, float]] = []
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return rows
+    for line in lines:
+        match = re.match(r"^(\S.*?)\s+(\d+)\s+([\d.]+)\s+([\d.]+)\s*$", line)
+        if match:
+            rows.append((match.group(1), int(match.group(2)), float(match.group(4))))
+    return rows
+
+
+def chrome_trace(steps: Sequence[Step], targets: Dict[str, TargetInfo], critical: Set[str]) -> Dict:
+    """
+    Trace no formato do Chrome (eventos "X"), um trilho por slot do ninja.
+
+    Os slots são atribuídos de forma gulosa: cada passo vai para o primeiro
+    trilho livre no seu início, reproduzindo os jobs paralelos do build.
+    """
+    lanes: List[int] = []
+    events = []
+    for step in sorted(steps, key=lambda step: (step.start_ms, -step.duration_ms)):
+        for lane, busy_until in enumerate(lanes):
+            if busy_until <= step.start_ms:
+                lanes[lane] = step.end_ms
+                break
+        else:
+            lane = len(lanes)
+            lanes.append(step.end_ms)
+        target, module = owner(step.outputs[0], targets)
+        events.append({
+            "name": step.outputs[0],
+            "cat": "critical" if step.outputs[0] in critical else module,
+            "ph": "X",
+            "ts": step.start_ms * 1000,
+            "dur": step.duration_ms * 1000,
+            "pid": 0,
+            "tid": lane,
+            "args": {"target": target, "module": module, "outputs": step.outputs},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def format_duration(seconds: float) -> str:
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds:.1f} s"
+
+
+def print_report(profile: Profile, stats: List[Tuple[str, int, float]], cores: int) -> None:
+    print(
+        f"⏱️ Build: {format_duration(profile.wall_s)} de relógio, "
+        f"{format_duration(profile.busy_s)} de CPU em {profile.steps} passos "
+        f"(paralelismo médio {profile.average_parallelism:.1f} de {cores} núcleos)"
+    )
+
+    print("\n🐢 Targets mais lentos (soma dos passos):")
+    for name, seconds, count in profile.slowest_targets:
+        print(f"  {format_duration(seconds):>9}  {count:>5} passos  {name}")
+
+    print("\n🐌 Passos mais lentos:")
+    for output, seconds in profile.slowest_steps:
+        print(f"  {format_duration(seconds):>9}  {output}")
+
+    print("\n📁 Tempo por diretório de módulo:")
+    for module, seconds, count in profile.modules[:len(profile.slowest_targets)]:
+        share = seconds * 100 / profile.busy_s if profile.busy_s else 0.0
+        print(f"  {format_duration(seconds):>9}  {share:5.1f}%  {count:>5} passos  {module}")
+
+    if profile.critical_path_s is not None:
+        print(
+            f"\n🧵 Caminho crítico: {format_duration(profile.critical_path_s)} "
+            f"({len(profile.critical_path)} passos; o build não fica mais rápido que isso "
+            "só com mais núcleos)"
+        )
+        for output, seconds in profile.critical_path:
+            print(f"  {format_duration(seconds):>9}  {output}")
+
+    if profile.timeline:
+        print("\n📈 Paralelismo ao longo do build:")
+        width = profile.wall_s / len(profile.timeline)
+        peak = max(max(profile.timeline), 1.0)
+        for index, value in enumerate(profile.timeline):
+            bar = "█" * round(value * 30 / peak)
+            print(f"  {format_duration(index * width):>9}  {value:5.1f}  {bar}")
+
+    if stats:
+        print("\n📊 ninja -d stats (maiores totais):")
+        for metric, count, total_ms in sorted(stats, key=lambda row: -row[2])[:8]:
+            print(f"  {total_ms:>10.1f} ms  {count:>7}x  {metric}")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Perfil do build do VLC a partir do .ninja_log (lentidão, módulos, caminho crítico).",
+    )
+    parser.add_argument(
+        "--build-dir",
+        type=Path,
+        default=None,
+        help="Diretório de build do meson (padrão: vlc/build-mingw).",
+    )
+    parser.add_argument("--top", type=doctor.positive_int, default=DEFAULT_TOP, help=f"Itens por ranking (padrão: {DEFAULT_TOP}).")
+    parser.add_argument(
+        "--runs",
+        type=doctor.positive_int,
+        default=1,
+        help="Quantas execuções do ninja, das mais recentes, compõem o build (padrão: 1).",
+    )
+    parser.add_argument(
+        "--since-offset",
+        type=int,
+        default=None,
+        help="Tamanho em bytes do .ninja_log antes do build: só o acrescentado depois conta (prevalece sobre --runs).",
+    )
+    parser.add_argument("--stats", type=Path, default=None, help="Arquivo com a saída de `ninja -d stats`.")
+    parser.add_argument("--no-graph", action="store_true", help="Não calcular o caminho crítico (evita `ninja -t graph`).")
+    parser.add_argument("--buckets", type=doctor.positive_int, default=DEFAULT_TIMELINE_BUCKETS, help="Fatias da linha do tempo de paralelismo.")
+    parser.add_argument("--trace", type=Path, default=None, help="Exportar trace JSON (chrome://tracing, Perfetto).")
+    parser.add_argument("--json", type=Path, default=None, help="Salvar o resumo em JSON.")
+    args = parser.parse_args(argv)
+    if args.build_dir is None:
+        args.build_dir = doctor.default_build_dir()
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    log_path = args.build_dir / NINJA_LOG
+
+    try:
+        steps = select_steps(log_path, args.runs, args.since_offset)
+    except (OSError, ValueError) as exc:
+        print(f"❌ Não foi possível ler {log_path}: {exc}")
+        return 1
+    if not steps:
+        print(f"Nenhum passo registrado em {log_path}.")
+        return 0
+
+    targets = load_introspection(args.build_dir)
+    depends: Optional[Dict[str, Set[str]]] = None
+    if not args.no_graph:
+        try:
+            depends = parse_graph(stream_graph(args.build_dir))
+        except OSError as exc:
+            print(f"⚠️ ninja -t graph indisponível ({exc}); caminho crítico omitido.")
+
+    profile = build_profile(steps, targets, depends, args.top, args.buckets)
+    print_report(
+        profile,
+        parse_ninja_stats(args.stats) if args.stats else [],
+        doctor.usable_cores(),
+    )
+
+    if args.trace:
+        critical = {output for output, _ in profile.critical_path}
+        args.trace.write_text(json.dumps(chrome_trace(steps, targets, critical)), encoding="utf-8")
+        print(f"\n🧭 Trace salvo em {args.trace} (abra em chrome://tracing ou ui.perfetto.dev)")
+    if args.json:
+        args.json.write_text(json.dumps(asdict(profile), indent=2), encoding="utf-8")
+        print(f"💾 Resumo salvo em {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
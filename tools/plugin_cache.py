@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VLC Plugin Cache - Verifica e regenera o plugins.dat do VLC instalado
+
+Sem um plugins.dat válido, o VLC abre cada plugin da instalação na partida
+para ler seus módulos, o que com centenas de DLLs domina o tempo de abertura.
+A ferramenta confere se o cache existe, se é mais novo que todos os binários
+de plugin e se cita cada um deles; quando está desatualizado, roda o
+`vlc-cache-gen` do próprio build para regenerá-lo. A economia na partida é
+estimada pelo número de plugins ou medida de fato com --measure (VLC aberto
+com e sem o cache).
+
+Exemplos:
+    python tools/plugin_cache.py --prefix vlc-test
+    python tools/plugin_cache.py --prefix vlc-test --check
+    python tools/plugin_cache.py --prefix vlc-test --measure --json plugin-cache.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import vlc_build_doctor as doctor  # noqa: E402
+
+
+CACHE_NAME = "plugins.dat"
+PLUGIN_SUFFIXES = (".dll", ".so", ".dylib")
+PLUGINS_SUBDIR = Path("lib") / "vlc" / "plugins"
+# Onde o meson/autotools do VLC instala o vlc-cache-gen, relativo ao prefixo
+CACHE_GEN_DIRS = (Path("lib") / "vlc", Path("libexec") / "vlc", Path("bin"))
+CACHE_GEN_NAMES = ("vlc-cache-gen.exe", "vlc-cache-gen")
+CACHE_GEN_TIMEOUT = 300.0
+# Custo de abrir e inspecionar um plugin sem cache, quando não se mede (ms)
+ESTIMATED_LOAD_MS_PER_PLUGIN = 4.0
+# Partida mínima do VLC: sem interface nem saídas, sai logo em seguida
+VLC_STARTUP_ARGS = ["--intf", "dummy", "--vout", "dummy", "--aout", "dummy", "vlc://quit"]
+DEFAULT_MEASURE_RUNS = 3
+
+
+@dataclass
+class CacheState:
+    """Situação do plugins.dat em relação aos plugins instalados."""
+
+    plugins_dir: str
+    plugins: int
+    cache_exists: bool
+    fresh: bool
+    newer_plugins: List[str] = field(default_factory=list)
+    unlisted_plugins: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StartupCost:
+    """Custo de partida com e sem cache; measured=False indica estimativa."""
+
+    with_cache_ms: Optional[float]
+    without_cache_ms: float
+    saved_ms: float
+    measured: bool
+
+
+def default_prefix() -> Path:
+    """Prefixo do build_vlc.sh (vlc-test ao lado do repositório ou no perfil do usuário)."""
+    username = os.environ.get("USERNAME")
+    if username and Path(f"/c/Users/{username}/vlc-test").is_dir():
+        return Path(f"/c/Users/{username}/vlc-test")
+    return Path(__file__).resolve().parent.parent / "vlc-test"
+
+
+def find_plugins(plugins_dir: Path) -> List[Path]:
+    return sorted(
+        path for path in plugins_dir.rglob("*")
+        if path.suffix in PLUGIN_SUFFIXES and path.name.endswith(f"_plugin{path.suffix}")
+    )
+
+
+def inspect_cache(plugins_dir: Path) -> CacheState:
+    """
+    Compara o plugins.dat com os plugins instalados.
+
+    O cache está atualizado se existe, é mais novo que todos os plugins e cita
+    o nome de cada um (o VLC grava o caminho relativo de cada plugin nele).
+    """
+    plugins = find_plugins(plugins_dir)
+    cache = plugins_dir / CACHE_NAME
+    state = CacheState(
+        plugins_dir=str(plugins_dir),
+        plugins=len(plugins),
+        cache_exists=cache.is_file(),
+        fresh=False,
+    )
+    if not state.cache_exists:
+        return state
+
+    cache_mtime = cache.stat().st_mtime
+    blob = cache.read_bytes()
+    for plugin in plugins:
+        relative = plugin.relative_to(plugins_dir).as_posix()
+        if plugin.stat().st_mtime > cache_mtime:
+            state.newer_plugins.append(relative)
+        elif plugin.name.encode("utf-8") not in blob:
+            state.unlisted_plugins.append(relative)
+    state.fresh = not state.newer_plugins and not state.unlisted_plugins
+    return state
+
+
+def find_cache_gen(prefix: Path, build_dir: Optional[Path]) -> Optional[Path]:
+    """vlc-cache-gen instalado no prefixo ou, senão, o deixado no diretório de build."""
+    candidates = [prefix / directory for directory in CACHE_GEN_DIRS]
+    if build_dir is not None:
+        candidates += [build_dir / "bin", build_dir]
+    for directory in candidates:
+        for name in CACHE_GEN_NAMES:
+            if (directory / name).is_file():
+                return directory / name
+    return None
+
+
+def runtime_env(prefix: Path) -> dict:
+    """Ambiente com bin/ do prefixo no PATH para achar libvlccore/libvlc."""
+    env = os.environ.copy()
+    env["PATH"] = os.pathsep.join([str(prefix / "bin"), env.get("PATH", "")])
+    env["VLC_PLUGIN_PATH"] = str(prefix / PLUGINS_SUBDIR)
+    return env
+
+
+def regenerate(cache_gen: Path, plugins_dir: Path, prefix: Path) -> Optional[str]:
+    """Roda o vlc-cache-gen; retorna a mensagem de erro ou None se deu certo."""
+    try:
+        result = subprocess.run(
+            [str(cache_gen), str(plugins_dir)],
+            capture_output=True,
+            text=True,
+            env=runtime_env(prefix),
+            timeout=CACHE_GEN_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return str(exc)
+    if result.returncode != 0:
+        detail = (result.stderr or result.stdout).strip().splitlines()
+        return f"código {result.returncode}" + (f": {detail[-1]}" if detail else "")
+    if not (plugins_dir / CACHE_NAME).is_file():
+        return f"{CACHE_NAME} não foi gravado"
+    return None
+
+
+def find_vlc(prefix: Path) -> Optional[Path]:
+    for name in ("vlc.exe", "vlc"):
+        if (prefix / "bin" / name).is_file():
+            return prefix / "bin" / name
+    return None
+
+
+def time_startup(vlc: Path, prefix: Path, extra: Sequence[str], runs: int) -> Optional[float]:
+    """Menor tempo de parede (ms) de uma partida mínima do VLC em ``runs`` tentativas."""
+    best: Optional[float] = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(
+                [str(vlc), *VLC_STARTUP_ARGS, *extra],
+                capture_output=True,
+                env=runtime_env(prefix),
+                timeout=CACHE_GEN_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 1) if best is not None else None
+
+
+def startup_cost(state: CacheState, prefix: Path, measure: bool, runs: int) -> StartupCost:
+    """Mede a partida com e sem cache (--no-plugins-cache) ou estima pelo nº de plugins."""
+    vlc = find_vlc(prefix) if measure else None
+    if vlc is not None:
+        with_cache = time_startup(vlc, prefix, [], runs)
+        without_cache = time_startup(vlc, prefix, ["--no-plugins-cache"], runs)
+        if with_cache is not None and without_cache is not None:
+            return StartupCost(
+                with_cache_ms=with_cache,
+                without_cache_ms=without_cache,
+                saved_ms=round(max(without_cache - with_cache, 0.0), 1),
+                measured=True,
+            )
+    estimate = round(state.plugins * ESTIMATED_LOAD_MS_PER_PLUGIN, 1)
+    return StartupCost(with_cache_ms=None, without_cache_ms=estimate, saved_ms=estimate, measured=False)
+
+
+def describe(state: CacheState) -> str:
+    if not state.cache_exists:
+        return f"{CACHE_NAME} ausente"
+    if state.fresh:
+        return f"{CACHE_NAME} atualizado"
+    reasons = []
+    if state.newer_plugins:
+        reasons.append(f"{len(state.newer_plugins)} plugin(s) mais novos que o cache")
+    if state.unlisted_plugins:
+        reasons.append(f"{len(state.unlisted_plugins)} plugin(s) fora do cache")
+    return f"{CACHE_NAME} desatualizado ({'; '.join(reasons)})"
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Verifica o plugins.dat do VLC instalado e o regenera com o vlc-cache-gen quando desatualizado.",
+    )
+    parser.add_argument("--prefix", type=Path, default=None, help="Prefixo de instalação (padrão: vlc-test).")
+    parser.add_argument(
+        "--build-dir",
+        type=Path,
+        default=None,
+        help="Diretório de build onde procurar o vlc-cache-gen se ele não foi instalado.",
+    )
+    parser.add_argument("--check", action="store_true", help="Só verificar; sai com 1 se o cache estiver desatualizado.")
+    parser.add_argument("--measure", action="store_true", help="Medir a partida do VLC com e sem o cache em vez de estimar.")
+    parser.add_argument(
+        "--runs",
+        type=doctor.positive_int,
+        default=DEFAULT_MEASURE_RUNS,
+        help=f"Partidas por medição com --measure; usa a menor (padrão: {DEFAULT_MEASURE_RUNS}).",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Salvar o resultado em JSON.")
+    args = parser.parse_args(argv)
+    if args.prefix is None:
+        args.prefix = default_prefix()
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    plugins_dir = args.prefix / PLUGINS_SUBDIR
+    if not plugins_dir.is_dir():
+        print(f"❌ Diretório de plugins não encontrado: {plugins_dir}")
+        return 2
+
+    state = inspect_cache(plugins_dir)
+    print(f"🔌 {state.plugins} plugins em {plugins_dir}: {describe(state)}")
+    for relative in (state.newer_plugins + state.unlisted_plugins)[:5]:
+        print(f"  • {relative}")
+
+    regenerated = False
+    error: Optional[str] = None
+    if not state.fresh and not args.check:
+        cache_gen = find_cache_gen(args.prefix, args.build_dir)
+        if cache_gen is None:
+            error = "vlc-cache-gen não encontrado no prefixo nem no diretório de build"
+        else:
+            error = regenerate(cache_gen, plugins_dir, args.prefix)
+        if error is None:
+            state = inspect_cache(plugins_dir)
+            regenerated = True
+            print(f"  ✅ Cache regenerado com {cache_gen.name}: {describe(state)}")
+        else:
+            print(f"  ⚠️ Não foi possível regenerar o cache: {error}")
+
+    cost = startup_cost(state, args.prefix, args.measure, args.runs)
+    if cost.measured:
+        print(
+            f"  ⏱️ Partida: {cost.with_cache_ms:.0f} ms com cache, "
+            f"{cost.without_cache_ms:.0f} ms sem (economia de {cost.saved_ms:.0f} ms)"
+        )
+    else:
+        print(
+            f"  ⏱️ Economia estimada na partida: ~{cost.saved_ms:.0f} ms "
+            f"({state.plugins} plugins × {ESTIMATED_LOAD_MS_PER_PLUGIN:g} ms; use --measure para medir)"
+        )
+
+    if args.json:
+        payload = {"state": asdict(state), "regenerated": regenerated, "error": error, "startup": asdict(cost)}
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return 0 if state.fresh else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
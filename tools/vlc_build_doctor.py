@@ -12,20 +12,92 @@ relatórios fáceis de compartilhar com outros membros da equipe.
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import mmap
 import os
 import platform
 import re
 import shutil
+import signal
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:  # Notificações nativas de sistema de arquivos são opcionais (--watch)
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - sem watchdog, usa varredura por stat
+    FileSystemEventHandler = object
+    Observer = None
 
 
 DEFAULT_VERSION_PATTERN = r"(\d+(?:\.\d+)+)"
 
+# Cache persistente de sondagens (--no-cache / --refresh)
+CACHE_FORMAT = 5
+CACHE_ENV_VARS = ("MSYS2_ROOT", "VCPKG_ROOT", "VSINSTALLDIR")
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+DEFAULT_CACHE_ENTRIES = 256
+
+# Metadados de executáveis (detecção de versão sem subprocesso)
+RT_VERSION = 16
+VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+PACMAN_LOCAL_DB = ("var", "lib", "pacman", "local")
+# Fim do diretório central de um zip: os lançadores de console scripts do pip
+# (distlib t64.exe/w64.exe) trazem o script como um zip anexado ao executável
+ZIP_END_SIGNATURE = b"PK\x05\x06"
+ZIP_END_SEARCH = 64 * 1024 + 22
+
+# Ambientes MSYS2 e prefixo de seus pacotes; UCRT64 é o usado pelo build
+MSYS2_ENVIRONMENTS: Dict[str, str] = {
+    "ucrt64": "mingw-w64-ucrt-x86_64",
+    "mingw64": "mingw-w64-x86_64",
+    "clang64": "mingw-w64-clang-x86_64",
+    "mingw32": "mingw-w64-i686",
+}
+DEFAULT_MSYS2_ENVIRONMENT = "ucrt64"
+
+# Modo --watch: intervalo de varredura e janela para agrupar eventos
+DEFAULT_WATCH_INTERVAL = 2.0
+WATCH_SETTLE_DELAY = 0.5
+
+# Checks de desempenho do host (--perf). Os limites marcam hosts que tendem
+# a estourar a estimativa de 45-90 minutos do README para o primeiro build.
+PERF_MIN_CORES = 4
+PERF_RECOMMENDED_CORES = 8
+PERF_MIN_GB_PER_JOB = 0.75
+PERF_RECOMMENDED_GB_PER_JOB = 1.5
+PERF_MIN_FREE_DISK_GB = 8.0
+PERF_RECOMMENDED_FREE_DISK_GB = 15.0
+PERF_SEQUENTIAL_WRITE_MB = 64
+PERF_MIN_SEQUENTIAL_MBPS = 30.0
+PERF_RECOMMENDED_SEQUENTIAL_MBPS = 100.0
+PERF_SMALL_FILES = 500
+PERF_SMALL_FILE_BYTES = 4096
+PERF_MIN_SMALL_FILES_PER_S = 200.0
+PERF_RECOMMENDED_SMALL_FILES_PER_S = 1000.0
+PERF_COMPILE_WARN_S = 1.0
+PERF_COMPILE_FAIL_S = 3.0
+PERF_NINJA_NOOP_WARN_S = 2.0
+PERF_NINJA_NOOP_FAIL_S = 10.0
+# Estatísticas do cache de compilação gravadas por build_vlc.sh no diretório de build
+COMPILER_CACHE_STATS_FILE = ".vlc-compiler-cache"
+GIB = 1024 ** 3
+
+# Prazo padrão de cada check, em segundos (--timeout)
+DEFAULT_CHECK_TIMEOUT = 30.0
+
+# Formatos de saída incremental (--stream)
+STREAM_FORMATS = ("ndjson",)
+
 
 @dataclass
 class CheckOutcome:
@@ -37,6 +109,8 @@ class CheckOutcome:
     location: Optional[str]
     message: str
     optional: bool = False
+    elapsed_ms: Optional[float] = None
+    spawns: int = 0
 
 
 @dataclass
@@ -47,6 +121,10 @@ class Dependency:
     label: str
     checker: Callable[[], CheckOutcome]
     optional: bool = False
+    # Entradas observadas pelo modo --watch (ver watch_directories)
+    inputs: Tuple[str, ...] = ("path", "msys2")
+    # "deps" (ferramentas) ou "perf" (desempenho do host, ver --perf)
+    category: str = "deps"
 
 
 def deduplicate_paths(paths: Iterable[Path]) -> List[Path]:
@@ -67,10 +145,18 @@ def deduplicate_paths(paths: Iterable[Path]) -> List[Path]:
     return result
 
 
-def discover_msys2_roots() -> List[Path]:
+def split_path_env(path_env: Optional[str] = None) -> List[Path]:
+    """Lê as entradas do PATH uma única vez, sem duplicatas."""
+    raw = os.environ.get("PATH", "") if path_env is None else path_env
+    return deduplicate_paths(Path(entry) for entry in raw.split(os.pathsep))
+
+
+def discover_msys2_roots(path_entries: Optional[Iterable[Path]] = None) -> List[Path]:
     """
     Retorna candidatos para a raiz do MSYS2 com base em variáveis de ambiente,
     caminhos padrão e entradas do PATH.
+
+    path_entries permite reaproveitar um PATH já lido (ver ToolIndex).
     """
     candidates: List[Path] = []
     env_root = os.environ.get("MSYS2_ROOT")
@@ -84,18 +170,17 @@ def discover_msys2_roots() -> List[Path]:
         ]
     )
 
-    path_env = os.environ.get("PATH", "")
-    for raw in path_env.split(os.pathsep):
-        cleaned = raw.strip().strip('"')
-        if not cleaned:
-            continue
-        entry = Path(cleaned)
-        if entry.is_file():
-            entry = entry.parent
+    if path_entries is None:
+        path_entries = split_path_env()
+    for entry in path_entries:
         parts = entry.parts
         lower_parts = [part.lower() for part in parts]
         for idx, part in enumerate(lower_parts):
             if part.startswith("msys"):
+                # Só é preciso consultar o disco quando a própria entrada
+                # parece ser um arquivo (ex.: ...\msys2.exe no PATH).
+                if idx == len(parts) - 1 and entry.is_file():
+                    break
                 root = Path(*parts[: idx + 1])
                 candidates.append(root)
                 break
@@ -103,6 +188,554 @@ def discover_msys2_roots() -> List[Path]:
     return deduplicate_paths(candidates)
 
 
+class ToolIndex:
+    """
+    Índice de executáveis construído uma vez por auditoria.
+
+    Cada diretório (entradas do PATH, pastas bin do MSYS2 e demais locais
+    consultados pelos checks) é listado no máximo uma vez; as consultas
+    seguintes são respondidas em memória. É seguro para uso pelas threads de
+    run_checks.
+    """
+
+    def __init__(
+        self,
+        path_entries: Optional[Iterable[Path]] = None,
+        pathext: Optional[str] = None,
+    ) -> None:
+        self.directories = (
+            split_path_env() if path_entries is None else deduplicate_paths(path_entries)
+        )
+        self.msys2_roots = discover_msys2_roots(self.directories)
+        if os.name == "nt":
+            raw_ext = pathext if pathext is not None else os.environ.get(
+                "PATHEXT", ".COM;.EXE;.BAT;.CMD"
+            )
+            self.pathext = [ext.lower() for ext in raw_ext.split(os.pathsep) if ext]
+        else:
+            self.pathext = []
+        self._listings: Dict[str, Dict[str, str]] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._package_dbs: Dict[str, "PacmanLocalDb"] = {}
+        self._lock = threading.Lock()
+
+    def _listing(self, directory: Path) -> Dict[str, str]:
+        """Nomes do diretório (normalizados -> reais), lidos uma única vez."""
+        key = os.path.normcase(os.path.normpath(str(directory)))
+        with self._lock:
+            cached = self._listings.get(key)
+        if cached is not None:
+            return cached
+
+        names: Dict[str, str] = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    names.setdefault(os.path.normcase(entry.name), entry.name)
+        except OSError:
+            pass
+
+        with self._lock:
+            return self._listings.setdefault(key, names)
+
+    def find(self, directory: Path, name: str) -> Optional[Path]:
+        """Retorna directory/name se o arquivo existir, sem stat por consulta."""
+        real_name = self._listing(directory).get(os.path.normcase(name))
+        if real_name is None:
+            return None
+        return directory / real_name
+
+    def _candidates(self, command: str) -> List[str]:
+        if not self.pathext:
+            return [command]
+        if os.path.splitext(command)[1].lower() in self.pathext:
+            return [command]
+        return [command + ext for ext in self.pathext]
+
+    def which(self, command: str) -> Optional[str]:
+        """Equivalente a shutil.which, consultando o índice em memória."""
+        with self._lock:
+            if command in self._resolved:
+                return self._resolved[command]
+
+        found: Optional[str] = None
+        candidates = self._candidates(command)
+        for directory in self.directories:
+            for candidate in candidates:
+                path = self.find(directory, candidate)
+                if path is None:
+                    continue
+                if os.path.isfile(path) and os.access(path, os.X_OK):
+                    found = str(path)
+                    break
+            if found:
+                break
+
+        with self._lock:
+            self._resolved[command] = found
+        return found
+
+    def package_db(self, root: Path) -> "PacmanLocalDb":
+        """Banco local do pacman da raiz MSYS2, lido no máximo uma vez."""
+        key = os.path.normcase(os.path.normpath(str(root)))
+        with self._lock:
+            db = self._package_dbs.get(key)
+            if db is None:
+                db = self._package_dbs[key] = PacmanLocalDb(root)
+        return db
+
+    def msys2_provider(
+        self, package_template: str, names: Sequence[str]
+    ) -> Optional[Tuple[str, str, Optional[Path]]]:
+        """
+        Procura, no inventário de todas as raízes MSYS2, o pacote que fornece
+        ``names``. Retorna (pacote, versão, executável) ou None se não instalado.
+        """
+        for package in msys2_package_candidates(package_template):
+            for root in self.msys2_roots:
+                db = self.package_db(root)
+                version = db.version(package)
+                if version:
+                    return package, version, db.binary(package, names)
+        return None
+
+    def msys2_owner(self, executable: Path) -> Optional[Tuple[str, str]]:
+        """Pacote MSYS2 (nome, versão) dono do executável, se houver."""
+        target = os.path.normcase(os.path.normpath(str(executable)))
+        for root in self.msys2_roots:
+            prefix = os.path.normcase(os.path.normpath(str(root))) + os.sep
+            if target.startswith(prefix):
+                relative = str(executable)[len(prefix):].replace("\\", "/")
+                owner = self.package_db(root).owner(relative)
+                if owner:
+                    return owner
+        return None
+
+
+_tool_index: Optional[ToolIndex] = None
+_tool_index_lock = threading.Lock()
+
+
+def set_tool_index(index: Optional[ToolIndex]) -> None:
+    """Substitui o índice compartilhado (None força reconstrução sob demanda)."""
+    global _tool_index
+    with _tool_index_lock:
+        _tool_index = index
+
+
+def get_tool_index() -> ToolIndex:
+    """Retorna o índice da auditoria atual, construindo-o se necessário."""
+    global _tool_index
+    with _tool_index_lock:
+        if _tool_index is None:
+            _tool_index = ToolIndex()
+        return _tool_index
+
+
+def parse_pacman_desc(text: str) -> Dict[str, List[str]]:
+    """Interpreta arquivos desc/files do pacman (%CHAVE% seguido de valores)."""
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%") and len(line) > 2:
+            current = sections.setdefault(line[1:-1], [])
+        elif not line:
+            current = None
+        elif current is not None:
+            current.append(line)
+    return sections
+
+
+def pacman_upstream_version(raw: str) -> str:
+    """Remove epoch e pkgrel de uma versão do pacman (ex.: 1:14.2.0-3 -> 14.2.0)."""
+    return raw.split(":", 1)[-1].rsplit("-", 1)[0]
+
+
+class PacmanLocalDb:
+    """
+    Leitura preguiçosa do banco local do pacman de uma raiz MSYS2.
+
+    Na primeira consulta, percorre var/lib/pacman/local uma única vez e monta
+    em memória as versões de cada pacote, o dono de cada arquivo instalado e
+    os executáveis (arquivos em */bin/) de cada pacote. Todas as perguntas
+    sobre ferramentas do MSYS2 são respondidas a partir dessa tabela.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._packages: Optional[Dict[str, str]] = None
+        self._owners: Dict[str, str] = {}
+        self._binaries: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        with self._lock:
+            if self._packages is not None:
+                return self._packages
+
+            packages: Dict[str, str] = {}
+            owners: Dict[str, str] = {}
+            binaries: Dict[str, Dict[str, str]] = {}
+            local = self.root.joinpath(*PACMAN_LOCAL_DB)
+            try:
+                entries = [entry.path for entry in os.scandir(local) if entry.is_dir()]
+            except OSError:
+                entries = []
+
+            for entry in sorted(entries):
+                try:
+                    desc = parse_pacman_desc(
+                        Path(entry, "desc").read_text(encoding="utf-8", errors="replace")
+                    )
+                    files = parse_pacman_desc(
+                        Path(entry, "files").read_text(encoding="utf-8", errors="replace")
+                    )
+                except OSError:
+                    continue
+                name = (desc.get("NAME") or [""])[0]
+                version = (desc.get("VERSION") or [""])[0]
+                if not name or not version:
+                    continue
+                packages[name] = version
+                package_binaries = binaries.setdefault(name, {})
+                for installed in files.get("FILES", []):
+                    if installed.endswith("/"):
+                        continue
+                    owners.setdefault(installed.lower(), name)
+                    directory, _, filename = installed.rpartition("/")
+                    if directory == "bin" or directory.endswith("/bin"):
+                        package_binaries.setdefault(filename.lower(), installed)
+
+            self._owners = owners
+            self._binaries = binaries
+            self._packages = packages
+            return packages
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def version(self, package: str) -> Optional[str]:
+        """Versão upstream do pacote instalado, ou None."""
+        raw = self._load().get(package)
+        return pacman_upstream_version(raw) if raw else None
+
+    def binary(self, package: str, names: Sequence[str]) -> Optional[Path]:
+        """Caminho do primeiro executável ``names`` (com ou sem .exe) do pacote."""
+        self._load()
+        package_binaries = self._binaries.get(package, {})
+        for name in names:
+            for candidate in (name, name + ".exe"):
+                relative = package_binaries.get(candidate.lower())
+                if relative:
+                    return self.root.joinpath(*relative.split("/"))
+        return None
+
+    def owner(self, relative_path: str) -> Optional[Tuple[str, str]]:
+        """(pacote, versão upstream) dono do caminho relativo à raiz."""
+        packages = self._load()
+        name = self._owners.get(relative_path.lower())
+        if name is None:
+            return None
+        return name, pacman_upstream_version(packages[name])
+
+
+def preferred_msys2_environment() -> str:
+    """Ambiente MSYS2 ativo (MSYSTEM) ou UCRT64 por padrão."""
+    current = os.environ.get("MSYSTEM", "").lower()
+    return current if current in MSYS2_ENVIRONMENTS else DEFAULT_MSYS2_ENVIRONMENT
+
+
+def msys2_package_candidates(package_template: str) -> List[str]:
+    """
+    Nomes de pacote para um modelo como "{prefix}-ninja", começando pelo
+    ambiente preferido. Modelos sem {prefix} (pacotes msys, ex.: perl)
+    retornam apenas o próprio nome.
+    """
+    if "{prefix}" not in package_template:
+        return [package_template]
+    preferred = preferred_msys2_environment()
+    environments = [preferred] + [env for env in MSYS2_ENVIRONMENTS if env != preferred]
+    return [
+        package_template.format(prefix=MSYS2_ENVIRONMENTS[env]) for env in environments
+    ]
+
+
+def _pe_resource_version(view: mmap.mmap) -> Optional[bytes]:
+    """Localiza o recurso RT_VERSION de um PE mapeado em memória."""
+    if view[:2] != b"MZ":
+        return None
+    (pe_offset,) = struct.unpack_from("<I", view, 0x3C)
+    if view[pe_offset : pe_offset + 4] != b"PE\0\0":
+        return None
+
+    coff = pe_offset + 4
+    (num_sections,) = struct.unpack_from("<H", view, coff + 2)
+    (optional_size,) = struct.unpack_from("<H", view, coff + 16)
+    optional = coff + 20
+    (magic,) = struct.unpack_from("<H", view, optional)
+    if magic == 0x10B:
+        directories = optional + 96
+    elif magic == 0x20B:
+        directories = optional + 112
+    else:
+        return None
+    (num_directories,) = struct.unpack_from("<I", view, directories - 4)
+    if num_directories <= 2:
+        return None
+    resource_rva, _ = struct.unpack_from("<II", view, directories + 2 * 8)
+    if not resource_rva:
+        return None
+
+    sections = []
+    section_table = optional + optional_size
+    for idx in range(num_sections):
+        virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from(
+            "<IIII", view, section_table + idx * 40 + 8
+        )
+        sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+
+    def rva_to_offset(rva: int) -> Optional[int]:
+        for virtual_address, span, raw_pointer in sections:
+            if virtual_address <= rva < virtual_address + span:
+                return rva - virtual_address + raw_pointer
+        return None
+
+    base = rva_to_offset(resource_rva)
+    if base is None:
+        return None
+
+    def first_entry(directory: int, wanted: Optional[int] = None) -> Optional[int]:
+        named, ids = struct.unpack_from("<HH", view, base + directory + 12)
+        for idx in range(named + ids):
+            name, target = struct.unpack_from("<II", view, base + directory + 16 + idx * 8)
+            if wanted is None or name == wanted:
+                return target
+        return None
+
+    # Tipo RT_VERSION -> primeiro nome -> primeiro idioma -> dados
+    target = first_entry(0, RT_VERSION)
+    for _ in range(2):
+        if target is None or not target & 0x80000000:
+            return None
+        target = first_entry(target & 0x7FFFFFFF)
+    if target is None or target & 0x80000000:
+        return None
+
+    data_rva, data_size = struct.unpack_from("<II", view, base + target)
+    data_offset = rva_to_offset(data_rva)
+    if data_offset is None:
+        return None
+    return bytes(view[data_offset : data_offset + data_size])
+
+
+def parse_version_resource(blob: bytes) -> Optional[str]:
+    """Extrai ProductVersion/FileVersion (ou VS_FIXEDFILEINFO) de um VS_VERSIONINFO."""
+    for key in ("ProductVersion", "FileVersion"):
+        marker = (key + "\0").encode("utf-16-le")
+        idx = blob.find(marker)
+        while idx >= 0 and idx % 2:
+            idx = blob.find(marker, idx + 1)
+        if idx < 6:
+            continue
+        start = idx - 6
+        (value_length,) = struct.unpack_from("<H", blob, start + 2)
+        value_offset = start + ((idx + len(marker) - start + 3) & ~3)
+        raw = blob[value_offset : value_offset + value_length * 2]
+        text = raw.decode("utf-16-le", errors="ignore").split("\0", 1)[0]
+        version = extract_version(text)
+        if version:
+            return version
+
+    fixed = blob.find(struct.pack("<I", VS_FIXEDFILEINFO_SIGNATURE))
+    if fixed >= 0 and len(blob) >= fixed + 24:
+        product_ms, product_ls = struct.unpack_from("<II", blob, fixed + 16)
+        return (
+            f"{product_ms >> 16}.{product_ms & 0xFFFF}."
+            f"{product_ls >> 16}.{product_ls & 0xFFFF}"
+        )
+    return None
+
+
+def read_pe_version(path: Path) -> Optional[str]:
+    """Lê a versão do recurso VERSIONINFO de um .exe sem executá-lo."""
+    try:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size < 0x40:
+                return None
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                blob = _pe_resource_version(view)
+    except (OSError, ValueError, struct.error):
+        return None
+    if not blob:
+        return None
+    try:
+        return parse_version_resource(blob)
+    except struct.error:
+        return None
+
+
+def is_script_launcher(executable: Path) -> bool:
+    """
+    Indica se o .exe é um lançador de console script do pip.
+
+    O VERSIONINFO desses executáveis é o do lançador (ex.: 1.1.0.14 do distlib),
+    não o da ferramenta. São reconhecidos pelo zip anexado ao final ou por
+    ficarem em Scripts/ ao lado de um site-packages.
+    """
+    if executable.parent.name.lower() == "scripts":
+        prefix = executable.parent.parent
+        if (prefix / "Lib" / "site-packages").is_dir() or (prefix / "site-packages").is_dir():
+            return True
+    try:
+        with open(executable, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            handle.seek(max(0, size - ZIP_END_SEARCH))
+            return ZIP_END_SIGNATURE in handle.read()
+    except OSError:
+        return False
+
+
+def dist_info_version(executable: Path, distribution: str) -> Optional[str]:
+    """
+    Versão de um pacote pip cujo script de entrada é ``executable``.
+
+    Procura <dist>-<versão>.dist-info nos site-packages do prefixo do script
+    (Scripts/ no Windows, bin/ em POSIX, incluindo instalações --user).
+    """
+    prefix = executable.parent.parent
+    site_dirs = [prefix / "Lib" / "site-packages", prefix / "site-packages"]
+    lib_dir = prefix / "lib"
+    try:
+        site_dirs.extend(
+            Path(entry.path) / "site-packages"
+            for entry in os.scandir(lib_dir)
+            if entry.name.startswith("python")
+        )
+    except OSError:
+        pass
+
+    wanted = distribution.lower().replace("-", "_")
+    for site_dir in site_dirs:
+        try:
+            names = [entry.name for entry in os.scandir(site_dir)]
+        except OSError:
+            continue
+        for name in names:
+            if not name.endswith(".dist-info"):
+                continue
+            dist, _, version = name[: -len(".dist-info")].partition("-")
+            if version and dist.lower().replace("-", "_") == wanted:
+                return version
+    return None
+
+
+_metadata_enabled = True
+
+
+def set_metadata_detection(enabled: bool) -> None:
+    """Liga/desliga a leitura de versões por metadados (--no-metadata)."""
+    global _metadata_enabled
+    _metadata_enabled = enabled
+
+
+def read_version_metadata(
+    executable: Path,
+    *,
+    distribution: Optional[str] = None,
+) -> Optional[Tuple[str, str]]:
+    """
+    Tenta descobrir a versão sem executar o binário.
+
+    Ordem: dist-info do pip (quando ``distribution`` é informado), banco
+    local do pacman do MSYS2 e recurso VERSIONINFO do PE. Lançadores do pip
+    (ver is_script_launcher) nunca usam o VERSIONINFO: a versão vem do
+    dist-info do pacote de mesmo nome ou, sem ele, do subprocesso. Retorna
+    (versão, origem) ou None quando não há metadados.
+    """
+    if not _metadata_enabled:
+        return None
+
+    launcher = is_script_launcher(executable)
+    if launcher and not distribution:
+        distribution = executable.stem
+    if distribution:
+        version = dist_info_version(executable, distribution)
+        if version:
+            return version, f"pip {distribution}-{version}.dist-info"
+
+    owner = get_tool_index().msys2_owner(executable)
+    if owner:
+        package, version = owner
+        return version, f"pacman {package}"
+
+    if launcher:
+        return None
+    version = read_pe_version(executable)
+    if version:
+        return version, "PE VERSIONINFO"
+    return None
+
+
+def version_outcome(
+    label: str,
+    location: str,
+    version: Optional[str],
+    *,
+    min_version: Optional[str],
+    hint: str,
+    message: str,
+) -> CheckOutcome:
+    """Resultado a partir de uma versão conhecida, aplicando a versão mínima."""
+    if min_version and version and not version_is_at_least(version, min_version):
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=version,
+            location=location,
+            message=f"Versão detectada {version}. Recomendado >= {min_version}. {hint}",
+        )
+
+    if min_version and version is None:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=location,
+            message=f"Não foi possível determinar a versão. {hint}",
+        )
+
+    return CheckOutcome(
+        name=label,
+        status="ok",
+        version=version,
+        location=location,
+        message=message,
+    )
+
+
+def probe_metadata(
+    label: str,
+    executable: Path,
+    *,
+    min_version: Optional[str] = None,
+    hint: str = "",
+    distribution: Optional[str] = None,
+) -> Optional[CheckOutcome]:
+    """CheckOutcome baseado apenas em metadados, ou None para cair no subprocesso."""
+    found = read_version_metadata(executable, distribution=distribution)
+    if not found:
+        return None
+    version, source = found
+    return version_outcome(
+        label,
+        str(executable),
+        version,
+        min_version=min_version,
+        hint=hint,
+        message=f"{executable.name} {version} (lido de {source}, sem executar).",
+    )
+
+
 def extract_version(text: str, pattern: str = DEFAULT_VERSION_PATTERN) -> Optional[str]:
     """Extrai a primeira versão identificável do texto."""
     match = re.search(pattern, text)
@@ -128,13 +761,310 @@ def version_is_at_least(found: str, minimum: str) -> bool:
     return normalize_version(found) >= normalize_version(minimum)
 
 
-def run_subprocess(command: Sequence[str]) -> subprocess.CompletedProcess:
-    """Executa comando capturando saída de forma segura."""
-    return subprocess.run(
+class CheckTimeout(RuntimeError):
+    """Prazo de um check (ou da auditoria) expirou durante um subprocesso."""
+
+
+@dataclass
+class CheckContext:
+    """Estado do check em execução na thread atual: prazo e processos criados."""
+
+    deadline: Optional[float] = None
+    spawns: int = 0
+
+
+_check_context = threading.local()
+
+
+def current_check_context() -> Optional[CheckContext]:
+    return getattr(_check_context, "current", None)
+
+
+def kill_process_tree(process: subprocess.Popen) -> None:
+    """Encerra o processo e todos os seus descendentes."""
+    if os.name == "nt":
+        try:
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                capture_output=True,
+                check=False,
+            )
+        except OSError:
+            pass
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def run_subprocess(
+    command: Sequence[str],
+    timeout: Optional[float] = None,
+) -> subprocess.CompletedProcess:
+    """
+    Executa comando capturando saída de forma segura.
+
+    O processo recebe stdin vazio e roda em seu próprio grupo, para que a
+    árvore inteira seja encerrada se o prazo (``timeout`` ou o do check atual)
+    expirar; nesse caso CheckTimeout é lançada.
+    """
+    context = current_check_context()
+    if context is not None:
+        context.spawns += 1
+        if context.deadline is not None:
+            remaining = context.deadline - time.monotonic()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+    if timeout is not None and timeout <= 0:
+        raise CheckTimeout(f"prazo esgotado antes de executar {command[0]}")
+
+    popen_kwargs: Dict[str, object] = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs["start_new_session"] = True
+
+    process = subprocess.Popen(
         list(command),
-        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
-        check=False,
+        **popen_kwargs,
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(process)
+        try:
+            process.communicate(timeout=5)
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+        raise CheckTimeout(
+            f"{Path(command[0]).name} não respondeu em {timeout:.1f}s"
+        ) from None
+    except BaseException:
+        kill_process_tree(process)
+        raise
+
+    return subprocess.CompletedProcess(
+        process.args, process.returncode, stdout, stderr
+    )
+
+
+def default_cache_path() -> Path:
+    """Local padrão do cache de sondagens (LOCALAPPDATA ou XDG_CACHE_HOME)."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "vlc-build-doctor" / "probe-cache.json"
+
+
+class ProbeCache:
+    """
+    Cache em disco de CheckOutcome por identidade do executável.
+
+    A chave combina o caminho resolvido, tamanho e mtime do executável, os
+    argumentos usados na sondagem e as variáveis de CACHE_ENV_VARS. Entradas
+    expiram após ``ttl`` segundos e, acima de ``max_entries``, as menos usadas
+    recentemente são descartadas. Falhas de leitura ou escrita nunca
+    interrompem a auditoria: o cache apenas deixa de ser usado.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        refresh: bool = False,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if not refresh:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    @staticmethod
+    def make_key(scope: str, executable: Path, args: Sequence[str]) -> Optional[str]:
+        """Gera a chave do executável ou None se ele não puder ser inspecionado."""
+        try:
+            resolved = executable.resolve()
+            stat = resolved.stat()
+        except OSError:
+            return None
+        identity = {
+            "scope": scope,
+            "exe": os.path.normcase(str(resolved)),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "args": list(args),
+            "env": {name: os.environ.get(name, "") for name in CACHE_ENV_VARS},
+        }
+        encoded = json.dumps(identity, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[CheckOutcome]:
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            outcome = None
+            if entry is not None and now - entry.get("created", 0) <= self.ttl:
+                try:
+                    outcome = CheckOutcome(**entry["outcome"])
+                except (KeyError, TypeError):
+                    outcome = None
+            if outcome is None:
+                if entry is not None:
+                    del self._entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["used"] = now
+            self._dirty = True
+            self.hits += 1
+            return outcome
+
+    def put(self, key: str, outcome: CheckOutcome) -> None:
+        with self._lock:
+            now = time.time()
+            self._entries[key] = {
+                "created": now,
+                "used": now,
+                "outcome": asdict(outcome),
+            }
+            self._dirty = True
+            excess = len(self._entries) - self.max_entries
+            if excess > 0:
+                oldest = sorted(
+                    self._entries, key=lambda item: self._entries[item].get("used", 0)
+                )
+                for stale in oldest[:excess]:
+                    del self._entries[stale]
+
+    def save(self) -> None:
+        """Grava o cache de forma atômica (arquivo temporário + rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"format": CACHE_FORMAT, "entries": self._entries}
+            tmp_path: Optional[Path] = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # Temporário exclusivo: outros processos (doctor, artifact_cache)
+                # podem gravar o mesmo cache ao mesmo tempo
+                handle, name = tempfile.mkstemp(
+                    prefix=f"{self.path.name}.", suffix=".tmp", dir=self.path.parent
+                )
+                tmp_path = Path(name)
+                with os.fdopen(handle, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(payload))
+                os.replace(tmp_path, self.path)
+            except OSError:
+                return
+            finally:
+                if tmp_path is not None and tmp_path.exists():
+                    tmp_path.unlink()
+            self._dirty = False
+
+
+_probe_cache: Optional[ProbeCache] = None
+
+
+def set_probe_cache(cache: Optional[ProbeCache]) -> None:
+    """Define o cache usado pelos checks (None desativa)."""
+    global _probe_cache
+    _probe_cache = cache
+
+
+def cached_probe(
+    scope: str,
+    executable: Path,
+    args: Sequence[str],
+    probe: Callable[[], CheckOutcome],
+) -> CheckOutcome:
+    """
+    Reaproveita o resultado de uma sondagem enquanto o executável não mudar.
+
+    Somente resultados ok/aviso são gravados; falhas são sempre reavaliadas.
+    """
+    cache = _probe_cache
+    if not _metadata_enabled:
+        scope = f"{scope} [sem metadados]"
+    key = cache.make_key(scope, executable, args) if cache else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    outcome = probe()
+    if key and outcome.status != "fail":
+        cache.put(key, outcome)
+    return outcome
+
+
+def probe_command(
+    label: str,
+    command: str,
+    path: str,
+    version_args: Sequence[str],
+    *,
+    min_version: Optional[str],
+    hint: str,
+    version_pattern: str,
+) -> CheckOutcome:
+    """Executa o comando encontrado e interpreta sua versão."""
+    try:
+        completed = run_subprocess([path, *version_args])
+    except OSError as exc:
+        return CheckOutcome(
+            name=label,
+            status="fail",
+            version=None,
+            location=path,
+            message=f"Falha ao executar {command}: {exc}",
+        )
+
+    combined = "\n".join(
+        part.strip() for part in [completed.stdout, completed.stderr] if part
+    )
+    version = extract_version(combined, version_pattern)
+
+    if completed.returncode != 0 and not combined:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=version,
+            location=path,
+            message=f"Comando retornou código {completed.returncode}. {hint}",
+        )
+
+    return version_outcome(
+        label,
+        path,
+        version,
+        min_version=min_version,
+        hint=hint,
+        message=(combined or f"{command} disponível."),
     )
 
 
@@ -146,74 +1076,108 @@ def check_command(
     min_version: Optional[str] = None,
     hint: str,
     version_pattern: str = DEFAULT_VERSION_PATTERN,
+    distribution: Optional[str] = None,
+    msys2_package: Optional[str] = None,
 ) -> CheckOutcome:
     """
     Verifica se um comando está disponível e qual versão responde.
 
     command_names aceita múltiplos nomes para tentar (ex.: python, python3).
+    A versão é lida primeiro dos metadados do executável (ver
+    read_version_metadata); o subprocesso só é criado quando eles não existem.
+    distribution indica o pacote pip que fornece o comando, se houver.
+
+    msys2_package é o modelo do pacote MSYS2 que fornece a ferramenta (ex.:
+    "{prefix}-ninja"). Se o comando não estiver no PATH, o inventário do
+    pacman responde presença e versão sem executar nada e, quando o pacote
+    não está instalado, a mensagem indica qual instalar.
     """
+    index = get_tool_index()
     for command in command_names:
-        path = shutil.which(command)
+        path = index.which(command)
         if not path:
             continue
 
-        try:
-            completed = run_subprocess([path, *version_args])
-        except OSError as exc:
-            return CheckOutcome(
-                name=label,
-                status="fail",
-                version=None,
-                location=path,
-                message=f"Falha ao executar {command}: {exc}",
+        return cached_probe(
+            label,
+            Path(path),
+            version_args,
+            lambda: probe_metadata(
+                label,
+                Path(path),
+                min_version=min_version,
+                hint=hint,
+                distribution=distribution,
             )
+            or probe_command(
+                label,
+                command,
+                path,
+                version_args,
+                min_version=min_version,
+                hint=hint,
+                version_pattern=version_pattern,
+            ),
+        )
 
-        combined = "\n".join(
-            part.strip() for part in [completed.stdout, completed.stderr] if part
+    if msys2_package:
+        return check_msys2_inventory(
+            label,
+            command_names,
+            msys2_package,
+            min_version=min_version,
+            hint=hint,
         )
-        version = extract_version(combined, version_pattern)
 
-        if completed.returncode != 0 and not combined:
-            return CheckOutcome(
-                name=label,
-                status="warn",
-                version=version,
-                location=path,
-                message=f"Comando retornou código {completed.returncode}. {hint}",
-            )
+    return CheckOutcome(
+        name=label,
+        status="fail",
+        version=None,
+        location=None,
+        message=f"Não encontrado no PATH. {hint}",
+    )
 
-        if min_version and version and not version_is_at_least(version, min_version):
-            return CheckOutcome(
-                name=label,
-                status="warn",
-                version=version,
-                location=path,
-                message=f"Versão detectada {version}. Recomendado >= {min_version}. {hint}",
-            )
 
-        if min_version and version is None:
-            return CheckOutcome(
-                name=label,
-                status="warn",
-                version=None,
-                location=path,
-                message=f"Não foi possível determinar a versão. {hint}",
-            )
+def check_msys2_inventory(
+    label: str,
+    command_names: Sequence[str],
+    package_template: str,
+    *,
+    min_version: Optional[str],
+    hint: str,
+) -> CheckOutcome:
+    """Resolve uma ferramenta fora do PATH pelo inventário de pacotes do MSYS2."""
+    provider = get_tool_index().msys2_provider(package_template, command_names)
+    if provider is None:
+        package = msys2_package_candidates(package_template)[0]
+        return CheckOutcome(
+            name=label,
+            status="fail",
+            version=None,
+            location=None,
+            message=f"Não encontrado no PATH nem no MSYS2; fornecido pelo pacote {package}. {hint}",
+        )
 
+    package, version, executable = provider
+    if executable is None:
         return CheckOutcome(
             name=label,
-            status="ok",
+            status="warn",
             version=version,
-            location=path,
-            message=(combined or f"{command} disponível."),
+            location=None,
+            message=f"Pacote MSYS2 {package} {version} instalado, mas sem o executável esperado. {hint}",
         )
 
-    return CheckOutcome(
-        name=label,
-        status="fail",
-        version=None,
-        location=None,
-        message=f"Não encontrado no PATH. {hint}",
+    return version_outcome(
+        label,
+        str(executable),
+        version,
+        min_version=min_version,
+        hint=hint,
+        message=(
+            f"Fornecido pelo pacote MSYS2 {package} {version}; "
+            f"{executable.parent} não está no PATH fora do shell do MSYS2."
+        ),
     )
 
 
@@ -224,6 +1188,7 @@ def check_python() -> CheckOutcome:
         ("--version",),
         min_version="3.8",
         hint="Instale o Python 3.8+ pelo Microsoft Store ou python.org e habilite 'Add to PATH'.",
+        msys2_package="{prefix}-python",
     )
 
 
@@ -234,6 +1199,7 @@ def check_git() -> CheckOutcome:
         ("--version",),
         min_version="2.20",
         hint="Instale o Git para Windows: https://git-scm.com/download/win.",
+        msys2_package="git",
     )
 
 
@@ -244,6 +1210,7 @@ def check_cmake() -> CheckOutcome:
         ("--version",),
         min_version="3.16",
         hint="Baixe o instalador do CMake para Windows: https://cmake.org/download/.",
+        msys2_package="{prefix}-cmake",
     )
 
 
@@ -254,6 +1221,7 @@ def check_ninja() -> CheckOutcome:
         ("--version",),
         min_version="1.8",
         hint="Adicione Ninja ao PATH (via MSYS2, Chocolatey ou download manual).",
+        msys2_package="{prefix}-ninja",
     )
 
 
@@ -264,6 +1232,8 @@ def check_meson() -> CheckOutcome:
         ("--version",),
         min_version="0.54",
         hint="Instale com 'pip install meson' dentro do Python utilizado para compilar.",
+        distribution="meson",
+        msys2_package="{prefix}-meson",
     )
 
 
@@ -272,7 +1242,8 @@ def check_pkg_config() -> CheckOutcome:
         "pkg-config",
         ("pkg-config",),
         ("--version",),
-        hint="Instale via MSYS2 (pacote mingw-w64-x86_64-pkg-config) e mantenha o binário no PATH.",
+        hint="Instale via MSYS2 (pacote mingw-w64-ucrt-x86_64-pkgconf) e mantenha o binário no PATH.",
+        msys2_package="{prefix}-pkgconf",
     )
 
 
@@ -283,44 +1254,20 @@ def check_nasm() -> CheckOutcome:
         ("--version",),
         min_version="2.13",
         hint="Instale o NASM via https://www.nasm.us/ ou gerenciadores (winget/choco).",
+        msys2_package="{prefix}-nasm",
     )
 
 
 def check_perl() -> CheckOutcome:
-    # Tentar encontrar Perl no PATH primeiro
-    result = check_command(
+    # Fora do PATH, o inventário do MSYS2 localiza o perl.exe de usr/bin
+    return check_command(
         "Perl",
         ("perl",),
         ("-v",),
         min_version="5.10",
         hint="Instale Perl via MSYS2 (pacman -S perl) ou Strawberry Perl.",
+        msys2_package="perl",
     )
-    
-    # Se não encontrou no PATH, procurar no MSYS2
-    if result.status == "fail":
-        msys2_roots = discover_msys2_roots()
-        for root in msys2_roots:
-            perl_path = root / "usr" / "bin" / "perl.exe"
-            if perl_path.exists():
-                try:
-                    completed = run_subprocess([str(perl_path), "-v"])
-                    combined = "\n".join(
-                        part.strip() 
-                        for part in [completed.stdout, completed.stderr] 
-                        if part
-                    )
-                    version = extract_version(combined)
-                    return CheckOutcome(
-                        name="Perl",
-                        status="ok" if completed.returncode == 0 else "warn",
-                        version=version,
-                        location=str(perl_path),
-                        message=f"Perl encontrado no MSYS2. Versão: {version or 'desconhecida'}",
-                    )
-                except OSError:
-                    pass
-    
-    return result
 
 
 def check_lua() -> CheckOutcome:
@@ -331,6 +1278,7 @@ def check_lua() -> CheckOutcome:
         ("-v",),
         min_version="5.1",
         hint="Instale Lua via MSYS2: pacman -S mingw-w64-ucrt-x86_64-lua",
+        msys2_package="{prefix}-lua",
     )
 
 
@@ -342,28 +1290,29 @@ def check_qsb() -> CheckOutcome:
         ("--version",),
         min_version="6.0",
         hint="Instale qt6-shadertools via MSYS2: pacman -S mingw-w64-ucrt-x86_64-qt6-shadertools",
+        msys2_package="{prefix}-qt6-shadertools",
     )
 
 
 def check_msys2() -> CheckOutcome:
     label = "MSYS2"
-    candidates = discover_msys2_roots()
+    index = get_tool_index()
 
-    for root in candidates:
-        if not root.exists():
-            continue
+    for root in index.msys2_roots:
         bash_locations = [
-            root / "usr" / "bin" / "bash.exe",
-            root / "bin" / "bash.exe",
+            root / "usr" / "bin",
+            root / "bin",
         ]
-        for bash_path in bash_locations:
-            if bash_path.exists():
+        for bash_dir in bash_locations:
+            bash_path = index.find(bash_dir, "bash.exe")
+            if bash_path is not None:
+                installed = len(index.package_db(root))
                 return CheckOutcome(
                     name=label,
                     status="ok",
                     version=None,
                     location=str(bash_path),
-                    message=f"Instalação detectada em {root}",
+                    message=f"Instalação detectada em {root} ({installed} pacotes instalados)",
                 )
 
     return CheckOutcome(
@@ -375,61 +1324,41 @@ def check_msys2() -> CheckOutcome:
     )
 
 
-def check_mingw() -> CheckOutcome:
-    label = "GCC (MinGW-w64)"
+def mingw_bin_dirs(index: ToolIndex) -> List[Path]:
+    """Diretórios bin onde o check do MinGW procura gcc.exe, em ordem."""
     candidates: List[Path] = []
-    roots = discover_msys2_roots()
     gcc_layouts = (
-        ("mingw64", "bin", "gcc.exe"),
-        ("ucrt64", "bin", "gcc.exe"),
-        ("clang64", "bin", "gcc.exe"),
-        ("mingw32", "bin", "gcc.exe"),
+        ("mingw64", "bin"),
+        ("ucrt64", "bin"),
+        ("clang64", "bin"),
+        ("mingw32", "bin"),
     )
 
-    for root in roots:
-        if not root.exists():
-            continue
+    for root in index.msys2_roots:
         for layout in gcc_layouts:
             candidates.append(root.joinpath(*layout))
 
     for env_var in ("MINGW_ROOT", "MINGW_HOME", "MINGW64_DIR"):
         env_value = os.environ.get(env_var)
         if env_value:
-            candidates.append(Path(env_value) / "bin" / "gcc.exe")
+            candidates.append(Path(env_value) / "bin")
 
-    candidates.append(Path(r"C:\mingw64\bin\gcc.exe"))
+    candidates.append(Path(r"C:\mingw64\bin"))
+    return candidates
 
-    for exe in candidates:
-        if exe.exists():
-            try:
-                completed = run_subprocess([str(exe), "--version"])
-            except OSError as exc:  # pragma: no cover - caminho inválido
-                return CheckOutcome(
-                    name=label,
-                    status="warn",
-                    version=None,
-                    location=str(exe),
-                    message=f"Falha ao executar GCC: {exc}",
-                )
 
-            combined = "\n".join(
-                part.strip()
-                for part in [completed.stdout, completed.stderr]
-                if part
-            )
-            version = extract_version(combined)
-            status = "ok" if completed.returncode == 0 else "warn"
-            message = (
-                combined
-                if combined
-                else "gcc.exe encontrado, mas sem saída de versão."
-            )
-            return CheckOutcome(
-                name=label,
-                status=status,
-                version=version,
-                location=str(exe),
-                message=message,
+def check_mingw() -> CheckOutcome:
+    label = "GCC (MinGW-w64)"
+    index = get_tool_index()
+
+    for bin_dir in mingw_bin_dirs(index):
+        exe = index.find(bin_dir, "gcc.exe")
+        if exe is not None:
+            return cached_probe(
+                label,
+                exe,
+                ("--version",),
+                lambda: probe_metadata(label, exe) or probe_gcc(label, exe),
             )
 
     fallback = check_command(
@@ -446,45 +1375,70 @@ def check_mingw() -> CheckOutcome:
         status="fail",
         version=None,
         location=None,
-        message="gcc.exe não encontrado. Instale o MSYS2 e o toolchain MinGW-w64 (pacote mingw-w64-x86_64-toolchain).",
+        message=(
+            "gcc.exe não encontrado. Instale o MSYS2 e o toolchain MinGW-w64 "
+            f"(pacman -S {msys2_package_candidates('{prefix}-toolchain')[0]})."
+        ),
     )
 
 
-def check_vcpkg() -> CheckOutcome:
-    label = "vcpkg"
+def probe_gcc(label: str, exe: Path) -> CheckOutcome:
+    """Lê a versão de um gcc.exe localizado fora do PATH."""
+    try:
+        completed = run_subprocess([str(exe), "--version"])
+    except OSError as exc:  # pragma: no cover - caminho inválido
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(exe),
+            message=f"Falha ao executar GCC: {exc}",
+        )
+
+    combined = "\n".join(
+        part.strip()
+        for part in [completed.stdout, completed.stderr]
+        if part
+    )
+    version = extract_version(combined)
+    status = "ok" if completed.returncode == 0 else "warn"
+    message = (
+        combined
+        if combined
+        else "gcc.exe encontrado, mas sem saída de versão."
+    )
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=version,
+        location=str(exe),
+        message=message,
+    )
+
+
+def vcpkg_roots() -> List[Path]:
+    """Raízes candidatas do vcpkg (VCPKG_ROOT e o local padrão)."""
     env_root = os.environ.get("VCPKG_ROOT")
     candidates: List[Path] = []
 
     if env_root:
         candidates.append(Path(env_root))
     candidates.append(Path(r"C:\vcpkg"))
+    return candidates
 
-    for root in candidates:
-        exe = root / "vcpkg.exe"
-        if exe.exists():
-            try:
-                completed = run_subprocess([str(exe), "version"])
-            except OSError as exc:
-                return CheckOutcome(
-                    name=label,
-                    status="warn",
-                    version=None,
-                    location=str(exe),
-                    message=f"Não foi possível executar vcpkg: {exc}",
-                )
 
-            combined = "\n".join(
-                part.strip()
-                for part in [completed.stdout, completed.stderr]
-                if part
-            )
-            version = extract_version(combined)
-            return CheckOutcome(
-                name=label,
-                status="ok" if completed.returncode == 0 else "warn",
-                version=version,
-                location=str(exe),
-                message=combined or "vcpkg encontrado.",
+def check_vcpkg() -> CheckOutcome:
+    label = "vcpkg"
+
+    index = get_tool_index()
+    for root in vcpkg_roots():
+        exe = index.find(root, "vcpkg.exe")
+        if exe is not None:
+            return cached_probe(
+                label,
+                exe,
+                ("version",),
+                lambda: probe_metadata(label, exe) or probe_vcpkg(label, exe),
             )
 
     return CheckOutcome(
@@ -496,63 +1450,137 @@ def check_vcpkg() -> CheckOutcome:
     )
 
 
-def check_visual_studio() -> CheckOutcome:
-    label = "Visual Studio Build Tools"
-    vswhere_candidates = [
-        Path(os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)"))
-        / "Microsoft Visual Studio"
-        / "Installer"
-        / "vswhere.exe",
-        Path(os.environ.get("ProgramFiles", r"C:\Program Files"))
-        / "Microsoft Visual Studio"
-        / "Installer"
-        / "vswhere.exe",
-    ]
-
-    for vswhere in vswhere_candidates:
-        if vswhere.exists():
-            try:
-                completed = run_subprocess(
-                    [
-                        str(vswhere),
-                        "-latest",
-                        "-products",
-                        "*",
-                        "-requires",
-                        "Microsoft.Component.MSBuild",
-                        "-property",
-                        "catalog_productLineVersion",
-                    ]
-                )
-            except OSError as exc:
-                return CheckOutcome(
-                    name=label,
-                    status="warn",
-                    version=None,
-                    location=str(vswhere),
-                    message=f"vswhere.exe encontrado, mas não executou: {exc}",
-                )
+def probe_vcpkg(label: str, exe: Path) -> CheckOutcome:
+    """Executa 'vcpkg version' e interpreta a saída."""
+    try:
+        completed = run_subprocess([str(exe), "version"])
+    except OSError as exc:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(exe),
+            message=f"Não foi possível executar vcpkg: {exc}",
+        )
 
-            version = extract_version(completed.stdout or completed.stderr)
-            if version:
-                return CheckOutcome(
-                    name=label,
-                    status="ok",
-                    version=version,
-                    location=str(vswhere),
-                    message=f"Versão detectada: {version}",
-                )
+    combined = "\n".join(
+        part.strip()
+        for part in [completed.stdout, completed.stderr]
+        if part
+    )
+    version = extract_version(combined)
+    return CheckOutcome(
+        name=label,
+        status="ok" if completed.returncode == 0 else "warn",
+        version=version,
+        location=str(exe),
+        message=combined or "vcpkg encontrado.",
+    )
 
-            env_hint = os.environ.get("VSINSTALLDIR")
-            message = "Vswhere executou, mas não encontrou instalações."
-            if env_hint:
-                message += f" VSINSTALLDIR aponta para {env_hint}."
-            return CheckOutcome(
-                name=label,
-                status="warn",
-                version=None,
-                location=str(vswhere),
-                message=message,
+
+VSWHERE_ARGS = (
+    "-latest",
+    "-products",
+    "*",
+    "-requires",
+    "Microsoft.Component.MSBuild",
+    "-property",
+    "catalog_productLineVersion",
+)
+
+
+def probe_vswhere(label: str, vswhere: Path) -> CheckOutcome:
+    """Consulta o vswhere.exe pela instalação mais recente com MSBuild."""
+    try:
+        completed = run_subprocess([str(vswhere), *VSWHERE_ARGS])
+    except OSError as exc:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(vswhere),
+            message=f"vswhere.exe encontrado, mas não executou: {exc}",
+        )
+
+    version = extract_version(completed.stdout or completed.stderr)
+    if version:
+        return CheckOutcome(
+            name=label,
+            status="ok",
+            version=version,
+            location=str(vswhere),
+            message=f"Versão detectada: {version}",
+        )
+
+    env_hint = os.environ.get("VSINSTALLDIR")
+    message = "Vswhere executou, mas não encontrou instalações."
+    if env_hint:
+        message += f" VSINSTALLDIR aponta para {env_hint}."
+    return CheckOutcome(
+        name=label,
+        status="warn",
+        version=None,
+        location=str(vswhere),
+        message=message,
+    )
+
+
+def vs_installer_dirs() -> List[Path]:
+    """Diretórios do Visual Studio Installer, onde fica o vswhere.exe."""
+    return [
+        Path(os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)"))
+        / "Microsoft Visual Studio"
+        / "Installer",
+        Path(os.environ.get("ProgramFiles", r"C:\Program Files"))
+        / "Microsoft Visual Studio"
+        / "Installer",
+    ]
+
+
+def vs_instances_dir() -> Path:
+    """Estado das instalações do Visual Studio, mantido pelo instalador."""
+    return (
+        Path(os.environ.get("ProgramData", r"C:\ProgramData"))
+        / "Microsoft"
+        / "VisualStudio"
+        / "Packages"
+        / "_Instances"
+    )
+
+
+def vs_instances_signature() -> str:
+    """
+    Identidade das instâncias instaladas (id e state.json de cada uma).
+
+    Instalar, atualizar ou remover o VS não muda o vswhere.exe, mas muda
+    este diretório; a assinatura entra na chave do cache de sondagens.
+    """
+    entries = []
+    try:
+        instances = sorted(os.scandir(vs_instances_dir()), key=lambda entry: entry.name)
+    except OSError:
+        return "sem-instancias"
+    for instance in instances:
+        try:
+            state = os.stat(os.path.join(instance.path, "state.json"))
+            entries.append(f"{instance.name}:{state.st_size}:{state.st_mtime_ns}")
+        except OSError:
+            entries.append(f"{instance.name}:-")
+    return hashlib.sha256("|".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+def check_visual_studio() -> CheckOutcome:
+    label = "Visual Studio Build Tools"
+
+    index = get_tool_index()
+    for installer_dir in vs_installer_dirs():
+        vswhere = index.find(installer_dir, "vswhere.exe")
+        if vswhere is not None:
+            return cached_probe(
+                f"{label} [{vs_instances_signature()}]",
+                vswhere,
+                VSWHERE_ARGS,
+                lambda: probe_vswhere(label, vswhere),
             )
 
     env_hint = os.environ.get("VSINSTALLDIR")
@@ -574,6 +1602,509 @@ def check_visual_studio() -> CheckOutcome:
     )
 
 
+def usable_cores() -> int:
+    """Núcleos que este processo pode usar (respeita afinidade quando houver)."""
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return max(1, len(os.sched_getaffinity(0)))
+        except OSError:
+            pass
+    return default_jobs()
+
+
+def _windows_memory_status():
+    import ctypes
+
+    class MEMORYSTATUSEX(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", ctypes.c_ulong),
+            ("dwMemoryLoad", ctypes.c_ulong),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+
+    status = MEMORYSTATUSEX()
+    status.dwLength = ctypes.sizeof(status)
+    if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+        return None
+    return status
+
+
+def _meminfo_bytes(field: str) -> Optional[int]:
+    try:
+        with open("/proc/meminfo", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def available_memory() -> Optional[int]:
+    """RAM disponível em bytes, ou None se não for possível medir."""
+    if os.name == "nt":
+        status = _windows_memory_status()
+        return int(status.ullAvailPhys) if status else None
+    available = _meminfo_bytes("MemAvailable")
+    if available is not None:
+        return available
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def total_memory() -> Optional[int]:
+    """RAM física total em bytes, ou None se não for possível medir."""
+    if os.name == "nt":
+        status = _windows_memory_status()
+        return int(status.ullTotalPhys) if status else None
+    total = _meminfo_bytes("MemTotal")
+    if total is not None:
+        return total
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_build_dir() -> Path:
+    """build-mingw do fonte do VLC junto ao repositório (layout de build_vlc.sh)."""
+    repo_root = Path(__file__).resolve().parent.parent
+    for source in (repo_root / "vlc", repo_root / "vlc-source"):
+        if source.is_dir():
+            return source / "build-mingw"
+    return repo_root / "vlc" / "build-mingw"
+
+
+_build_dir: Optional[Path] = None
+
+
+def set_build_dir(path: Optional[Path]) -> None:
+    """Diretório de build usado pelos checks de desempenho (--build-dir)."""
+    global _build_dir
+    _build_dir = path
+
+
+def perf_target_dir() -> Path:
+    """Diretório de build, ou o ancestral existente mais próximo (mesmo volume)."""
+    target = _build_dir or default_build_dir()
+    for candidate in (target, *target.parents):
+        if candidate.is_dir():
+            return candidate
+    return Path.cwd()
+
+
+def grade(
+    value: float,
+    *,
+    warn: float,
+    fail: float,
+    higher_is_better: bool = True,
+) -> str:
+    """Classifica uma medida em ok/warn/fail segundo os limites."""
+    if higher_is_better:
+        if value < fail:
+            return "fail"
+        return "warn" if value < warn else "ok"
+    if value > fail:
+        return "fail"
+    return "warn" if value > warn else "ok"
+
+
+def check_cpu_cores() -> CheckOutcome:
+    label = "Núcleos de CPU"
+    cores = usable_cores()
+    status = grade(cores, warn=PERF_RECOMMENDED_CORES, fail=PERF_MIN_CORES)
+    message = f"{cores} núcleos utilizáveis para jobs de compilação."
+    if status != "ok":
+        message += (
+            f" Com menos de {PERF_RECOMMENDED_CORES} núcleos o primeiro build tende "
+            "a passar de 90 minutos; prefira um agente maior."
+        )
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=None,
+        location=f"{cores} núcleos",
+        message=message,
+    )
+
+
+def check_memory_per_job() -> CheckOutcome:
+    label = "RAM por job"
+    available = available_memory()
+    if available is None:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=None,
+            message="Não foi possível medir a memória disponível neste sistema.",
+        )
+
+    cores = usable_cores()
+    per_job = available / GIB / cores
+    status = grade(
+        per_job, warn=PERF_RECOMMENDED_GB_PER_JOB, fail=PERF_MIN_GB_PER_JOB
+    )
+    message = (
+        f"{available / GIB:.1f} GB livres para {cores} jobs "
+        f"({per_job:.2f} GB por job)."
+    )
+    if status != "ok":
+        message += (
+            " As unidades Qt/QML do VLC podem usar mais de 1 GB cada; limite os "
+            "jobs (meson compile -j) ou use um host com mais RAM para evitar swap."
+        )
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=None,
+        location=f"{per_job:.2f} GB/job",
+        message=message,
+    )
+
+
+def check_disk_space() -> CheckOutcome:
+    label = "Espaço em disco (build)"
+    target = perf_target_dir()
+    try:
+        free = shutil.disk_usage(target).free / GIB
+    except OSError as exc:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(target),
+            message=f"Não foi possível consultar o espaço livre: {exc}",
+        )
+    status = grade(
+        free, warn=PERF_RECOMMENDED_FREE_DISK_GB, fail=PERF_MIN_FREE_DISK_GB
+    )
+    message = f"{free:.1f} GB livres em {target}."
+    if status != "ok":
+        message += f" O build precisa de pelo menos {PERF_MIN_FREE_DISK_GB:g} GB (fonte + artefatos)."
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=None,
+        location=f"{free:.1f} GB livres",
+        message=message,
+    )
+
+
+def measure_sequential_write(directory: Path, size_mb: int = PERF_SEQUENTIAL_WRITE_MB) -> float:
+    """Escreve ``size_mb`` MB com fsync e retorna a vazão em MB/s."""
+    block = os.urandom(1024 * 1024)
+    path = directory / "sequential.bin"
+    start = time.perf_counter()
+    with open(path, "wb", buffering=0) as handle:
+        for _ in range(size_mb):
+            handle.write(block)
+        os.fsync(handle.fileno())
+    elapsed = time.perf_counter() - start
+    path.unlink()
+    return size_mb / elapsed if elapsed > 0 else float("inf")
+
+
+def measure_small_files(
+    directory: Path,
+    count: int = PERF_SMALL_FILES,
+    size: int = PERF_SMALL_FILE_BYTES,
+) -> float:
+    """Cria e remove ``count`` arquivos pequenos; retorna arquivos por segundo."""
+    payload = b"x" * size
+    start = time.perf_counter()
+    for idx in range(count):
+        with open(directory / f"small{idx:05d}.o", "wb") as handle:
+            handle.write(payload)
+    for idx in range(count):
+        os.unlink(directory / f"small{idx:05d}.o")
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+def check_disk_throughput() -> CheckOutcome:
+    label = "E/S do diretório de build"
+    target = perf_target_dir()
+    try:
+        scratch = Path(tempfile.mkdtemp(prefix="vlc-doctor-io-", dir=target))
+    except OSError as exc:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(target),
+            message=f"Não foi possível criar arquivos de teste em {target}: {exc}",
+        )
+
+    try:
+        sequential = measure_sequential_write(scratch)
+        small_files = measure_small_files(scratch)
+    except OSError as exc:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(target),
+            message=f"Falha ao medir E/S em {target}: {exc}",
+        )
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    statuses = [
+        grade(
+            sequential,
+            warn=PERF_RECOMMENDED_SEQUENTIAL_MBPS,
+            fail=PERF_MIN_SEQUENTIAL_MBPS,
+        ),
+        grade(
+            small_files,
+            warn=PERF_RECOMMENDED_SMALL_FILES_PER_S,
+            fail=PERF_MIN_SMALL_FILES_PER_S,
+        ),
+    ]
+    status = "fail" if "fail" in statuses else "warn" if "warn" in statuses else "ok"
+    message = (
+        f"Escrita sequencial {sequential:.0f} MB/s; "
+        f"{small_files:.0f} arquivos pequenos/s em {target}."
+    )
+    if status != "ok":
+        message += (
+            " Disco lento ou antivírus varrendo o diretório de build; use um SSD "
+            "local e exclua o diretório da varredura em tempo real."
+        )
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=None,
+        location=f"{sequential:.0f} MB/s, {small_files:.0f} arq/s",
+        message=message,
+    )
+
+
+def find_build_compiler() -> Optional[Path]:
+    """gcc que o build usaria: MSYS2/MinGW primeiro, depois o PATH."""
+    index = get_tool_index()
+    for bin_dir in mingw_bin_dirs(index):
+        exe = index.find(bin_dir, "gcc.exe")
+        if exe is not None:
+            return exe
+    found = index.which("gcc")
+    return Path(found) if found else None
+
+
+def check_compiler_latency() -> CheckOutcome:
+    label = "Latência do compilador"
+    compiler = find_build_compiler()
+    if compiler is None:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=None,
+            message="gcc não encontrado; não foi possível medir a latência de compilação.",
+        )
+
+    with tempfile.TemporaryDirectory(prefix="vlc-doctor-cc-", dir=perf_target_dir()) as scratch:
+        source = Path(scratch) / "probe.c"
+        source.write_text(
+            "#include <stdio.h>\nint main(void) { puts(\"vlc\"); return 0; }\n",
+            encoding="ascii",
+        )
+        start = time.perf_counter()
+        try:
+            completed = run_subprocess(
+                [str(compiler), "-O2", "-c", str(source), "-o", str(Path(scratch) / "probe.o")]
+            )
+        except OSError as exc:
+            return CheckOutcome(
+                name=label,
+                status="warn",
+                version=None,
+                location=str(compiler),
+                message=f"Falha ao executar {compiler}: {exc}",
+            )
+        elapsed = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=str(compiler),
+            message=f"gcc não compilou a unidade de teste: {completed.stderr.strip()[:200]}",
+        )
+
+    status = grade(
+        elapsed,
+        warn=PERF_COMPILE_WARN_S,
+        fail=PERF_COMPILE_FAIL_S,
+        higher_is_better=False,
+    )
+    message = f"Unidade mínima compilada em {elapsed * 1000:.0f} ms por {compiler}."
+    if status != "ok":
+        message += (
+            " Cada uma das milhares de unidades do VLC paga esse custo fixo; "
+            "verifique antivírus e a criação de processos neste host."
+        )
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=None,
+        location=f"{elapsed * 1000:.0f} ms",
+        message=message,
+    )
+
+
+def check_ninja_noop() -> CheckOutcome:
+    label = "Ninja no-op"
+    ninja = get_tool_index().which("ninja")
+    if ninja is None:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=None,
+            message="ninja não encontrado; não foi possível medir o no-op.",
+        )
+
+    build_dir = _build_dir or default_build_dir()
+    with tempfile.TemporaryDirectory(prefix="vlc-doctor-ninja-") as scratch:
+        if (build_dir / "build.ninja").is_file():
+            # Build real: -n (dry run) não altera nada e mede o parse do grafo
+            command = [ninja, "-C", str(build_dir), "-n"]
+            subject = f"grafo de {build_dir}"
+        else:
+            Path(scratch, "build.ninja").write_text(
+                "build all: phony\ndefault all\n", encoding="ascii"
+            )
+            command = [ninja, "-C", scratch]
+            subject = "manifesto mínimo"
+
+        start = time.perf_counter()
+        try:
+            completed = run_subprocess(command)
+        except OSError as exc:
+            return CheckOutcome(
+                name=label,
+                status="warn",
+                version=None,
+                location=ninja,
+                message=f"Falha ao executar ninja: {exc}",
+            )
+        elapsed = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=ninja,
+            message=f"ninja retornou código {completed.returncode}: {completed.stderr.strip()[:200]}",
+        )
+
+    status = grade(
+        elapsed,
+        warn=PERF_NINJA_NOOP_WARN_S,
+        fail=PERF_NINJA_NOOP_FAIL_S,
+        higher_is_better=False,
+    )
+    message = f"No-op do ninja ({subject}) em {elapsed * 1000:.0f} ms."
+    if status != "ok":
+        message += " Builds incrementais pagarão esse custo a cada execução."
+    return CheckOutcome(
+        name=label,
+        status=status,
+        version=None,
+        location=f"{elapsed * 1000:.0f} ms",
+        message=message,
+    )
+
+
+def read_compiler_cache_stats(build_dir: Path) -> Optional[Dict[str, str]]:
+    """Registro chave=valor do cache de compilação do último build, se houver."""
+    try:
+        text = (build_dir / COMPILER_CACHE_STATS_FILE).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    stats: Dict[str, str] = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            stats[key.strip()] = value.strip()
+    return stats
+
+
+def check_compiler_cache() -> CheckOutcome:
+    label = "Cache de compilação"
+    install = f"pacman -S {msys2_package_candidates('{prefix}-ccache')[0]}"
+    installed = check_command(
+        label,
+        ("ccache", "sccache"),
+        ("--version",),
+        hint=f"Instale com: {install}",
+        msys2_package="{prefix}-ccache",
+    )
+    if installed.status == "fail":
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=None,
+            location=None,
+            message=(
+                "Nenhum cache de compilação (ccache/sccache) instalado; builds limpos "
+                f"recompilam todas as unidades. Instale com: {install}"
+            ),
+        )
+
+    build_dir = _build_dir or default_build_dir()
+    stats = read_compiler_cache_stats(build_dir)
+    if stats is None or stats.get("tool", "none") == "none":
+        return CheckOutcome(
+            name=label,
+            status="warn",
+            version=installed.version,
+            location=installed.location,
+            message=(
+                f"Instalado ({installed.location}), mas nenhum build em {build_dir} "
+                "usou o cache; rode scripts/build_vlc.sh sem --compiler-cache=none."
+            ),
+        )
+
+    tool = stats["tool"]
+    try:
+        hits = int(stats.get("hits", "0"))
+        misses = int(stats.get("misses", "0"))
+    except ValueError:
+        hits = misses = 0
+    total = hits + misses
+    size = stats.get("size") or "?"
+    limit = stats.get("max_size") or "?"
+    message = f"{tool} em {stats.get('dir', '?')}: {size} de {limit}."
+    if total:
+        rate = hits * 100 / total
+        location = f"{tool}, {rate:.0f}% de acerto"
+        message += f" Último build: {hits} acertos, {misses} falhas ({rate:.0f}% de acerto)."
+    else:
+        location = f"{tool}, sem estatísticas"
+        message += " O último build não registrou compilações pelo cache."
+    return CheckOutcome(
+        name=label,
+        status="ok",
+        version=installed.version,
+        location=location,
+        message=message,
+    )
+
+
 DEPENDENCIES: List[Dependency] = [
     Dependency("python", "Python", check_python),
     Dependency("git", "Git", check_git),
@@ -585,38 +2116,160 @@ DEPENDENCIES: List[Dependency] = [
     Dependency("perl", "Perl", check_perl),
     Dependency("lua", "Lua", check_lua),
     Dependency("qsb", "qsb (Qt Shader Baker)", check_qsb),
-    Dependency("msys2", "MSYS2", check_msys2),
-    Dependency("mingw", "GCC (MinGW-w64)", check_mingw),
-    Dependency("visualstudio", "Visual Studio Build Tools", check_visual_studio),
-    Dependency("vcpkg", "vcpkg", check_vcpkg, optional=True),
+    Dependency("msys2", "MSYS2", check_msys2, inputs=("msys2",)),
+    Dependency("mingw", "GCC (MinGW-w64)", check_mingw, inputs=("path", "msys2", "mingw")),
+    Dependency(
+        "visualstudio",
+        "Visual Studio Build Tools",
+        check_visual_studio,
+        inputs=("vsinstaller",),
+    ),
+    Dependency("vcpkg", "vcpkg", check_vcpkg, optional=True, inputs=("vcpkg",)),
+    Dependency("cores", "Núcleos de CPU", check_cpu_cores, inputs=(), category="perf"),
+    Dependency("memory", "RAM por job", check_memory_per_job, inputs=(), category="perf"),
+    Dependency("disk", "Espaço em disco (build)", check_disk_space, inputs=(), category="perf"),
+    Dependency("diskio", "E/S do diretório de build", check_disk_throughput, inputs=(), category="perf"),
+    Dependency("compiler", "Latência do compilador", check_compiler_latency, inputs=(), category="perf"),
+    Dependency("ninjanoop", "Ninja no-op", check_ninja_noop, inputs=(), category="perf"),
+    Dependency(
+        "compilercache",
+        "Cache de compilação",
+        check_compiler_cache,
+        optional=True,
+        inputs=("path", "msys2"),
+        category="perf",
+    ),
 ]
 
 
-def run_checks(selected: Optional[Iterable[str]] = None) -> List[CheckOutcome]:
-    """Executa verificações respeitando filtros de seleção."""
-    selected_set = {key.lower() for key in selected} if selected else None
-    outcomes: List[CheckOutcome] = []
+def default_jobs() -> int:
+    """Número padrão de workers: um por núcleo lógico."""
+    return max(1, os.cpu_count() or 1)
 
-    for dependency in DEPENDENCIES:
-        if selected_set and dependency.key.lower() not in selected_set:
-            continue
 
-        try:
-            result = dependency.checker()
-        except Exception as exc:  # pragma: no cover - erros inesperados
-            result = CheckOutcome(
-                name=dependency.label,
-                status="fail",
-                version=None,
-                location=None,
-                message=f"Erro inesperado: {exc}",
-            )
+def run_dependency(
+    dependency: Dependency,
+    timeout: Optional[float] = DEFAULT_CHECK_TIMEOUT,
+    global_deadline: Optional[float] = None,
+) -> CheckOutcome:
+    """
+    Executa uma única verificação, convertendo erros inesperados em falha.
+
+    O check recebe o menor entre seu próprio prazo e o prazo global; ao
+    expirar, o resultado tem status "timeout". Tempo de parede e número de
+    processos criados são registrados no CheckOutcome.
+    """
+    start = time.monotonic()
+    deadline = start + timeout if timeout else None
+    if global_deadline is not None:
+        deadline = global_deadline if deadline is None else min(deadline, global_deadline)
+
+    context = CheckContext(deadline=deadline)
+    _check_context.current = context
+    try:
+        if deadline is not None and start >= deadline:
+            raise CheckTimeout("prazo global da auditoria esgotado")
+        result = dependency.checker()
+    except CheckTimeout as exc:
+        result = CheckOutcome(
+            name=dependency.label,
+            status="timeout",
+            version=None,
+            location=None,
+            message=f"Tempo esgotado: {exc}",
+        )
+    except Exception as exc:  # pragma: no cover - erros inesperados
+        result = CheckOutcome(
+            name=dependency.label,
+            status="fail",
+            version=None,
+            location=None,
+            message=f"Erro inesperado: {exc}",
+        )
+    finally:
+        _check_context.current = None
+
+    result.optional = dependency.optional
+    result.name = dependency.label
+    result.elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+    result.spawns = context.spawns
+    return result
+
+
+def select_dependencies(
+    selected: Optional[Iterable[str]] = None,
+    *,
+    perf: bool = False,
+) -> List[Dependency]:
+    """
+    Checks a executar, na ordem de DEPENDENCIES.
+
+    Sem seleção explícita, os checks de desempenho (categoria "perf") só
+    entram com ``perf=True``; com --only, qualquer check pode ser escolhido.
+    """
+    if selected:
+        selected_set = {key.lower() for key in selected}
+        return [dep for dep in DEPENDENCIES if dep.key.lower() in selected_set]
+    return [dep for dep in DEPENDENCIES if dep.category == "deps" or perf]
+
+
+def run_checks(
+    selected: Optional[Iterable[str]] = None,
+    jobs: Optional[int] = None,
+    *,
+    timeout: Optional[float] = DEFAULT_CHECK_TIMEOUT,
+    total_timeout: Optional[float] = None,
+    perf: bool = False,
+    on_complete: Optional[Callable[[Dependency, CheckOutcome], None]] = None,
+) -> List[CheckOutcome]:
+    """
+    Executa verificações respeitando filtros de seleção.
+
+    As verificações são independentes entre si e passam a maior parte do tempo
+    esperando subprocessos, então rodam em um pool de threads limitado a
+    ``jobs`` workers (padrão: núcleos lógicos). Os resultados sempre voltam na
+    ordem declarada em DEPENDENCIES, mantendo os relatórios determinísticos.
+    Um ToolIndex novo é criado a cada execução e compartilhado pelos checks.
+
+    Checks de desempenho rodam depois, um de cada vez, para que as medições
+    não disputem CPU e disco com os demais.
+
+    ``timeout`` limita cada check e ``total_timeout`` a auditoria inteira (em
+    segundos); None desativa o respectivo prazo.
+
+    ``on_complete`` é chamado na thread de quem chamou assim que cada check
+    termina, na ordem de conclusão (usado por --stream).
+    """
+    set_tool_index(ToolIndex())
+    dependencies = select_dependencies(selected, perf=perf)
+    global_deadline = time.monotonic() + total_timeout if total_timeout else None
+
+    def run_one(dependency: Dependency) -> CheckOutcome:
+        return run_dependency(dependency, timeout, global_deadline)
 
-        result.optional = dependency.optional
-        result.name = dependency.label
-        outcomes.append(result)
+    results: Dict[str, CheckOutcome] = {}
 
-    return outcomes
+    def complete(dependency: Dependency, outcome: CheckOutcome) -> None:
+        results[dependency.key] = outcome
+        if on_complete is not None:
+            on_complete(dependency, outcome)
+
+    concurrent = [dep for dep in dependencies if dep.category != "perf"]
+    workers = min(jobs or default_jobs(), len(concurrent))
+    if workers <= 1:
+        for dependency in concurrent:
+            complete(dependency, run_one(dependency))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_one, dep): dep for dep in concurrent}
+            for future in as_completed(futures):
+                complete(futures[future], future.result())
+
+    for dependency in dependencies:
+        if dependency.key not in results:
+            complete(dependency, run_one(dependency))
+
+    return [results[dependency.key] for dependency in dependencies]
 
 
 def format_status(status: str) -> str:
@@ -625,23 +2278,39 @@ def format_status(status: str) -> str:
         "ok": "OK",
         "warn": "AVISO",
         "fail": "FALHA",
+        "timeout": "TIMEOUT",
     }
     return mapping.get(status.lower(), status.upper())
 
 
+def format_elapsed(outcome: CheckOutcome) -> str:
+    """Tempo de parede do check para exibição."""
+    if outcome.elapsed_ms is None:
+        return "-"
+    return f"{outcome.elapsed_ms:.0f} ms"
+
+
 def render_table(outcomes: List[CheckOutcome]) -> str:
     """Gera tabela legível no terminal."""
-    name_width = max(len(outcome.name) for outcome in outcomes) + 2
+    name_width = max(len("Componente"), *(len(outcome.name) for outcome in outcomes)) + 2
     version_width = max(
-        len(outcome.version or "-") for outcome in outcomes
+        len("Versão"), *(len(outcome.version or "-") for outcome in outcomes)
+    ) + 2
+    status_width = max(
+        len("Status"), *(len(format_status(outcome.status)) for outcome in outcomes)
     ) + 2
-    status_width = max(len(format_status(outcome.status)) for outcome in outcomes) + 2
+    time_width = max(
+        len("Tempo"), *(len(format_elapsed(outcome)) for outcome in outcomes)
+    ) + 2
+    spawn_width = len("Proc.") + 2
 
     lines = []
     header = (
         f"{'Componente'.ljust(name_width)}"
         f"{'Status'.ljust(status_width)}"
         f"{'Versão'.ljust(version_width)}"
+        f"{'Tempo'.ljust(time_width)}"
+        f"{'Proc.'.ljust(spawn_width)}"
         f"Local/Observação"
     )
     separator = "-" * len(header)
@@ -654,6 +2323,8 @@ def render_table(outcomes: List[CheckOutcome]) -> str:
             f"{outcome.name.ljust(name_width)}"
             f"{format_status(outcome.status).ljust(status_width)}"
             f"{version.ljust(version_width)}"
+            f"{format_elapsed(outcome).ljust(time_width)}"
+            f"{str(outcome.spawns).ljust(spawn_width)}"
             f"{location}"
         )
 
@@ -661,10 +2332,16 @@ def render_table(outcomes: List[CheckOutcome]) -> str:
 
 
 def summarize(outcomes: List[CheckOutcome]) -> Dict[str, int]:
-    """Conta quantos itens tiveram cada status, ignorando opcionais nas falhas."""
+    """
+    Conta quantos itens tiveram cada status, ignorando opcionais nas falhas.
+
+    Checks que estouraram o prazo contam como falha.
+    """
     summary = {"ok": 0, "warn": 0, "fail": 0}
     for outcome in outcomes:
         key = outcome.status.lower()
+        if key == "timeout":
+            key = "fail"
         if key not in summary:
             continue
         if key == "fail" and outcome.optional:
@@ -687,6 +2364,53 @@ def write_json_report(path: Path, outcomes: List[CheckOutcome]) -> None:
     path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
 
 
+class NdjsonStream:
+    """
+    Emite um registro JSON por linha assim que cada check termina (--stream ndjson).
+
+    Registros: "start" (checks previstos), "check" (um CheckOutcome, na ordem
+    de conclusão) e "summary" (contagem por status e código de saída). Cada
+    linha é descarregada na hora para que quem lê o pipe veja o progresso.
+    """
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream or sys.stdout
+        self.started = time.monotonic()
+        self.closed = False
+
+    def emit(self, record: Dict) -> None:
+        if self.closed:
+            return
+        try:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stream.flush()
+        except BrokenPipeError:
+            # Leitor fechou o pipe: o diagnóstico continua, só a saída para
+            self.closed = True
+
+    def start(self, dependencies: Sequence[Dependency]) -> None:
+        self.emit({
+            "type": "start",
+            "tool": "vlc-build-doctor",
+            "platform": platform.platform(),
+            "checks": [dependency.key for dependency in dependencies],
+        })
+
+    def check(self, dependency: Dependency, outcome: CheckOutcome) -> None:
+        self.emit({"type": "check", "key": dependency.key, **asdict(outcome)})
+
+    def summary(self, summary: Dict[str, int], cache: Optional["ProbeCache"]) -> None:
+        record = {
+            "type": "summary",
+            **summary,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "exit_code": 0 if summary["fail"] == 0 else 1,
+        }
+        if cache is not None:
+            record["cache"] = {"hits": cache.hits, "misses": cache.misses}
+        self.emit(record)
+
+
 def write_markdown_report(path: Path, outcomes: List[CheckOutcome]) -> None:
     """Salva relatório resumido em Markdown."""
     lines = [
@@ -695,8 +2419,8 @@ def write_markdown_report(path: Path, outcomes: List[CheckOutcome]) -> None:
         f"- Plataforma: `{platform.platform()}`",
         f"- Python: `{platform.python_version()}`",
         "",
-        "| Componente | Status | Versão | Opcional | Observação |",
-        "|------------|--------|--------|----------|------------|",
+        "| Componente | Status | Versão | Opcional | Tempo | Processos | Observação |",
+        "|------------|--------|--------|----------|-------|-----------|------------|",
     ]
 
     for outcome in outcomes:
@@ -705,13 +2429,250 @@ def write_markdown_report(path: Path, outcomes: List[CheckOutcome]) -> None:
         optional = "Sim" if outcome.optional else "Não"
         message = outcome.message.replace("\n", " ").strip()
         lines.append(
-            f"| {outcome.name} | {status} | {version} | {optional} | {message} |"
+            f"| {outcome.name} | {status} | {version} | {optional} "
+            f"| {format_elapsed(outcome)} | {outcome.spawns} | {message} |"
         )
 
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text("\n".join(lines), encoding="utf-8")
 
 
+def watch_directories(dependency: Dependency, index: ToolIndex) -> List[Path]:
+    """Diretórios cujas mudanças podem alterar o resultado do check."""
+    directories: List[Path] = []
+    for kind in dependency.inputs:
+        if kind == "path":
+            directories.extend(index.directories)
+        elif kind == "msys2":
+            for root in index.msys2_roots:
+                directories.append(root.joinpath(*PACMAN_LOCAL_DB))
+                directories.append(root / "usr" / "bin")
+                directories.extend(root / env / "bin" for env in MSYS2_ENVIRONMENTS)
+        elif kind == "mingw":
+            directories.extend(mingw_bin_dirs(index))
+        elif kind == "vcpkg":
+            directories.extend(vcpkg_roots())
+        elif kind == "vsinstaller":
+            directories.extend(vs_installer_dirs())
+            directories.append(vs_instances_dir())
+    return deduplicate_paths(directories)
+
+
+def directory_signature(directory: Path) -> Optional[Tuple[int, int]]:
+    """mtime e inode do diretório; muda quando entradas são criadas ou removidas."""
+    try:
+        stat = directory.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino
+
+
+def _directory_key(directory: Path) -> str:
+    return os.path.normcase(os.path.normpath(str(directory)))
+
+
+class _NativeEventHandler(FileSystemEventHandler):
+    """Encaminha eventos do watchdog para o InputWatcher."""
+
+    def __init__(self, watcher: "InputWatcher") -> None:
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event) -> None:  # pragma: no cover - depende do SO
+        self.watcher.notify(Path(event.src_path).parent)
+
+
+class InputWatcher:
+    """
+    Observa os diretórios de entrada dos checks.
+
+    Usa notificações nativas (watchdog) quando disponíveis e sempre combina
+    com varredura por stat a cada ``interval`` segundos, o que cobre
+    diretórios que ainda não existiam quando o watch começou.
+    """
+
+    def __init__(self, directories: Iterable[Path], interval: float) -> None:
+        self.interval = interval
+        self.directories = deduplicate_paths(directories)
+        self._snapshot = self._take_snapshot()
+        self._wake = threading.Event()
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._observer = None
+        if Observer is not None:
+            self._start_observer()
+
+    @property
+    def native(self) -> bool:
+        return self._observer is not None
+
+    def _take_snapshot(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        return {
+            _directory_key(directory): directory_signature(directory)
+            for directory in self.directories
+        }
+
+    def _start_observer(self) -> None:
+        observer = Observer()
+        handler = _NativeEventHandler(self)
+        scheduled = 0
+        for directory in self.directories:
+            if not directory.is_dir():
+                continue
+            try:
+                observer.schedule(handler, str(directory), recursive=False)
+                scheduled += 1
+            except (OSError, RuntimeError):
+                continue
+        if not scheduled:
+            return
+        try:
+            observer.start()
+        except (OSError, RuntimeError):
+            return
+        self._observer = observer
+
+    def notify(self, directory: Path) -> None:
+        with self._lock:
+            self._pending.add(_directory_key(directory))
+        self._wake.set()
+
+    def wait_for_changes(self) -> Set[str]:
+        """Bloqueia até algum diretório mudar e retorna as chaves alteradas."""
+        while True:
+            if self._wake.wait(self.interval):
+                # Agrupa rajadas de eventos (ex.: pacman instalando um pacote)
+                time.sleep(WATCH_SETTLE_DELAY)
+            self._wake.clear()
+
+            snapshot = self._take_snapshot()
+            changed = {
+                key for key, signature in snapshot.items()
+                if self._snapshot.get(key) != signature
+            }
+            self._snapshot = snapshot
+            with self._lock:
+                changed |= self._pending & set(snapshot)
+                self._pending.clear()
+            if changed:
+                return changed
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+
+def diff_outcomes(
+    previous: Dict[str, CheckOutcome],
+    current: Dict[str, CheckOutcome],
+) -> List[str]:
+    """Descreve, em linhas, o que mudou entre duas rodadas de um mesmo check."""
+    lines: List[str] = []
+    for key, outcome in current.items():
+        before = previous.get(key)
+        if before is None:
+            lines.append(f"+ {outcome.name}: {format_status(outcome.status)}")
+            continue
+        if (before.status, before.version, before.location) == (
+            outcome.status,
+            outcome.version,
+            outcome.location,
+        ):
+            continue
+        changes: List[str] = []
+        if before.status != outcome.status:
+            changes.append(f"{format_status(before.status)} -> {format_status(outcome.status)}")
+        if before.version != outcome.version:
+            changes.append(f"versão {before.version or '-'} -> {outcome.version or '-'}")
+        if before.location != outcome.location:
+            changes.append(f"local {outcome.location or '-'}")
+        lines.append(f"~ {outcome.name}: {', '.join(changes)}")
+    return lines
+
+
+def watch_checks(
+    selected: Optional[Iterable[str]],
+    *,
+    interval: float,
+    on_update: Callable[[List[CheckOutcome]], None],
+    **run_options,
+) -> None:
+    """
+    Mantém o doctor residente e reexecuta apenas os checks afetados.
+
+    Cada mudança em um diretório de entrada reexecuta os checks que dependem
+    dele e imprime a diferença de resultados. ``on_update`` recebe a lista
+    completa (na ordem de DEPENDENCIES) a cada rodada. Termina com Ctrl+C.
+    """
+    outcomes = run_checks(selected, **run_options)
+    on_update(outcomes)
+
+    dependencies = select_dependencies(selected, perf=run_options.get("perf", False))
+    state = {dep.key: outcome for dep, outcome in zip(dependencies, outcomes)}
+
+    index = get_tool_index()
+    inputs = {
+        dep.key: {_directory_key(path) for path in watch_directories(dep, index)}
+        for dep in dependencies
+    }
+    watcher = InputWatcher(
+        (path for dep in dependencies for path in watch_directories(dep, index)),
+        interval,
+    )
+    mode = "notificações nativas + varredura" if watcher.native else "varredura por stat"
+    print(
+        f"\nObservando {len(watcher.directories)} diretórios ({mode}, "
+        f"intervalo {interval:g}s). Ctrl+C para sair."
+    )
+
+    try:
+        while True:
+            changed = watcher.wait_for_changes()
+            affected = [key for key, paths in inputs.items() if paths & changed]
+            if not affected:
+                continue
+
+            current = dict(zip(affected, run_checks(affected, **run_options)))
+            stamp = time.strftime("%H:%M:%S")
+            lines = diff_outcomes(state, current)
+            state.update(current)
+            print(
+                f"\n[{stamp}] {len(changed)} diretório(s) alterado(s); "
+                f"reexecutados: {', '.join(affected)}"
+            )
+            for line in lines or ["= Nenhuma mudança nos resultados."]:
+                print(f"  {line}")
+            on_update([state[dep.key] for dep in dependencies])
+    except KeyboardInterrupt:
+        print("\nWatch encerrado.")
+    finally:
+        watcher.stop()
+
+
+def positive_int(raw: str) -> int:
+    """Valida inteiros positivos vindos da linha de comando."""
+    try:
+        value = int(raw)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inteiro inválido: {raw!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError("o valor deve ser >= 1")
+    return value
+
+
+def positive_float(raw: str) -> float:
+    """Valida números positivos (segundos) vindos da linha de comando."""
+    try:
+        value = float(raw)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor numérico inválido: {raw!r}")
+    if value <= 0:
+        raise argparse.ArgumentTypeError("o valor deve ser > 0")
+    return value
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Audita o ambiente de compilação do VLC para Windows 10/11.",
@@ -726,6 +2687,12 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         type=Path,
         help="Salvar relatório em Markdown no caminho informado.",
     )
+    parser.add_argument(
+        "--stream",
+        choices=STREAM_FORMATS,
+        default=None,
+        help="Emitir cada resultado em stdout assim que o check terminar (ndjson: um JSON por linha, com resumo no fim).",
+    )
     parser.add_argument(
         "--only",
         nargs="+",
@@ -736,25 +2703,90 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Listar identificadores de checks disponíveis.",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=positive_int,
+        default=default_jobs(),
+        help="Número de checks executados em paralelo (padrão: núcleos lógicos; 1 = sequencial).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=positive_float,
+        default=DEFAULT_CHECK_TIMEOUT,
+        help=f"Prazo de cada check em segundos (padrão: {DEFAULT_CHECK_TIMEOUT:g}).",
+    )
+    parser.add_argument(
+        "--total-timeout",
+        type=positive_float,
+        default=None,
+        help="Prazo da auditoria inteira em segundos (padrão: sem limite).",
+    )
+    parser.add_argument(
+        "--perf",
+        action="store_true",
+        help="Incluir checks de desempenho do host (núcleos, RAM por job, disco, compilador, ninja, cache de compilação).",
+    )
+    parser.add_argument(
+        "--build-dir",
+        type=Path,
+        default=None,
+        help="Diretório de build medido pelos checks de desempenho (padrão: vlc/build-mingw).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Permanecer ativo e reexecutar só os checks cujas entradas (PATH, MSYS2, vcpkg, VS) mudarem.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=positive_float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help=f"Intervalo de varredura do --watch em segundos (padrão: {DEFAULT_WATCH_INTERVAL:g}).",
+    )
+    parser.add_argument(
+        "--no-metadata",
+        action="store_true",
+        help="Sempre executar as ferramentas em vez de ler versões de metadados (PE, pacman, pip).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Não ler nem gravar o cache de sondagens.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignorar o cache existente e regravá-lo com resultados novos.",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=None,
+        help="Arquivo do cache de sondagens (padrão: %%LOCALAPPDATA%%/vlc-build-doctor/probe-cache.json).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=positive_int,
+        default=DEFAULT_CACHE_TTL,
+        help=f"Validade das entradas do cache em segundos (padrão: {DEFAULT_CACHE_TTL}).",
+    )
+    args = parser.parse_args(argv)
+    if args.stream and args.watch:
+        parser.error("--stream não pode ser combinado com --watch")
+    return args
 
 
 def list_checks() -> None:
     print("Checks disponíveis:")
     for dependency in DEPENDENCIES:
         optional = " (opcional)" if dependency.optional else ""
-        print(f"  - {dependency.key}{optional}: {dependency.label}")
-
-
-def main(argv: Optional[Sequence[str]] = None) -> int:
-    args = parse_args(argv)
-
-    if args.list:
-        list_checks()
-        return 0
+        perf = " [--perf]" if dependency.category == "perf" else ""
+        print(f"  - {dependency.key}{optional}{perf}: {dependency.label}")
 
-    outcomes = run_checks(args.only)
 
+def print_report(outcomes: List[CheckOutcome], cache: Optional[ProbeCache]) -> Dict[str, int]:
+    """Imprime tabela, resumo e detalhes; retorna o resumo por status."""
     print("VLC Build Doctor - Auditoria de Ambiente")
     print(f"Sistema detectado: {platform.platform()}")
     print(f"Python em uso: {platform.python_version()}")
@@ -766,6 +2798,8 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     print(
         f"Resumo -> OK: {summary['ok']} | Avisos: {summary['warn']} | Falhas: {summary['fail']}"
     )
+    if cache is not None:
+        print(f"Cache de sondagens -> acertos: {cache.hits} | falhas: {cache.misses}")
 
     issues = [
         outcome
@@ -777,15 +2811,97 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         for outcome in issues:
             optional = " [Opcional]" if outcome.optional else ""
             print(f"- {outcome.name}{optional}: {outcome.message}")
+    return summary
 
+
+def write_reports(
+    args: argparse.Namespace,
+    outcomes: List[CheckOutcome],
+    *,
+    quiet: bool = False,
+) -> None:
+    """Grava os relatórios JSON/Markdown pedidos na linha de comando."""
     if args.json:
         write_json_report(args.json, outcomes)
-        print(f"\nRelatório JSON salvo em: {args.json}")
+        if not quiet:
+            print(f"\nRelatório JSON salvo em: {args.json}")
 
     if args.markdown:
         write_markdown_report(args.markdown, outcomes)
-        print(f"Relatório Markdown salvo em: {args.markdown}")
+        if not quiet:
+            print(f"Relatório Markdown salvo em: {args.markdown}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.list:
+        list_checks()
+        return 0
+
+    cache: Optional[ProbeCache] = None
+    if not args.no_cache:
+        cache = ProbeCache(
+            args.cache_file or default_cache_path(),
+            ttl=args.cache_ttl,
+            refresh=args.refresh,
+        )
+    set_probe_cache(cache)
+    set_metadata_detection(not args.no_metadata)
+    set_build_dir(args.build_dir)
+
+    run_options = {
+        "jobs": args.jobs,
+        "timeout": args.timeout,
+        "total_timeout": args.total_timeout,
+        "perf": args.perf,
+    }
+
+    if args.watch:
+        first_round = True
+
+        def on_update(outcomes: List[CheckOutcome]) -> None:
+            nonlocal first_round
+            if first_round:
+                print_report(outcomes, cache)
+                first_round = False
+            if cache is not None:
+                cache.save()
+            write_reports(args, outcomes, quiet=True)
+
+        try:
+            watch_checks(
+                args.only,
+                interval=args.interval,
+                on_update=on_update,
+                **run_options,
+            )
+        finally:
+            set_probe_cache(None)
+        return 0
 
+    stream: Optional[NdjsonStream] = None
+    if args.stream:
+        stream = NdjsonStream()
+        stream.start(select_dependencies(args.only, perf=args.perf))
+        run_options["on_complete"] = stream.check
+
+    try:
+        outcomes = run_checks(args.only, **run_options)
+    finally:
+        set_probe_cache(None)
+        if cache is not None:
+            cache.save()
+
+    if stream is not None:
+        # stdout é só NDJSON; relatórios pedidos são gravados em silêncio
+        summary = summarize(outcomes)
+        write_reports(args, outcomes, quiet=True)
+        stream.summary(summary, cache)
+        return 0 if summary["fail"] == 0 else 1
+
+    summary = print_report(outcomes, cache)
+    write_reports(args, outcomes)
     return 0 if summary["fail"] == 0 else 1
 
 